@@ -0,0 +1,272 @@
+# 수집한 게시물 원문 보관소 (압축 레코드 파일 + 오프셋 색인)
+# 시트는 셀 용량 때문에 본문을 30000자로 자르므로, 여기에 잘리지 않은 원문을 남긴다.
+# - posts.arc     : 게시물 하나당 압축 레코드 하나를 이어 붙인 추가 전용 파일
+#                   레코드 = 헤더(길이 4바이트 + 코덱 1바이트) + 압축한 JSON
+# - posts.arc.idx : (게시판, 글번호) -> (오프셋, 길이, 내용 해시) 색인 (JSON)
+# 한 건 조회는 색인으로 찾아 mmap 에서 그 레코드만 풀고, 전체 분석은 파일을 순서대로 읽는다.
+# 압축은 zstandard 가 설치되어 있으면 zstd, 없으면 zlib (읽을 때는 레코드별 코덱을 따름).
+import os
+import sys
+import json
+import mmap
+import zlib
+import struct
+import argparse
+import threading
+from crawl_state import DEFAULT_STATE_PATH, content_hash
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_ARCHIVE_PATH = os.path.join(os.path.dirname(DEFAULT_STATE_PATH), 'posts.arc')
+RECORD_HEADER = struct.Struct('>IB')
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+ZSTD_LEVEL = 9
+ZLIB_LEVEL = 9
+# 끝부분이 잘린/깨진 레코드로 보는 오류 (zstandard 미설치로 못 읽는 경우는 포함하지 않음 - 지우면 안 되므로)
+CORRUPT_ERRORS = (ValueError, struct.error, zlib.error) + ((zstandard.ZstdError,) if zstandard is not None else ())
+
+
+def _compress(data):
+    if zstandard is not None:
+        return CODEC_ZSTD, zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return CODEC_ZLIB, zlib.compress(data, ZLIB_LEVEL)
+
+
+def _decompress(codec, payload):
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(payload)
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd 로 압축된 레코드입니다. zstandard 패키지를 설치하세요.")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    raise ValueError(f"알 수 없는 압축 코덱입니다: {codec}")
+
+
+def post_hash(post):
+    """보관할 게시물 내용 해시 (같으면 다시 쓰지 않음)"""
+    return content_hash([post.get(key, '') for key in sorted(post)])
+
+
+class PostArchive:
+    """게시판 + 글번호 단위 원문 보관소 (스레드 안전)
+
+    같은 글이 바뀌어 다시 들어오면 새 레코드를 뒤에 붙이고 색인만 옮긴다 (이전 레코드는 compact() 때 정리).
+    색인은 flush() 때 저장하며, 저장 전에 끊겼으면 다음에 열 때 색인 이후 부분을 다시 읽어 복구한다.
+    """
+
+    def __init__(self, path=DEFAULT_ARCHIVE_PATH):
+        self.path = path
+        self.index_path = path + '.idx'
+        self.lock = threading.RLock()
+        self.file = open(path, 'a+b')
+        self.map = None
+        self.entries = {}
+        self.size = 0
+        self._load_index()
+
+    # --- 색인 ---
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                saved = json.load(f)
+            self.entries = {(board, int(num)): tuple(entry)
+                            for board, nums in saved['entries'].items() for num, entry in nums.items()}
+            self.size = saved['size']
+        except (OSError, ValueError, KeyError):
+            self.entries, self.size = {}, 0
+        actual = os.path.getsize(self.path)
+        if actual < self.size:
+            # 색인이 파일보다 앞서 있으면 (파일을 바꿔치기한 경우 등) 처음부터 다시 읽음
+            self.entries, self.size = {}, 0
+        if actual > self.size:
+            self._scan_tail(actual)
+
+    def _scan_tail(self, actual):
+        """색인에 없는 파일 뒷부분의 레코드를 색인에 추가 (잘린 마지막 레코드는 버림)"""
+        offset = self.size
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            while offset + RECORD_HEADER.size <= actual:
+                length, codec = RECORD_HEADER.unpack(f.read(RECORD_HEADER.size))
+                payload = f.read(length)
+                if len(payload) < length:
+                    break
+                try:
+                    post = json.loads(_decompress(codec, payload))
+                except CORRUPT_ERRORS:
+                    break
+                board = post.pop('_board')
+                self.entries[(board, int(post['번호']))] = (offset, RECORD_HEADER.size + length, post_hash(post))
+                offset += RECORD_HEADER.size + length
+        if offset < actual:
+            print(f"보관소 끝의 불완전한 레코드를 정리합니다 ({actual - offset} bytes).")
+            self.file.truncate(offset)
+        self.size = offset
+
+    def _save_index(self):
+        nums = {}
+        for (board, num), entry in self.entries.items():
+            nums.setdefault(board, {})[str(num)] = entry
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'size': self.size, 'entries': nums}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+    # --- 쓰기 ---
+
+    def add(self, board, posts):
+        """게시물들을 보관 (내용이 같은 글은 건너뜀) -> 새로 쓴 건수"""
+        written = 0
+        with self.lock:
+            for post in posts:
+                key = (board, int(post['번호']))
+                digest = post_hash(post)
+                current = self.entries.get(key)
+                if current and current[2] == digest:
+                    continue
+                codec, payload = _compress(json.dumps(dict(post, _board=board), ensure_ascii=False).encode('utf-8'))
+                record = RECORD_HEADER.pack(len(payload), codec) + payload
+                self.file.write(record)
+                self.entries[key] = (self.size, len(record), digest)
+                self.size += len(record)
+                written += 1
+        return written
+
+    def flush(self):
+        """데이터를 디스크까지 기록한 뒤 색인 저장"""
+        with self.lock:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self._save_index()
+
+    # --- 읽기 ---
+
+    def _view(self, end):
+        """end 까지 읽을 수 있는 mmap (파일이 커졌으면 다시 매핑)"""
+        if self.map is None or len(self.map) < end:
+            self.file.flush()
+            if self.map is not None:
+                self.map.close()
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.map
+
+    def _read(self, offset, length):
+        view = self._view(offset + length)
+        _, codec = RECORD_HEADER.unpack_from(view, offset)
+        post = json.loads(_decompress(codec, view[offset + RECORD_HEADER.size:offset + length]))
+        post.pop('_board', None)
+        return post
+
+    def get(self, board, num):
+        """한 건 조회 (없으면 None) - 해당 레코드만 풀어 읽음"""
+        with self.lock:
+            entry = self.entries.get((board, int(num)))
+            return self._read(entry[0], entry[1]) if entry else None
+
+    def nums(self, board):
+        with self.lock:
+            return sorted(num for b, num in self.entries if b == board)
+
+    def boards(self):
+        with self.lock:
+            return sorted({board for board, _ in self.entries})
+
+    def __len__(self):
+        return len(self.entries)
+
+    def scan(self, board=None):
+        """(게시판, 게시물) 을 파일 순서대로 - 교체된 이전 레코드는 건너뜀"""
+        with self.lock:
+            live = sorted((entry[0], entry[1], b) for (b, _), entry in self.entries.items()
+                          if board is None or b == board)
+        for offset, length, b in live:
+            # 읽는 도중 다른 스레드가 추가하면 다시 매핑될 수 있으므로 레코드마다 잠금
+            with self.lock:
+                post = self._read(offset, length)
+            yield b, post
+
+    def compact(self):
+        """교체된 이전 레코드를 빼고 파일을 다시 씀 -> 줄어든 바이트 수"""
+        with self.lock:
+            before = self.size
+            tmp_path = self.path + '.tmp'
+            entries = {}
+            offset = 0
+            view = self._view(self.size) if self.entries else None
+            with open(tmp_path, 'wb') as out:
+                for key, (start, length, digest) in sorted(self.entries.items(), key=lambda item: item[1][0]):
+                    out.write(view[start:start + length])
+                    entries[key] = (offset, length, digest)
+                    offset += length
+                out.flush()
+                os.fsync(out.fileno())
+            if self.map is not None:
+                self.map.close()
+                self.map = None
+            self.file.close()
+            os.replace(tmp_path, self.path)
+            self.file = open(self.path, 'a+b')
+            self.entries, self.size = entries, offset
+            self._save_index()
+            return before - offset
+
+    def close(self):
+        with self.lock:
+            if self.file.closed:
+                return
+            self.flush()
+            if self.map is not None:
+                self.map.close()
+                self.map = None
+            self.file.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="수집한 게시물 원문 보관소")
+    parser.add_argument('--archive', default=DEFAULT_ARCHIVE_PATH,
+                        help=f"보관소 파일 (기본: {os.path.basename(DEFAULT_ARCHIVE_PATH)})")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('stats', help="게시판별 보관 건수와 파일 크기")
+    get = commands.add_parser('get', help="게시물 한 건을 JSON 으로 출력")
+    get.add_argument('board')
+    get.add_argument('num', type=int)
+    export = commands.add_parser('export', help="전체(또는 한 게시판)를 JSONL 로 내보내기")
+    export.add_argument('output')
+    export.add_argument('--board')
+    commands.add_parser('compact', help="교체된 이전 레코드 정리")
+    args = parser.parse_args(argv)
+
+    archive = PostArchive(args.archive)
+    try:
+        if args.command == 'stats':
+            for board in archive.boards():
+                print(f"[{board}] {len(archive.nums(board))}건")
+            print(f"전체 {len(archive)}건, {archive.size / 1024:.1f}KB "
+                  f"({'zstd' if zstandard is not None else 'zlib'})")
+        elif args.command == 'get':
+            post = archive.get(args.board, args.num)
+            if post is None:
+                print(f"[{args.board}] {args.num}번 글이 없습니다.")
+                return 1
+            print(json.dumps(post, ensure_ascii=False, indent=2))
+        elif args.command == 'export':
+            count = 0
+            with open(args.output, 'w', encoding='utf-8') as f:
+                for board, post in archive.scan(args.board):
+                    f.write(json.dumps(dict(post, board=board), ensure_ascii=False) + '\n')
+                    count += 1
+            print(f"{count}건 내보냄: {args.output}")
+        else:
+            print(f"{archive.compact() / 1024:.1f}KB 정리")
+    finally:
+        archive.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
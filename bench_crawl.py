@@ -0,0 +1,219 @@
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from contextlib import redirect_stdout, nullcontext
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import crawler
+import metrics
+from crawl_state import CrawlState
+from fetcher import HttpFetcher
+from ratelimit import HostLimiter, AdaptiveDelay
+from replay import ReplayServer, PageStore, FakeSheetsClient, synthetic_board
+from fake_drive import FakeDrive
+
+SCENARIOS = ['cold', 'incremental', 'drive']
+# 벤치마크용 탭 이름 (실제 탭의 적재 저널과 겹치지 않게)
+BENCH_TAB = 'bench'
+
+
+def peak_rss_mb():
+    """현재 프로세스의 최대 RSS (MB) - resource 가 없으면 psutil, 둘 다 없으면 None"""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 는 KB, macOS 는 바이트
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+
+
+def make_fetcher(workers, polite):
+    """polite 면 실제 수집과 같은 호스트 제한/대기시간, 아니면 크롤러 자체 처리량만 보도록 대기 없음"""
+    if polite:
+        limiter = HostLimiter(overrides=crawler.HOST_LIMITS)
+        return HttpFetcher(pool_size=workers, limiter=limiter, delay=AdaptiveDelay(**crawler.POLITENESS))
+    return HttpFetcher(pool_size=workers, delay=AdaptiveDelay(initial=0, min_delay=0, max_delay=0, name='bench'))
+
+
+def crawl_args(opts):
+    # 합성 'bench' 글이 실제 검색 색인/보관소/페이지 캐시에 들어가지 않도록 모두 끔
+    argv = ['--workers', str(opts.workers), '--list-window', str(opts.list_window),
+            '--no-index', '--no-archive', '--no-cache']
+    if not opts.polite:
+        # 가짜 시트이므로 쿼터 페이스 조절 없이
+        argv += ['--sheet-calls-per-minute', '1000000']
+    return crawler.parse_args(argv)
+
+
+def board_pages(opts, posts):
+    if opts.record_dir:
+        return PageStore(opts.record_dir).load()
+    return synthetic_board(posts)
+
+
+def run_sync(server, client, state, opts, max_pages):
+    fetcher = make_fetcher(opts.workers, opts.polite)
+    try:
+        with redirect_stdout(io.StringIO()) if not opts.verbose else nullcontext():
+            crawler.sync_board(fetcher, client, state, BENCH_TAB, 'qna.asp', max_pages, crawl_args(opts),
+                               base_url=server.base_url)
+    finally:
+        fetcher.close()
+
+
+def scenario_crawl(opts, incremental):
+    """cold: 빈 상태에서 전체 수집 / incremental: 전체 수집 후 새 글 opts.new_posts 개만 증분 수집"""
+    max_pages = -(-(opts.posts + opts.new_posts) // 10) + 1
+    with tempfile.TemporaryDirectory() as tmp, ReplayServer(board_pages(opts, opts.posts),
+                                                            latency=opts.latency / 1000.0) as server:
+        client = FakeSheetsClient()
+        state = CrawlState(os.path.join(tmp, 'state.db'))
+        try:
+            if incremental:
+                run_sync(server, client, state, opts, max_pages)
+                if not opts.record_dir:
+                    server.set_pages(synthetic_board(opts.posts + opts.new_posts))
+            metrics.METRICS.reset()
+            server.requests = 0
+            cpu, wall = time.process_time(), time.perf_counter()
+            run_sync(server, client, state, opts, max_pages)
+            cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+            worksheet = client.open(crawler.SPREADSHEET_NAME).worksheet(BENCH_TAB)
+            rows = len(worksheet.rows) - 1
+        finally:
+            state.close()
+    pages = metrics.METRICS.counter('pages_total', board='qna.asp')
+    posts = metrics.METRICS.counter('posts_total', board='qna.asp')
+    return {
+        'wall_seconds': round(wall, 3),
+        'cpu_seconds': round(cpu, 3),
+        'pages': pages,
+        'posts': posts,
+        'requests': server.requests,
+        'sheet_rows': rows,
+        'pages_per_sec': round(pages / wall, 2) if wall else None,
+        'posts_per_sec': round(posts / wall, 2) if wall else None,
+    }
+
+
+def scenario_drive(opts):
+    """xlsx 크기의 파일 opts.files 개 일괄 업로드 -> 같은 파일 재업로드(중복 건너뜀) -> 목록 -> 다운로드"""
+    from google.auth.credentials import AnonymousCredentials
+    import drive_sync
+    with tempfile.TemporaryDirectory() as tmp, FakeDrive() as drive:
+        paths = []
+        for i in range(opts.files):
+            path = os.path.join(tmp, f"report_{i}.xlsx")
+            with open(path, 'wb') as f:
+                f.write(os.urandom(opts.file_kb * 1024))
+            paths.append(path)
+        client = drive_sync.DriveClient(credentials=AnonymousCredentials(), root_url=drive.url)
+        client.upload_sessions.path = os.path.join(tmp, 'sessions.json')
+        client.metadata.path = os.path.join(tmp, 'metadata.json')
+        client.manifest.path = os.path.join(tmp, 'manifest.json')
+
+        metrics.METRICS.reset()
+        cpu, wall = time.process_time(), time.perf_counter()
+        timings = {}
+        with redirect_stdout(io.StringIO()) if not opts.verbose else nullcontext():
+            for label, step in [('upload', lambda: client.bulk_upload(paths)),
+                                ('reupload', lambda: client.bulk_upload(paths)),
+                                ('list', lambda: client.list_files()),
+                                ('download', lambda: [client.download_to(r['id'], io.BytesIO(), export=True)
+                                                      for r in client.list_files(fields='id')])]:
+                started = time.perf_counter()
+                result = step()
+                timings[label] = round(time.perf_counter() - started, 3)
+                if label == 'reupload':
+                    skipped = sum(r['status'] == 'skipped' for r in result)
+        cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+    return {
+        'wall_seconds': round(wall, 3),
+        'cpu_seconds': round(cpu, 3),
+        'files': opts.files,
+        'skipped_on_reupload': skipped,
+        'step_seconds': timings,
+        'files_per_sec': round(opts.files / timings['upload'], 2) if timings['upload'] else None,
+        'api_calls': len(drive.state.calls),
+    }
+
+
+def run_scenario(opts):
+    if opts.scenario == 'drive':
+        result = scenario_drive(opts)
+    else:
+        result = scenario_crawl(opts, incremental=opts.scenario == 'incremental')
+    result['scenario'] = opts.scenario
+    peak = peak_rss_mb()
+    result['peak_rss_mb'] = round(peak, 1) if peak is not None else None
+    result['stages'] = {name: {'count': h['count'], 'total': h['total']}
+                        for name, h in metrics.METRICS.summary()['histograms'].items()}
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="오프라인 재생 기반 크롤러/동기화 벤치마크 (k-icfr.org, 구글 API 미사용)")
+    parser.add_argument('scenarios', nargs='*', help=f"실행할 시나리오 (기본: 전부 - {', '.join(SCENARIOS)})")
+    parser.add_argument('--posts', type=int, default=500, help="합성 게시판 글 수 (기본 500)")
+    parser.add_argument('--new-posts', type=int, default=15, help="incremental 에서 새로 올라오는 글 수")
+    parser.add_argument('--record-dir', help="합성 게시판 대신 replay.py record 로 녹화한 폴더 사용")
+    parser.add_argument('--latency', type=float, default=0, help="재생 서버 응답 지연 (ms)")
+    parser.add_argument('--workers', type=int, default=crawler.DETAIL_WORKERS)
+    parser.add_argument('--list-window', type=int, default=crawler.LIST_WINDOW)
+    parser.add_argument('--polite', action='store_true', help="실제 수집과 같은 요청 제한/대기, 시트 쿼터 페이스 적용")
+    parser.add_argument('--files', type=int, default=50, help="drive 시나리오 파일 수")
+    parser.add_argument('--file-kb', type=int, default=64, help="drive 시나리오 파일 크기 (KB)")
+    parser.add_argument('--json', help="결과를 이 JSON 파일로 저장")
+    parser.add_argument('--verbose', action='store_true', help="크롤러 로그 출력")
+    parser.add_argument('--scenario', help=argparse.SUPPRESS)
+    opts = parser.parse_args(argv)
+    opts.scenarios = opts.scenarios or SCENARIOS
+    unknown = [name for name in opts.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"알 수 없는 시나리오: {', '.join(unknown)} (가능: {', '.join(SCENARIOS)})")
+
+    if opts.scenario:
+        # 자식 프로세스: 시나리오 하나를 돌리고 결과를 JSON 한 줄로 출력
+        print(json.dumps(run_scenario(opts), ensure_ascii=False))
+        return 0
+
+    # 최대 RSS 는 프로세스 단위이므로 시나리오마다 새 프로세스에서 실행
+    passthrough = [arg for arg in (argv if argv is not None else sys.argv[1:]) if arg not in SCENARIOS]
+    results = []
+    for scenario in opts.scenarios:
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), '--scenario', scenario] + passthrough,
+                             capture_output=True, text=True, encoding='utf-8')
+        if out.returncode != 0:
+            print(f"[{scenario}] 실패:\n{out.stderr}")
+            continue
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    for r in results:
+        if r['scenario'] == 'drive':
+            print(f"{r['scenario']:<12} {r['wall_seconds']:>7.2f}s  CPU {r['cpu_seconds']:>6.2f}s  "
+                  f"RSS {r['peak_rss_mb']}MB  업로드 {r['files_per_sec']} files/s  "
+                  f"재업로드 건너뜀 {r['skipped_on_reupload']}/{r['files']}  단계 {r['step_seconds']}")
+        else:
+            print(f"{r['scenario']:<12} {r['wall_seconds']:>7.2f}s  CPU {r['cpu_seconds']:>6.2f}s  "
+                  f"RSS {r['peak_rss_mb']}MB  {r['pages_per_sec']} pages/s  {r['posts_per_sec']} posts/s  "
+                  f"(페이지 {r['pages']}, 글 {r['posts']}, 요청 {r['requests']})")
+    if opts.json:
+        with open(opts.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0 if len(results) == len(opts.scenarios) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
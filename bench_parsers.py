@@ -0,0 +1,114 @@
+import os
+import sys
+import glob
+import time
+import argparse
+import html_parser
+from crawler import parse_detail, parse_list_row, BASE_URL
+
+# fetch_html.py 가 저장하는 페이지와 녹화된 응답 폴더를 기본 fixture 로 사용
+DEFAULT_FIXTURES = ['debug_page.html', 'fixtures']
+
+
+def load_fixtures(paths):
+    pages = []
+    for path in paths:
+        files = sorted(glob.glob(os.path.join(path, '**', '*.html'), recursive=True)) if os.path.isdir(path) else [path]
+        for file_path in files:
+            if os.path.exists(file_path):
+                with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                    pages.append((file_path, f.read()))
+    return pages
+
+
+def synthetic_pages(count, rows=20, paragraphs=200):
+    """실제 페이지가 없을 때 쓰는 Q&A 형태의 목록/상세 페이지"""
+    row = ('<tr><td class="num">{n}</td><td class="category">내부회계</td>'
+           '<td class="subject"><a href="qna.asp?rWork=TblView&amp;idx={n}">질문 제목 {n}</a></td>'
+           '<td class="name">작성자</td><td class="date">2024-01-01</td><td class="condition">답변완료</td></tr>')
+    body = ''.join(f'<p>내부회계관리제도 설계 및 운영평가 관련 문의 {i} 입니다. <b>강조</b> 텍스트</p>\n'
+                   for i in range(paragraphs))
+    pages = []
+    for i in range(count):
+        rows_html = ''.join(row.format(n=i * rows + r) for r in range(rows))
+        pages.append((f'synthetic-list-{i}',
+                      f'<html><body><table class="board_list"><tbody>{rows_html}</tbody></table></body></html>'))
+        pages.append((f'synthetic-detail-{i}',
+                      f'<html><head><script>var x = 1;</script></head><body><div class="b_content">{body}</div>'
+                      f'<div class="b_con_re"><div class="bcr_date">2024-01-02</div>'
+                      f'<div class="bcr_article">{body}</div></div></body></html>'))
+    return pages
+
+
+def extract(doc):
+    """crawler 가 실제로 뽑는 값들 (목록 행 + 상세 본문/답변/답변일)"""
+    rows = []
+    for row in doc.select("table.board_list tbody tr"):
+        try:
+            rows.append(parse_list_row(row, BASE_URL))
+        except ValueError:
+            rows.append(None)
+    return rows, parse_detail(doc, 'qna.asp')
+
+
+def normalize(value):
+    """공백 차이만 무시하고 비교하기 위한 정규화"""
+    if isinstance(value, str):
+        return ' '.join(value.split())
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {k: normalize(v) for k, v in value.items()}
+    return value
+
+
+def run(pages, backends, repeat):
+    baseline = {name: extract(html_parser.parse(html, 'bs4')) for name, html in pages}
+    total_bytes = sum(len(html.encode('utf-8')) for _, html in pages)
+    results = []
+    for backend in backends:
+        exact = same = 0
+        for name, html in pages:
+            output = extract(html_parser.parse(html, backend))
+            exact += output == baseline[name]
+            same += normalize(output) == normalize(baseline[name])
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for _, html in pages:
+                extract(html_parser.parse(html, backend))
+        elapsed = time.perf_counter() - started
+        results.append({
+            'backend': backend,
+            'pages_per_sec': len(pages) * repeat / elapsed,
+            'mb_per_sec': total_bytes * repeat / elapsed / 1e6,
+            'exact_match': exact,
+            'normalized_match': same,
+        })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTML 파서 백엔드 벤치마크 (처리량 + bs4 대비 결과 일치)")
+    parser.add_argument('paths', nargs='*', help="fixture HTML 파일 또는 폴더 (기본: debug_page.html, fixtures/)")
+    parser.add_argument('--synthetic', type=int, default=0, help="합성 목록/상세 페이지 쌍 개수")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--backends', nargs='*', default=html_parser.available_backends())
+    args = parser.parse_args(argv)
+
+    pages = load_fixtures(args.paths or DEFAULT_FIXTURES)
+    if args.synthetic:
+        pages += synthetic_pages(args.synthetic)
+    if not pages:
+        print("fixture 페이지가 없습니다. fetch_html.py 로 받거나 --synthetic N 을 지정하세요.")
+        return 1
+
+    print(f"페이지 {len(pages)}개, 반복 {args.repeat}회")
+    print(f"{'backend':<12}{'pages/s':>10}{'MB/s':>8}{'exact':>8}{'normalized':>12}")
+    for r in run(pages, args.backends, args.repeat):
+        print(f"{r['backend']:<12}{r['pages_per_sec']:>10.1f}{r['mb_per_sec']:>8.2f}"
+              f"{r['exact_match']:>5}/{len(pages):<3}{r['normalized_match']:>8}/{len(pages)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+import re
+import sys
+import time
+import argparse
+import markdown
+from drive_sync import render_doc_html, STYLED_TAGS, DOC_HTML_HEAD, DOC_HTML_TAIL, MARKDOWN_EXTENSIONS
+
+
+def legacy_render(content):
+    """이전 create_google_doc 방식 (호출마다 markdown 확장 로딩 + 태그별 전체 문자열 치환)"""
+    html_body = markdown.markdown(content, extensions=MARKDOWN_EXTENSIONS)
+    for tag in ('<table>', '<thead>', '<th>', '<td>'):
+        html_body = html_body.replace(tag, STYLED_TAGS[tag])
+    html_body = re.sub(r'(<th[^>]*>)(.*?)(</th>)',
+                       lambda m: m.group(1) + m.group(2).replace('<br>', ' ').replace('<br/>', ' ').replace('\n', ' ') + m.group(3),
+                       html_body,
+                       flags=re.DOTALL | re.IGNORECASE)
+    return f"{DOC_HTML_HEAD}{html_body}{DOC_HTML_TAIL}"
+
+
+def sample_document(tables, rows):
+    """보고서 형태의 마크다운 (표 여러 개 + 문단, 헤더에 줄바꿈/정렬 포함)"""
+    parts = ['# 내부회계관리제도 Q&A 정리\n']
+    for t in range(tables):
+        parts.append(f'\n## 주제 {t}\n\n설계 및 운영평가 관련 질의 요약입니다.\n답변 요지를 함께 정리했습니다.\n\n')
+        parts.append('| 번호 | 분류<br>구분 | 제목 | 처리현황 |\n|---|---|---|:---:|\n')
+        parts.extend(f'| {t * rows + r} | 내부회계 | 질문 제목 {r} 입니다 | 답변완료 |\n' for r in range(rows))
+    parts.append('\n<table><tr><th>원본<br>HTML</th></tr><tr><td>표</td></tr></table>\n')
+    return ''.join(parts)
+
+
+def timed(func, content, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(content)
+    return (time.perf_counter() - started) / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="create_google_doc HTML 변환 벤치마크 (이전 방식 대비)")
+    parser.add_argument('--tables', type=int, default=20)
+    parser.add_argument('--rows', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--docs', type=int, default=50, help="작은 문서 연속 생성 횟수 (변환기 재사용 효과)")
+    args = parser.parse_args(argv)
+
+    content = sample_document(args.tables, args.rows)
+    same = legacy_render(content) == render_doc_html(content)
+    print(f"큰 문서 {len(content.encode('utf-8')) / 1e6:.2f} MB (표 {args.tables}개 x {args.rows}행), 반복 {args.repeat}회")
+    legacy = timed(legacy_render, content, args.repeat)
+    current = timed(render_doc_html, content, args.repeat)
+    print(f"  이전 방식 {legacy * 1000:.1f} ms, 현재 {current * 1000:.1f} ms ({legacy / current:.2f}x), 결과 일치: {same}")
+
+    small = sample_document(1, 10)
+    same_small = legacy_render(small) == render_doc_html(small)
+    legacy = timed(legacy_render, small, args.docs)
+    current = timed(render_doc_html, small, args.docs)
+    print(f"작은 문서 {args.docs}개 연속")
+    print(f"  이전 방식 {legacy * 1000:.2f} ms/건, 현재 {current * 1000:.2f} ms/건 ({legacy / current:.2f}x), 결과 일치: {same_small}")
+    return 0 if same and same_small else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
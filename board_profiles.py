@@ -0,0 +1,62 @@
+# 게시판 형식별 선택자 프로필
+# crawler 의 목록/상세 파싱은 이 선택자만 보고 동작하므로, 같은 형식의 다른 게시판/사이트는
+# 설정 파일에서 profile 이름만 지정하면 되고, 테마가 조금 다르면 selectors 로 일부만 덮어쓴다.
+# 값이 None 인 선택자는 해당 항목이 없는 게시판 (빈 문자열로 채움).
+# multi_answer 는 선택자가 아닌 설정: True 면 답변 선택자에 맞는 요소를 모두 이어 붙이고, False 면 첫 번째만 쓴다.
+
+PROFILES = {
+    # www.k-icfr.org/sub/menu/qna.asp 형식 (답변이 본문 아래 .b_con_re 에 붙음)
+    'kicfr': {
+        'list_url': '{base_url}{board}?rWork=TblList&rType=0&rGotoPage={page}',
+        'list_ready': 'table.board_list',
+        'rows': 'table.board_list tbody tr',
+        'num': 'td.num',
+        'category': 'td.category',
+        'subject': 'td.subject a',
+        'name': 'td.name',
+        'date': 'td.date',
+        'condition': 'td.condition',
+        'detail_ready': '.b_content',
+        'question': '.b_content',
+        'answer': '.b_con_re .bcr_article',
+        'answer_date': '.b_con_re .bcr_date',
+        'multi_answer': False,
+    },
+    # 그누보드5 기본 스킨 (www.k-icfr.org/bbs/board.php?bo_table=sub05_0x, structure_check.py 참고)
+    # 답변은 댓글(#bo_vc article)로 달리며 여러 개면 모두 이어 붙인다.
+    'gnuboard': {
+        'list_url': '{base_url}board.php?bo_table={board}&page={page}',
+        'list_ready': 'table',
+        'rows': 'table tbody tr',
+        'num': 'td.td_num',
+        'category': '.bo_cate_link',
+        'subject': 'td.td_subject a[href*="wr_id="]',
+        'name': 'td.td_name',
+        'date': 'td.td_datetime, td.td_date',
+        'condition': None,
+        'detail_ready': '#bo_v_con',
+        'question': '#bo_v_con',
+        'answer': '#bo_vc article .cmt_contents',
+        'answer_date': None,
+        'multi_answer': True,
+    },
+}
+# 답변이 없는 FAQ 형 게시판
+PROFILES['kicfr-faq'] = dict(PROFILES['kicfr'], answer=None, answer_date=None)
+
+
+def get_profile(name, overrides=None):
+    """이름으로 프로필을 찾아 overrides(선택자 일부)를 덮어쓴 복사본 반환"""
+    if name not in PROFILES:
+        raise ValueError(f"알 수 없는 게시판 프로필입니다: {name} (가능: {', '.join(PROFILES)})")
+    profile = dict(PROFILES[name])
+    unknown = set(overrides or {}) - set(profile)
+    if unknown:
+        raise ValueError(f"프로필 '{name}' 에 없는 선택자입니다: {', '.join(sorted(unknown))}")
+    profile.update(overrides or {})
+    return profile
+
+
+def default_profile(page_name):
+    """기존 호출(프로필 없이 page_name 만)용 - 기존처럼 qna.asp 만 답변을 추출하고 나머지는 답변 없는 프로필"""
+    return PROFILES['kicfr'] if page_name == 'qna.asp' else PROFILES['kicfr-faq']
@@ -0,0 +1,178 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+# 크롤러와 같은 폴더에 상태 DB 저장
+DEFAULT_STATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'crawl_state.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    board TEXT NOT NULL,
+    num INTEGER NOT NULL,
+    content_hash TEXT,
+    last_seen REAL,
+    sheet_row INTEGER,
+    fingerprint TEXT,
+    PRIMARY KEY (board, num)
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    board TEXT PRIMARY KEY,
+    page INTEGER NOT NULL,
+    updated REAL
+);
+CREATE TABLE IF NOT EXISTS list_pages (
+    board TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    body_hash TEXT NOT NULL,
+    updated REAL,
+    PRIMARY KEY (board, page)
+)
+"""
+
+
+def content_hash(values):
+    """시트에 기록되는 값 목록의 해시 (내용 변경 여부 비교용)"""
+    raw = json.dumps([str(v) for v in values], ensure_ascii=False)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def fingerprint(title, date, condition):
+    """목록 행에서 보이는 값(제목, 등록일, 처리현황)의 지문 - 바뀌면 상세 페이지를 다시 수집"""
+    raw = '\x1f'.join(' '.join(str(v).split()) for v in (title, date, condition))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def parse_updated_rows(response):
+    """append_rows 응답의 updatedRange('Q&A'!A10:I12)에서 추가된 행 번호 목록 추출"""
+    try:
+        updated_range = response['updates']['updatedRange']
+    except (TypeError, KeyError):
+        return None
+    rows = [int(n) for n in re.findall(r'[A-Z]+(\d+)', updated_range.split('!')[-1])]
+    if not rows:
+        return None
+    return list(range(rows[0], rows[-1] + 1))
+
+
+class CrawlState:
+    """게시판 + 글번호 단위의 로컬 수집 상태 (SQLite)
+
+    중복 확인을 시트의 get_all_records() 대신 이 인덱스로 하고,
+    시트와의 대조(reconcile)는 처음이거나 요청했을 때만 한다.
+    """
+
+    def __init__(self, path=DEFAULT_STATE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.executescript(SCHEMA)
+            # fingerprint 컬럼이 없던 이전 DB 는 컬럼만 추가 (값은 reconcile 때 채움)
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(posts)")}
+            if 'fingerprint' not in columns:
+                self.conn.execute("ALTER TABLE posts ADD COLUMN fingerprint TEXT")
+
+    def count(self, board):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM posts WHERE board = ?", (board,)).fetchone()[0]
+
+    def known_nums(self, board):
+        """수집된 글번호 집합 (기존 existing_nums 와 같은 문자열 형식)"""
+        with self.lock:
+            rows = self.conn.execute("SELECT num FROM posts WHERE board = ?", (board,)).fetchall()
+        return {str(num) for (num,) in rows}
+
+    def fingerprints(self, board):
+        """{글번호(문자열): 목록 지문} - 지문이 없는 글은 제외"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT num, fingerprint FROM posts WHERE board = ? AND fingerprint IS NOT NULL",
+                (board,)).fetchall()
+        return {str(num): fp for num, fp in rows}
+
+    def missing_fingerprints(self, board):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM posts WHERE board = ? AND fingerprint IS NULL", (board,)).fetchone()[0]
+
+    def get(self, board, num):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT content_hash, last_seen, sheet_row, fingerprint FROM posts WHERE board = ? AND num = ?",
+                (board, int(num))).fetchone()
+        if row is None:
+            return None
+        return {'content_hash': row[0], 'last_seen': row[1], 'sheet_row': row[2], 'fingerprint': row[3]}
+
+    def record(self, board, entries):
+        """entries: (num, content_hash, sheet_row, fingerprint) 목록을 저장
+
+        sheet_row 나 fingerprint 가 None 이면 기존 값을 유지한다.
+        """
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.executemany(
+                """INSERT INTO posts (board, num, content_hash, last_seen, sheet_row, fingerprint)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(board, num) DO UPDATE SET
+                       content_hash = excluded.content_hash,
+                       last_seen = excluded.last_seen,
+                       sheet_row = COALESCE(excluded.sheet_row, posts.sheet_row),
+                       fingerprint = COALESCE(excluded.fingerprint, posts.fingerprint)""",
+                [(board, int(num), h, now, sheet_row, fp) for num, h, sheet_row, fp in entries])
+
+    def reconcile(self, board, worksheet, columns):
+        """시트 전체를 한 번 읽어 상태를 시트 기준으로 다시 맞춤"""
+        print(f"[{board}] 시트와 로컬 상태를 대조합니다...")
+        records = worksheet.get_all_records()
+        entries = []
+        for i, row in enumerate(records):
+            num = str(row.get('번호', '')).strip()
+            if not num.isdigit():
+                continue
+            # 헤더가 1행이므로 데이터는 2행부터
+            entries.append((num, content_hash([row.get(c, '') for c in columns]), i + 2,
+                            fingerprint(row.get('제목', ''), row.get('등록일', ''), row.get('처리현황', ''))))
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM posts WHERE board = ?", (board,))
+            # 시트 기준으로 다시 맞췄으므로 목록 페이지도 다시 확인
+            self.conn.execute("DELETE FROM list_pages WHERE board = ?", (board,))
+        self.record(board, entries)
+        print(f"[{board}] {len(entries)}건 동기화 완료.")
+        return len(entries)
+
+    def save_checkpoint(self, board, page):
+        """page 까지의 게시물이 모두 싱크에 반영되었음을 기록"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (board, page, updated) VALUES (?, ?, ?)",
+                (board, page, time.time()))
+
+    def load_checkpoint(self, board):
+        """중단된 수집의 마지막 완료 페이지 (없으면 None)"""
+        with self.lock:
+            row = self.conn.execute("SELECT page FROM checkpoints WHERE board = ?", (board,)).fetchone()
+        return row[0] if row else None
+
+    def clear_checkpoint(self, board):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM checkpoints WHERE board = ?", (board,))
+
+    def list_hashes(self, board):
+        """{목록 페이지: 본문 해시} - 그 본문의 글을 모두 반영한 페이지 (실행 사이에 유지)"""
+        with self.lock:
+            rows = self.conn.execute("SELECT page, body_hash FROM list_pages WHERE board = ?", (board,)).fetchall()
+        return dict(rows)
+
+    def save_list_hash(self, board, page, digest):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO list_pages (board, page, body_hash, updated) VALUES (?, ?, ?, ?)",
+                (board, page, digest, time.time()))
+
+    def close(self):
+        self.conn.close()
@@ -1,22 +1,64 @@
-import time
 import sys
 import os
 import re
 import pickle
+import argparse
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
 import gspread
 from google.auth.transport.requests import Request
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
+import html_parser
+import metrics
+import scheduler
+import structure_check
+from board_profiles import default_profile
+from fetcher import HttpFetcher, SeleniumFetcher, FallbackFetcher, as_fetcher
+from driver_pool import DriverPool, resolve_chromedriver
+from ratelimit import HostLimiter, AdaptiveDelay
+from crawl_state import CrawlState, DEFAULT_STATE_PATH, content_hash, fingerprint
+from sheet_writer import SheetWriter, CALLS_PER_MINUTE, shared_bucket
+from sinks import Pipeline, SheetSink, JsonlSink, SqliteSink, SearchSink, ArchiveSink, JsonlFile, SqliteStore
+from archive import PostArchive, DEFAULT_ARCHIVE_PATH
+from search_index import DEFAULT_INDEX_PATH
+from http_cache import ResponseCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, body_hash
 
 # --- 설정값 ---
 BASE_URL = "https://www.k-icfr.org/sub/menu/"
 SPREADSHEET_NAME = 'K-ICFR_Data'
+SHEET_COLUMNS = ['번호', '분류', '제목', '등록일', '작성자', '질문 본문', '답변 본문', '처리현황', 'URL']
+DETAIL_WORKERS = 4
+# 목록 페이지를 한 번에 미리 가져오는 수 (전체 수집 시)
+LIST_WINDOW = 4
+# 이 건수마다 싱크를 flush (페이지가 끝날 때도 flush 후 체크포인트 기록)
+FLUSH_EVERY = 50
+# k-icfr.org 요청 제한: 초당 2건, 동시 요청 최대 4건
+HOST_LIMITS = {'www.k-icfr.org': {'rate': 2.0, 'burst': 2, 'max_in_flight': 4}}
+# 요청 간 대기시간: 응답시간에 맞춰 0.2~30초 사이에서 자동 조절
+POLITENESS = {'initial': 1.0, 'min_delay': 0.2, 'max_delay': 30.0, 'name': 'k-icfr'}
+# 실행 요약(메트릭) 저장 위치 - 상태 DB 와 같은 폴더
+METRICS_PATH = os.path.join(os.path.dirname(DEFAULT_STATE_PATH), 'crawl_metrics.json')
+# 여러 게시판 작업이 동시에 시트/탭을 만들지 않도록 (같은 이름의 스프레드시트가 둘 생길 수 있음)
+SHEET_OPEN_LOCK = threading.Lock()
+# 클라이언트별로 한 번 연 워크시트 (daemon 에서 실행마다 시트 API 로 다시 찾지 않도록)
+OPEN_WORKSHEETS = weakref.WeakKeyDictionary()
+# 수집 설정 파일(--config)이 없을 때 수집하는 게시판 (형식은 scheduler.parse_config 참고)
+DEFAULT_JOBS = {
+    'max_jobs': scheduler.MAX_JOBS,
+    'hosts': HOST_LIMITS,
+    'boards': [
+        {'tab': 'Q&A', 'site': BASE_URL, 'board': 'qna.asp', 'profile': 'kicfr', 'max_pages': 96},
+        {'tab': 'FAQ', 'site': BASE_URL, 'board': 'faq.asp', 'profile': 'kicfr-faq', 'max_pages': 4},
+    ],
+}
+
+def default_tab(page_name):
+    """기본 수집 설정에서 page_name 게시판의 시트 탭 이름 (없으면 page_name 그대로)"""
+    for board in DEFAULT_JOBS['boards']:
+        if board['board'] == page_name:
+            return board['tab']
+    return page_name
 
 def get_google_sheet_client():
     """구글 시트 인증 및 클라이언트 반환 (User Auth with token.pickle)"""
@@ -39,7 +81,18 @@ def get_google_sheet_client():
     return client
 
 def open_worksheet(client, sheet_name, tab_name):
-    """스프레드시트와 탭을 엽니다."""
+    """스프레드시트와 탭을 엽니다. (한 번 연 탭은 같은 클라이언트에서 다시 찾지 않음)"""
+    with SHEET_OPEN_LOCK:
+        opened = OPEN_WORKSHEETS.setdefault(client, {})
+        if (sheet_name, tab_name) not in opened:
+            opened[(sheet_name, tab_name)] = _open_worksheet(client, sheet_name, tab_name)
+        return opened[(sheet_name, tab_name)]
+
+def forget_worksheets():
+    with SHEET_OPEN_LOCK:
+        OPEN_WORKSHEETS.clear()
+
+def _open_worksheet(client, sheet_name, tab_name):
     try:
         sh = client.open(sheet_name)
     except gspread.SpreadsheetNotFound:
@@ -51,12 +104,17 @@ def open_worksheet(client, sheet_name, tab_name):
         worksheet = sh.worksheet(tab_name)
     except gspread.WorksheetNotFound:
         worksheet = sh.add_worksheet(title=tab_name, rows="100", cols="10")
-        worksheet.append_row(['번호', '분류', '제목', '등록일', '작성자', '질문 본문', '답변 본문', '처리현황', 'URL'])
+        worksheet.append_row(SHEET_COLUMNS)
     
     return worksheet
 
 def init_driver():
     """Selenium 드라이버 초기화 (실제 브라우저처럼 보이기)"""
+    # Selenium 은 fallback 경로에서만 필요하므로 여기서 import
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
+
     chrome_options = Options()
     # headless를 쓰면 차단될 확률이 높으므로 일단 보면서 실행 (필요 시 headless 추가)
     chrome_options.add_argument("--headless") 
@@ -64,211 +122,668 @@ def init_driver():
     chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option('useAutomationExtension', False)
+    # 여러 개를 띄워도 메모리를 덜 쓰도록 (본문만 필요하므로 이미지도 받지 않음)
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
     
-    service = Service(ChromeDriverManager().install())
+    # chromedriver 경로는 캐시해 두고 재사용 (매번 ChromeDriverManager 조회/다운로드 방지)
+    service = Service(resolve_chromedriver())
     driver = webdriver.Chrome(service=service, options=chrome_options)
+    driver.set_page_load_timeout(30)
     return driver
 
-def crawl_board_selenium(driver, page_name, max_pages=3, existing_nums=None):
-    """Selenium을 이용한 게시판 크롤링"""
+def _cell_text(row, selector):
+    """행에서 셀 텍스트 추출 (Selenium .text 처럼 공백 정리), 없으면 빈 문자열"""
+    if selector is None:
+        return ""
+    cell = row.select_one(selector)
+    if cell is None:
+        return ""
+    return ' '.join(cell.get_text().split())
+
+def parse_list_row(row, base_url, profile=None):
+    """목록 행(tr)에서 게시물 정보 추출 - 번호가 없는 행(공지 등)은 None
+
+    profile(board_profiles) 의 선택자를 쓰며, 없으면 k-icfr 게시판 선택자를 쓴다.
+    """
+    profile = profile or default_profile(None)
+    num_str = _cell_text(row, profile['num'])
+    if not num_str.isdigit():
+        return None
+
+    subject_elem = row.select_one(profile['subject'])
+    if subject_elem is None:
+        raise ValueError(f"{num_str}번 행에 제목 링크가 없습니다.")
+
+    return {
+        'num': int(num_str),
+        'title': ' '.join(subject_elem.get_text().split()),
+        'link': urljoin(base_url, subject_elem.get('href', '')),
+        'date': _cell_text(row, profile['date']),
+        'category': _cell_text(row, profile['category']),
+        'name': _cell_text(row, profile['name']),
+        'condition': _cell_text(row, profile['condition'])
+    }
+
+def parse_detail(soup, page_name, profile=None):
+    """상세 페이지(파싱된 문서)에서 (질문 본문, 답변 본문) 추출
+
+    profile 이 없으면 page_name 으로 정함 (qna.asp 만 답변 있음).
+    답변은 첫 번째 요소만 쓰고 답변 요소가 있으면 답변일을 앞에 붙인다. multi_answer 프로필(댓글형
+    답변)은 선택자에 맞는 요소를 모두 빈 줄로 이어 붙인다.
+    """
+    profile = profile or default_profile(page_name)
+    question_body = ""
+    answer_body = ""
+
+    # 본문 추출
+    q_div = soup.select_one(profile['question'])
+    if q_div:
+        question_body = q_div.get_text(separator='\n').strip()
+
+    # 답변 추출
+    if profile['answer'] and profile.get('multi_answer'):
+        answers = [a.get_text(separator='\n').strip() for a in soup.select(profile['answer'])]
+        answer_body = '\n\n'.join(a for a in answers if a)
+    elif profile['answer']:
+        a_div = soup.select_one(profile['answer'])
+        if a_div:
+            answer_body = a_div.get_text(separator='\n').strip()
+            # 답변 날짜가 있으면 추가
+            a_date = soup.select_one(profile['answer_date']) if profile['answer_date'] else None
+            if a_date:
+                answer_body = f"[답변일: {a_date.get_text().strip()}]\n{answer_body}"
+
+    return question_body, answer_body
+
+def build_result(item, question_body, answer_body):
+    """시트 컬럼 순서에 맞춘 결과 dict"""
+    return {
+        '번호': item['num'],
+        '분류': item['category'],
+        '제목': item['title'],
+        '등록일': item['date'],
+        '작성자': item['name'],
+        '질문 본문': question_body,
+        '답변 본문': answer_body,
+        '처리현황': item['condition'],
+        'URL': item['link']
+    }
+
+def fetch_detail(fetcher, item, page_name, profile=None):
+    """상세 페이지 하나를 가져와 결과 dict 반환 (실패 시 None)"""
+    profile = profile or default_profile(page_name)
+    try:
+        with metrics.timer('detail_fetch'):
+            detail_page = fetcher.get(item['link'], wait_for=profile['detail_ready'])
+
+        question_body, answer_body = parse_detail(detail_page.doc, page_name, profile)
+        return build_result(item, question_body, answer_body)
+
+    except Exception as e:
+        print(f"    상세 페이지({item['num']}) 에러: {e}")
+        metrics.inc('errors_total', stage='detail_fetch', reason=type(e).__name__)
+        return None
+
+def item_fingerprint(item):
+    """목록 행(item) 또는 결과 dict 의 지문"""
+    if '제목' in item:
+        return fingerprint(item['제목'], item['등록일'], item['처리현황'])
+    return fingerprint(item['title'], item['date'], item['condition'])
+
+def list_url(page_name, page, base_url=BASE_URL, profile=None):
+    profile = profile or default_profile(page_name)
+    return profile['list_url'].format(base_url=base_url, board=page_name, page=page)
+
+def page_nums(list_page, profile=None):
+    """목록 페이지의 글번호 목록 (공지 등 번호 없는 행 제외)"""
+    profile = profile or default_profile(None)
+    nums = []
+    for row in list_page.doc.select(profile['rows']):
+        num = _cell_text(row, profile['num'])
+        if num.isdigit():
+            nums.append(int(num))
+    return nums
+
+def find_last_page(fetch_page, lo, hi, max_known=0, profile=None):
+    """[lo, hi] 에서 '비어 있거나 모든 글번호가 max_known 이하'인 첫 페이지를 이분 탐색 (없으면 hi)
+
+    글번호는 뒤 페이지로 갈수록 작아지므로 이 조건은 단조적이다. max_known=0 이면 게시판의 끝을 찾는다.
+    """
+    while lo < hi:
+        mid = (lo + hi) // 2
+        nums = page_nums(fetch_page(mid), profile)
+        if not nums or max(nums) <= max_known:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+def iter_list_pages(fetch_page, start_page, max_pages, window=1, last_page=None):
+    """목록 페이지를 window 개씩 병렬로 미리 가져와 페이지 순서대로 (page, Page) 를 yield
+
+    last_page(예상 마지막 페이지) 이후는 한 페이지씩만 가져와 중단될 때 낭비를 줄인다.
+    소비자가 중간에 멈추면(조기 중단) 아직 시작하지 않은 요청은 취소한다.
+    """
+    last_page = min(last_page or max_pages, max_pages)
+    executor = ThreadPoolExecutor(max_workers=max(1, window))
+    futures = {}
+    next_submit = start_page
+    try:
+        for page in range(start_page, max_pages + 1):
+            limit = page + window - 1 if page + window - 1 <= last_page else max(page, last_page)
+            while next_submit <= min(limit, max_pages):
+                futures[next_submit] = executor.submit(fetch_page, next_submit)
+                next_submit += 1
+            yield page, futures.pop(page).result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def iter_board(fetcher, page_name, max_pages=3, existing_nums=None, workers=DETAIL_WORKERS,
+               known_fingerprints=None, start_page=1, on_page_done=None, list_window=LIST_WINDOW,
+               base_url=BASE_URL, profile=None, list_hashes=None, on_list_done=None):
+    """게시판을 크롤링하며 파싱된 게시물을 하나씩 yield (전체 결과를 메모리에 모으지 않음)
+
+    상세 페이지는 workers 개 스레드로 동시에 가져오되 결과는 게시판 순서를 유지한다.
+
+    known_fingerprints({글번호: 지문})를 넘기면 갱신 모드로 동작한다. 이미 수집된 글도
+    목록의 제목/등록일/처리현황 지문이 바뀌었으면 상세 페이지를 다시 가져와 결과에 포함하고,
+    오래된 글의 답변 상태 변경도 잡기 위해 중복 페이지에서 멈추지 않고 max_pages 까지 본다.
+
+    start_page 가 1보다 크면 중단된 수집을 이어가는 것이므로 마찬가지로 중복 페이지에서 멈추지 않는다.
+    on_page_done(page) 은 한 페이지의 게시물을 모두 yield 한 뒤 호출된다 (체크포인트용).
+
+    새 글이 많을 때(전체 수집, 갱신/재개, 첫 페이지가 모두 새 글)는 필요한 마지막 페이지를
+    글번호 이분 탐색으로 먼저 찾고 그때까지의 목록 페이지를 list_window 개씩 병렬로 가져온다.
+    새 글이 적은 평상시 증분 수집은 지금처럼 한 페이지씩 보다가 중복 페이지에서 멈춘다.
+
+    base_url 은 녹화한 페이지를 재생하는 로컬 서버(replay.py)로 수집할 때 바꾼다.
+    profile 은 게시판 형식별 선택자 (board_profiles, 없으면 page_name 으로 k-icfr 프로필 선택).
+
+    list_hashes({페이지: 본문 해시})는 이전 실행에서 글을 모두 반영한 목록 페이지들이다. 본문이
+    그대로인 페이지는 파싱하지 않고 건너뛰며(증분 수집이면 거기서 종료), 새로 모두 반영한 페이지는
+    on_list_done(page, 해시) 로 알린다 (상태 DB 에 저장해 다음 실행에서 사용).
+    """
+    profile = profile or default_profile(page_name)
     if existing_nums is None:
         existing_nums = set()
-        
-    print(f"[{page_name}] 크롤링 시작...")
-    results = []
+    stop_on_duplicate = known_fingerprints is None and start_page == 1
+    def unchanged(page, list_page):
+        return list_hashes is not None and list_hashes.get(page) == body_hash(list_page.html)
+
+    print(f"[{page_name}] 크롤링 시작... (백엔드: {fetcher.name})")
     
     # page_name: 'qna.asp' or 'faq.asp'
-    base_page_url = f"{BASE_URL}{page_name}"
-    
-    for page in range(1, max_pages + 1):
-        print(f"  - {page} 페이지 이동 중...")
-        target_url = f"{base_page_url}?rWork=TblList&rType=0&rGotoPage={page}"
-        driver.get(target_url)
-        time.sleep(2)
+    # 이분 탐색 중 가져온 페이지는 다시 요청하지 않도록 보관
+    prefetched = {}
+    def fetch_list_page(page):
+        if page in prefetched:
+            return prefetched.pop(page)
+        with metrics.timer('list_fetch'):
+            return fetcher.get(list_url(page_name, page, base_url, profile), wait_for=profile['list_ready'])
+    def probe(page):
+        if page not in prefetched:
+            prefetched[page] = fetch_list_page(page)
+        return prefetched[page]
+
+    window = max(1, min(list_window, fetcher.max_concurrency))
+    last_page = None
+    # 첫 페이지가 그대로면 새 글이 없으므로 이분 탐색(첫 페이지 파싱)도 하지 않음
+    if window > 1 and max_pages - start_page + 1 > window and not (
+            stop_on_duplicate and unchanged(start_page, probe(start_page))):
+        max_known = max((int(n) for n in existing_nums), default=0) if stop_on_duplicate else 0
+        first_nums = page_nums(probe(start_page), profile)
+        if not stop_on_duplicate or not any(str(n) in existing_nums for n in first_nums):
+            last_page = find_last_page(probe, start_page, max_pages, max_known, profile)
+            print(f"  - 이분 탐색 결과 {last_page} 페이지까지 수집 예정 (목록 {window}페이지씩 병렬)")
+    if last_page is None:
+        window = 1
+
+    pool_size = max(1, min(workers, fetcher.max_concurrency))
+    with ThreadPoolExecutor(max_workers=pool_size) as executor:
+        for page, list_page in iter_list_pages(fetch_list_page, start_page, max_pages, window, last_page):
+            print(f"  - {page} 페이지 처리 중...")
+            metrics.inc('pages_total', board=page_name)
+
+            if unchanged(page, list_page):
+                metrics.inc('skipped_pages_total', board=page_name)
+                if stop_on_duplicate:
+                    print("    지난 수집 이후 바뀌지 않은 목록입니다. 크롤링을 중단합니다.")
+                    break
+                print("    지난 수집 이후 바뀌지 않은 목록입니다.")
+                if on_page_done:
+                    on_page_done(page)
+                continue
+            complete = True
         
-        rows = driver.find_elements(By.CSS_SELECTOR, "table.board_list tbody tr")
+            rows = list_page.doc.select(profile['rows'])
         
-        if not rows:
-            print("    게시물이 없습니다.")
-            break
+            if not rows:
+                print("    게시물이 없습니다.")
+                break
             
-        items_to_crawl = []
-        all_duplicate = True
+            items_to_crawl = []
+            all_duplicate = True
         
-        for row in rows:
-            try:
-                num_elem = row.find_element(By.CSS_SELECTOR, "td.num")
-                num_str = num_elem.text.strip()
-                if not num_str.isdigit(): continue
-                
-                num = int(num_str)
-                
-                # 이미 수집된 번호면 스킵
-                if str(num) in existing_nums:
-                    continue
-                
-                all_duplicate = False
-                
-                subject_elem = row.find_element(By.CSS_SELECTOR, "td.subject a")
-                title = subject_elem.text.strip()
-                link = subject_elem.get_attribute("href")
-                date = row.find_element(By.CSS_SELECTOR, "td.date").text.strip()
-                
+            for row in rows:
                 try:
-                   category = row.find_element(By.CSS_SELECTOR, "td.category").text.strip()
-                except: category = ""
+                    item = parse_list_row(row, list_page.url, profile)
+                    if item is None: continue
                 
-                try:
-                    name = row.find_element(By.CSS_SELECTOR, "td.name").text.strip()
-                except: name = ""
-                
-                try:
-                    condition = row.find_element(By.CSS_SELECTOR, "td.condition").text.strip()
-                except: condition = ""
+                    # 이미 수집된 번호면 스킵 (갱신 모드에서는 지문이 바뀐 글만 다시 수집)
+                    if str(item['num']) in existing_nums:
+                        known = known_fingerprints.get(str(item['num'])) if known_fingerprints is not None else None
+                        if known is None or known == item_fingerprint(item):
+                            metrics.inc('skipped_total', board=page_name)
+                            continue
+                        print(f"    {item['num']}번 글 변경 감지 (처리현황: {item['condition']})")
                 
-                items_to_crawl.append({
-                    'num': num,
-                    'title': title,
-                    'link': link,
-                    'date': date,
-                    'category': category,
-                    'name': name,
-                    'condition': condition
-                })
-            except Exception as e:
-                print(f"ROW 파싱 에러: {e}")
-                continue
+                    all_duplicate = False
+                    items_to_crawl.append(item)
+                except Exception as e:
+                    print(f"ROW 파싱 에러: {e}")
+                    metrics.inc('errors_total', stage='list_parse', reason=type(e).__name__)
+                    complete = False
+                    continue
         
-        if all_duplicate and rows:
-            print("    현재 페이지의 모든 항목이 이미 수집되었습니다. 크롤링을 중단합니다.")
-            break
-            
-        if not items_to_crawl:
-            print("    수집할 새 항목이 없습니다.")
-            continue
+            if all_duplicate and rows and stop_on_duplicate:
+                print("    현재 페이지의 모든 항목이 이미 수집되었습니다. 크롤링을 중단합니다.")
+                if complete and on_list_done:
+                    on_list_done(page, body_hash(list_page.html))
+                break
             
-        print(f"    {len(items_to_crawl)}개의 새 항목을 발견했습니다. 상세 수집 시작...")
+            if not items_to_crawl:
+                print("    수집할 새 항목이 없습니다.")
+            else:
+                print(f"    {len(items_to_crawl)}개의 새(변경) 항목을 발견했습니다. 상세 수집 시작...")
         
-        for item in items_to_crawl:
-            try:
-                driver.get(item['link'])
-                time.sleep(1.5)
-                
-                soup = BeautifulSoup(driver.page_source, 'html.parser')
-                
-                question_body = ""
-                answer_body = ""
-                
-                if page_name == 'qna.asp':
-                    # Q&A 본문 추출
-                    q_div = soup.select_one('.b_content')
-                    if q_div:
-                        question_body = q_div.get_text(separator='\n').strip()
-                    
-                    # Q&A 답변 추출
-                    a_div = soup.select_one('.b_con_re .bcr_article')
-                    if a_div:
-                        answer_body = a_div.get_text(separator='\n').strip()
-                        # 답변 날짜가 있으면 추가
-                        a_date = soup.select_one('.b_con_re .bcr_date')
-                        if a_date:
-                            answer_body = f"[답변일: {a_date.get_text().strip()}]\n{answer_body}"
-                else:
-                    # FAQ 본문 추출
-                    f_div = soup.select_one('.b_content')
-                    if f_div:
-                        question_body = f_div.get_text(separator='\n').strip()
-                
-                results.append({
-                    '번호': item['num'],
-                    '분류': item['category'],
-                    '제목': item['title'],
-                    '등록일': item['date'],
-                    '작성자': item['name'],
-                    '질문 본문': question_body,
-                    '답변 본문': answer_body,
-                    '처리현황': item['condition'],
-                    'URL': item['link']
-                })
-                
-            except Exception as e:
-                print(f"    상세 페이지({item['num']}) 에러: {e}")
-                
+                # executor.map 은 입력 순서대로 결과를 돌려주므로 시트에 쌓이는 순서가 매번 같다
+                for result in executor.map(lambda item: fetch_detail(fetcher, item, page_name, profile), items_to_crawl):
+                    if result is None:
+                        complete = False
+                        continue
+                    metrics.inc('posts_total', board=page_name)
+                    yield result
+
+            if on_page_done:
+                on_page_done(page)
+            # 상세 수집에 실패한 글이 있으면 다음 실행에서 다시 보도록 기록하지 않음
+            if complete and on_list_done:
+                on_list_done(page, body_hash(list_page.html))
+
+def crawl_board_selenium(driver, page_name, max_pages=3, existing_nums=None, workers=DETAIL_WORKERS,
+                         known_fingerprints=None, base_url=BASE_URL, archive=None, board=None):
+    """게시판 크롤링 결과를 리스트로 반환 (iter_board 의 일괄 수집 버전)
+
+    driver 에는 fetcher(HttpFetcher 등) 또는 기존처럼 Selenium WebDriver 를 넘길 수 있다.
+    archive(PostArchive)를 넘기면 결과 원문을 board 키로 보관한다. sync_board 와 같은 글이 같은 키로
+    들어가도록 board 는 시트 탭 이름이며, 없으면 DEFAULT_JOBS 에서 page_name 에 해당하는 탭을 쓴다.
+    """
+    results = list(iter_board(as_fetcher(driver), page_name, max_pages=max_pages, existing_nums=existing_nums,
+                              workers=workers, known_fingerprints=known_fingerprints, base_url=base_url))
+    if archive is not None:
+        archive.add(board or default_tab(page_name), results)
+        archive.flush()
     return results
 
-def update_sheet_data(worksheet, new_data):
-    """시트에 데이터 업데이트 (중복 방지)"""
+def to_sheet_row(item):
+    """결과 dict 를 시트 행(SHEET_COLUMNS 순서)으로 변환"""
+    return [
+        item['번호'],
+        item['분류'],
+        item['제목'],
+        item['등록일'],
+        item['작성자'],
+        item['질문 본문'][:30000], # 셀 용량 제한 고려
+        item['답변 본문'][:30000],
+        item['처리현황'],
+        item['URL']
+    ]
+
+def update_sheet_data(worksheet, new_data, state=None, board=None, writer=None):
+    """시트에 데이터 업데이트 (중복 방지)
+
+    state(CrawlState)를 넘기면 시트 전체를 읽지 않고 로컬 상태로 중복을 확인하고,
+    추가한 행 번호와 내용 해시를 청크가 커밋될 때마다 상태에 기록한다. 이미 있는 글의
+    내용이 바뀌었으면(갱신 모드 결과) 기존 행을 batch_update 로 덮어쓴다 (A열 번호로 행 위치를 확인한 뒤).
+    쓰기는 writer(SheetWriter)를 통해 청크/재시도/쿼터 조절된다.
+    """
+    if writer is None:
+        writer = SheetWriter(worksheet)
     if not new_data:
         print("업데이트할 데이터가 없습니다.")
         return
     
-    # 기존 데이터 로드
-    existing_records = worksheet.get_all_records()
-    existing_nums = set()
-    for row in existing_records:
-        if '번호' in row:
-            existing_nums.add(str(row['번호']))
-    
-    to_add = []
-    print(f"기존 {len(existing_nums)}건. 중복 확인 중...")
-    
-    count = 0
-    for item in new_data:
-        if str(item['번호']) not in existing_nums:
-            row = [
-                item['번호'],
-                item['분류'],
-                item['제목'],
-                item['등록일'],
-                item['작성자'],
-                item['질문 본문'][:30000], # 셀 용량 제한 고려
-                item['답변 본문'][:30000],
-                item['처리현황'],
-                item['URL']
-            ]
-            to_add.append(row)
-            existing_nums.add(str(item['번호']))
-            count += 1
+    with metrics.timer('dedup'):
+        # 기존 데이터 로드
+        if state is not None:
+            existing_nums = state.known_nums(board)
+        else:
+            existing_records = worksheet.get_all_records()
+            existing_nums = set()
+            for row in existing_records:
+                if '번호' in row:
+                    existing_nums.add(str(row['번호']))
+
+        to_add = []
+        to_update = []
+        print(f"기존 {len(existing_nums)}건. 중복 확인 중...")
+
+        count = 0
+        for item in new_data:
+            if str(item['번호']) not in existing_nums:
+                to_add.append(to_sheet_row(item))
+                existing_nums.add(str(item['번호']))
+                count += 1
+            elif state is not None:
+                row = to_sheet_row(item)
+                saved = state.get(board, item['번호'])
+                if saved and saved['sheet_row'] and saved['content_hash'] != content_hash(row):
+                    to_update.append((saved['sheet_row'], row))
             
     if to_add:
         # 역순 정렬해서 넣고 싶다면 여기서 sort. (보통 최신순 수집이니 그대로)
-        worksheet.append_rows(to_add)
+        writer.append_rows(to_add, on_commit=state_recorder(state, board))
         print(f"{count}건 추가 완료.")
     else:
         print("추가된 데이터가 없습니다.")
 
-def main():
-    print("=== K-ICFR 크롤러 (Selenium) 시작 ===")
+    if to_update:
+        to_update = locate_rows(worksheet, to_update)
+    if to_update:
+        last_col = chr(ord('A') + len(SHEET_COLUMNS) - 1)
+        writer.batch_update([{'range': f"A{sheet_row}:{last_col}{sheet_row}", 'values': [row]}
+                             for sheet_row, row in to_update])
+        state.record(board, [(row[0], content_hash(row), sheet_row, row_fingerprint(row))
+                             for sheet_row, row in to_update])
+        print(f"{len(to_update)}건 갱신 완료.")
+
+def locate_rows(worksheet, to_update):
+    """(저장된 행 번호, 행) 목록을 시트 A열(번호)로 확인해 실제 행 번호로 고침
+
+    누가 시트를 정렬하거나 행을 넣고 지웠으면 저장된 행 번호에 다른 글이 있으므로,
+    A열에서 그 번호를 다시 찾아 그 행을 갱신하고 시트에서 찾을 수 없는 글은 건너뛴다.
+    """
+    positions = {}
+    for i, value in enumerate(worksheet.col_values(1)):
+        positions.setdefault(str(value).strip(), i + 1)
+    located = []
+    moved = 0
+    for sheet_row, row in to_update:
+        actual = positions.get(str(row[0]))
+        if actual is None:
+            print(f"    {row[0]}번 글을 시트에서 찾을 수 없어 갱신하지 않습니다.")
+            metrics.inc('errors_total', stage='sheet_update', reason='row_missing')
+            continue
+        if actual != sheet_row:
+            moved += 1
+        located.append((actual, row))
+    if moved:
+        print(f"    시트 행 위치가 바뀐 글 {moved}건은 현재 위치로 갱신합니다.")
+    return located
+
+def state_recorder(state, board):
+    """SheetWriter 청크 커밋 시 추가된 행을 로컬 상태에 기록하는 콜백 (state 가 없으면 None)"""
+    if state is None:
+        return None
+    def on_commit(rows, sheet_rows):
+        state.record(board, [(row[0], content_hash(row), sheet_row, row_fingerprint(row))
+                             for row, sheet_row in zip(rows, sheet_rows)])
+    return on_commit
+
+def row_fingerprint(row):
+    """시트 행(SHEET_COLUMNS 순서)의 목록 지문"""
+    return fingerprint(row[2], row[3], row[7])
+
+def create_fetcher(backend='http', workers=DETAIL_WORKERS, drivers=1, limiter=None, delay=None, cache=None):
+    """수집 백엔드 생성 - 기본은 HTTP, 실패 시에만 Selenium 으로 전환
+
+    Selenium 은 drivers 개짜리 드라이버 풀을 쓰며, 풀은 게시판 사이에서 재사용된다.
+    여러 호스트를 함께 수집할 때는 limiter 를 공유하고 delay 는 호스트별로 넘긴다.
+    cache(http_cache.ResponseCache)는 HTTP 경로에서만 쓴다.
+    """
+    limiter = limiter or HostLimiter(overrides=HOST_LIMITS)
+    # 폴백으로 전환되어도 같은 서버이므로 대기시간 상태를 공유
+    delay = delay or AdaptiveDelay(**POLITENESS)
+    selenium = SeleniumFetcher(limiter=limiter, delay=delay, pool=DriverPool(init_driver, size=max(drivers, 1)))
+    if backend == 'selenium':
+        return selenium
+    http = HttpFetcher(pool_size=max(workers, 1), limiter=limiter, delay=delay, cache=cache)
+    return FallbackFetcher(http, selenium)
+
+def host_fetchers(jobs, hosts, args, cache=None):
+    """호스트별 fetcher - 같은 호스트의 게시판들은 요청 제한과 대기시간을 공유"""
+    limiter = HostLimiter(overrides=hosts)
+    fetchers = {}
+    for job in jobs:
+        if job.host not in fetchers:
+            politeness = {**POLITENESS, **hosts.get(job.host, {}).get('delay', {}), 'name': job.host}
+            fetchers[job.host] = create_fetcher(args.backend, args.workers, args.drivers,
+                                                limiter=limiter, delay=AdaptiveDelay(**politeness), cache=cache)
+    return fetchers
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="K-ICFR 게시판 크롤러")
+    parser.add_argument('--backend', choices=['http', 'selenium'], default='http',
+                        help="수집 백엔드 (기본: http, 실패 시 selenium 으로 자동 전환)")
+    parser.add_argument('--workers', type=int, default=DETAIL_WORKERS,
+                        help=f"상세 페이지 동시 수집 스레드 수 (기본: {DETAIL_WORKERS})")
+    parser.add_argument('--parser', choices=html_parser.available_backends(), default=html_parser.DEFAULT_BACKEND,
+                        help=f"HTML 파서 백엔드 (기본: 설치된 것 중 가장 빠른 {html_parser.DEFAULT_BACKEND})")
+    parser.add_argument('--drivers', type=int, default=1,
+                        help="Selenium 경로에서 동시에 띄울 브라우저 수 (기본: 1)")
+    parser.add_argument('--reconcile', action='store_true',
+                        help="로컬 수집 상태를 시트 전체와 다시 대조 (상태가 비어 있으면 자동 수행)")
+    parser.add_argument('--refresh', action='store_true',
+                        help="이미 수집한 글도 목록 지문(제목/등록일/처리현황)이 바뀌면 다시 수집해 시트 행을 갱신")
+    parser.add_argument('--list-window', type=int, default=LIST_WINDOW,
+                        help=f"전체 수집 시 목록 페이지를 병렬로 가져오는 수 (기본: {LIST_WINDOW})")
+    parser.add_argument('--flush-every', type=int, default=FLUSH_EVERY,
+                        help=f"싱크 flush 주기 (게시물 건수, 기본: {FLUSH_EVERY})")
+    parser.add_argument('--sheet-calls-per-minute', type=int, default=CALLS_PER_MINUTE,
+                        help=f"시트 쓰기 API 호출 속도 제한 (분당, 기본: {CALLS_PER_MINUTE})")
+    parser.add_argument('--config', default=scheduler.DEFAULT_CONFIG_PATH,
+                        help=f"수집할 게시판/호스트 제한 설정 JSON (기본: {os.path.basename(scheduler.DEFAULT_CONFIG_PATH)}, "
+                             "없으면 Q&A/FAQ)")
+    parser.add_argument('--jobs', type=int,
+                        help="동시에 수집할 게시판 수 (기본: 설정 파일의 max_jobs)")
+    parser.add_argument('--only', nargs='+', metavar='TAB',
+                        help="설정 중 이 탭 이름의 게시판만 수집")
+    parser.add_argument('--cache', default=DEFAULT_CACHE_DIR,
+                        help=f"페이지 캐시 폴더 (기본: {os.path.basename(DEFAULT_CACHE_DIR)}, 조건부 요청/변경 없는 페이지 재파싱 생략)")
+    parser.add_argument('--no-cache', dest='cache', action='store_const', const=None, help="페이지 캐시 안 씀")
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help=f"페이지 캐시 최대 크기 (MB, 기본: {DEFAULT_MAX_BYTES // (1024 * 1024)})")
+    parser.add_argument('--preflight', action='store_true',
+                        help="수집 전에 게시판 구조(선택자)를 점검해 맞지 않는 게시판은 건너뜀 (structure_check.py)")
+    parser.add_argument('--jsonl', help="수집한 게시물을 이 JSONL 파일에도 기록")
+    parser.add_argument('--sqlite', help="수집한 게시물을 이 SQLite 파일에도 기록")
+    parser.add_argument('--archive', default=DEFAULT_ARCHIVE_PATH,
+                        help=f"본문을 자르지 않고 압축 보관할 파일 (기본: {os.path.basename(DEFAULT_ARCHIVE_PATH)})")
+    parser.add_argument('--no-archive', dest='archive', action='store_const', const=None,
+                        help="원문 보관 안 함")
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH,
+                        help=f"수집한 게시물을 이 전문 검색 색인에도 반영 (기본: {os.path.basename(DEFAULT_INDEX_PATH)}, "
+                             "기존 글은 search_index.py build --sheet 로 한 번 색인)")
+    parser.add_argument('--no-index', dest='index', action='store_const', const=None,
+                        help="검색 색인 갱신 안 함")
+    parser.add_argument('--metrics', default=METRICS_PATH,
+                        help=f"실행 요약(단계별 시간, 카운터) JSON 저장 경로 (기본: {os.path.basename(METRICS_PATH)})")
+    parser.add_argument('--prometheus', help="메트릭을 Prometheus 텍스트 형식으로도 저장 (textfile collector 용)")
+    return parser.parse_args(argv)
+
+def journal_path(tab_name):
+    """탭별 시트 적재 진행상황 파일 (상태 DB 와 같은 폴더)"""
+    safe_name = re.sub(r'\W+', '_', tab_name)
+    return os.path.join(os.path.dirname(DEFAULT_STATE_PATH), f'sheet_journal_{safe_name}.json')
+
+def sync_board(fetcher, client, state, tab_name, page_name, max_pages, args, base_url=BASE_URL, profile=None,
+               archive=None, stop=None, jsonl=None, sqlite=None):
+    """게시판 하나를 수집해 시트 탭에 반영 (중복 확인은 로컬 상태 사용)
+
+    jsonl(JsonlFile)/sqlite(SqliteStore)는 여러 게시판 작업이 함께 쓰는 출력 (없으면 args 경로로 따로 엶).
+    """
+    worksheet = open_worksheet(client, SPREADSHEET_NAME, tab_name)
+    # 동시에 도는 게시판 작업들이 쓰기 쿼터(사용자 단위)를 나눠 쓰도록 공용 버킷 사용
+    writer = SheetWriter(worksheet, calls_per_minute=args.sheet_calls_per_minute,
+                         journal_path=journal_path(tab_name), bucket=shared_bucket(args.sheet_calls_per_minute))
     
-    driver = init_driver()
-    client = get_google_sheet_client()
+    # 처음 실행했거나 요청했을 때만 시트 전체를 읽어 상태를 맞춤
+    # (갱신 모드인데 지문이 없는 이전 상태라면 지문을 채우기 위해 한 번 대조)
+    if (args.reconcile or state.count(tab_name) == 0
+            or (args.refresh and state.missing_fingerprints(tab_name))):
+        state.reconcile(tab_name, worksheet, SHEET_COLUMNS)
+    # 이전 실행에서 중간에 끊긴 적재가 있으면 이어서 보냄
+    if writer.pending():
+        writer.resume(on_commit=state_recorder(state, tab_name))
+    existing_nums = state.known_nums(tab_name)
+    known_fingerprints = state.fingerprints(tab_name) if args.refresh else None
     
+    # 이전 수집이 중간에 끊겼으면 마지막 체크포인트 다음 페이지부터 이어서 수집
+    checkpoint = state.load_checkpoint(tab_name)
+    start_page = checkpoint + 1 if checkpoint else 1
+    if checkpoint:
+        print(f"[{tab_name}] 중단된 수집을 {start_page} 페이지부터 재개합니다.")
+
+    sinks = [SheetSink(worksheet, state=state, board=tab_name, writer=writer)]
+    if args.jsonl:
+        sinks.append(JsonlSink(jsonl or args.jsonl, board=tab_name))
+    if args.sqlite:
+        sinks.append(SqliteSink(sqlite or args.sqlite, board=tab_name))
+    if archive is not None:
+        sinks.append(ArchiveSink(archive, board=tab_name))
+    if args.index:
+        sinks.append(SearchSink(args.index, board=tab_name))
+    pipeline = Pipeline(sinks, flush_every=args.flush_every,
+                        on_checkpoint=lambda page: state.save_checkpoint(tab_name, page))
+
+    def page_done(page):
+        pipeline.checkpoint(page)
+        # 체크포인트까지 기록한 뒤에만 멈추므로 처리 중이던 묶음을 잃지 않음
+        if stop is not None and stop.is_set():
+            raise CrawlStopped(page)
+    
+    posts = iter_board(fetcher, page_name, max_pages=max_pages, existing_nums=existing_nums,
+                       workers=args.workers, known_fingerprints=known_fingerprints,
+                       start_page=start_page, on_page_done=page_done, list_window=args.list_window,
+                       base_url=base_url, profile=profile, list_hashes=state.list_hashes(tab_name),
+                       on_list_done=lambda page, digest: state.save_list_hash(tab_name, page, digest))
     try:
-        # Q&A 처리
-        print("\n>> Q&A 수집")
-        ws_qna = open_worksheet(client, SPREADSHEET_NAME, 'Q&A')
-        
-        # 기존 번호 가져오기
-        existing_qna = ws_qna.get_all_records()
-        existing_qna_nums = {str(row['번호']) for row in existing_qna if '번호' in row}
-        
-        data_qna = crawl_board_selenium(driver, 'qna.asp', max_pages=96, existing_nums=existing_qna_nums)
-        update_sheet_data(ws_qna, data_qna)
-        
-        # FAQ 처리
-        print("\n>> FAQ 수집")
-        ws_faq = open_worksheet(client, SPREADSHEET_NAME, 'FAQ')
-        
-        # 기존 번호 가져오기
-        existing_faq = ws_faq.get_all_records()
-        existing_faq_nums = {str(row['번호']) for row in existing_faq if '번호' in row}
-        
-        data_faq = crawl_board_selenium(driver, 'faq.asp', max_pages=4, existing_nums=existing_faq_nums)
-        update_sheet_data(ws_faq, data_faq)
-        
+        count = pipeline.run(posts)
+    except CrawlStopped as e:
+        print(f"[{tab_name}] 중지 요청으로 {e} 페이지까지 반영하고 멈춥니다 (다음 실행에서 이어서 수집).")
+        return
+    state.clear_checkpoint(tab_name)
+    print(f"[{tab_name}] {count}건 처리 완료.")
+
+class CrawlStopped(Exception):
+    """중지 요청으로 페이지 경계에서 수집을 멈춤 (체크포인트는 남겨 다음 실행에서 이어서 수집)"""
+
+class CrawlSession:
+    """fetcher, 시트 클라이언트, 상태 DB, 보관소, 페이지 캐시를 한 번 열어 여러 번 수집
+
+    main 은 한 번 수집하고 닫으며, daemon.py 는 열어 둔 채 주기적으로 run() 을 부른다
+    (드라이버 풀/커넥션 풀/토큰/워크시트 핸들/파싱 캐시가 실행 사이에 유지됨).
+    """
+
+    def __init__(self, args):
+        self.args = args
+        self.max_jobs, hosts, jobs = scheduler.load_config(args.config, DEFAULT_JOBS)
+        if args.only:
+            jobs = [job for job in jobs if job.tab in args.only]
+        self.jobs = jobs
+        # 설정 파일에 없는 호스트 제한은 기본값(HOST_LIMITS) 사용
+        hosts = dict(HOST_LIMITS, **hosts)
+        self.cache = ResponseCache(args.cache, max_bytes=args.cache_size * 1024 * 1024) if args.cache else None
+        self.fetchers = host_fetchers(jobs, hosts, args, cache=self.cache)
+        self.client = get_google_sheet_client()
+        self.state = CrawlState()
+        self.archive = PostArchive(args.archive) if args.archive else None
+        # 동시에 도는 게시판 작업들이 같은 출력 파일을 공유
+        self.jsonl = JsonlFile(args.jsonl) if args.jsonl else None
+        self.sqlite = SqliteStore(args.sqlite) if args.sqlite else None
+
+    def run(self, stop=None):
+        """설정된 게시판을 한 번 수집 -> {탭: 오류 또는 None}
+
+        stop(threading.Event)이 설정되면 진행 중인 게시판은 현재 페이지까지 반영하고 멈추며,
+        아직 시작하지 않은 게시판은 건너뛴다.
+        """
+        args = self.args
+
+        def run_job(job):
+            sync_board(self.fetchers[job.host], self.client, self.state, job.tab, job.board, job.max_pages,
+                       args, base_url=job.site, profile=job.profile, archive=self.archive, stop=stop,
+                       jsonl=self.jsonl, sqlite=self.sqlite)
+
+        jobs = self.jobs
+        if args.preflight:
+            jobs = preflight(jobs, self.fetchers)
+        jobs = scheduler.plan(jobs, self.state, refresh=args.refresh)
+        print(f"수집 순서: {', '.join(f'{job.tab}({job.mode})' for job in jobs)}")
+        results = scheduler.run(jobs, run_job, max_jobs=args.jobs or self.max_jobs, stop=stop)
+        failed = [tab for tab, error in results.items() if error is not None]
+        if failed:
+            # 탭이 지워졌거나 바뀌었을 수 있으므로 다음 실행에서 워크시트를 다시 찾음
+            forget_worksheets()
+            print(f"\n수집 실패 게시판: {', '.join(failed)}")
+        return results
+
+    def close(self):
+        for fetcher in self.fetchers.values():
+            fetcher.close()
+        self.state.close()
+        if self.archive is not None:
+            self.archive.close()
+        if self.jsonl is not None:
+            self.jsonl.close()
+        if self.sqlite is not None:
+            self.sqlite.close()
+        if self.cache is not None:
+            self.cache.close()
+
+def main(argv=None):
+    args = parse_args(argv)
+    html_parser.set_default_backend(args.parser)
+    metrics.METRICS.reset()
+    print(f"=== K-ICFR 크롤러 ({args.backend}) 시작 ===")
+    
+    session = CrawlSession(args)
+    try:
+        session.run()
     finally:
-        driver.quit()
-        print("\n브라우저 종료 및 작업 완료.")
+        session.close()
+        write_report(args)
+        print("\n세션 종료 및 작업 완료.")
+
+def preflight(jobs, fetchers):
+    """구조 점검을 통과한 게시판만 반환 (선택자가 안 맞으면 수집해도 0건이므로 미리 제외)"""
+    print("\n>> 게시판 구조 점검")
+    previous = structure_check.load_report(structure_check.REPORT_PATH)
+    # 잘못 설정된 게시판의 404 가 호스트 전체를 Selenium 으로 전환하지 않도록 HTTP 백엔드로만 점검
+    http_fetchers = {host: getattr(fetcher, 'primary', fetcher) for host, fetcher in fetchers.items()}
+    report = structure_check.validate(jobs, http_fetchers, previous=previous)
+    structure_check.print_report(report)
+    structure_check.save_report(report, structure_check.REPORT_PATH, previous)
+    failed = {board['tab'] for board in report['boards'] if not board['ok']}
+    for tab in failed:
+        metrics.inc('errors_total', stage='preflight', reason='structure')
+    if failed:
+        print(f"구조 점검 실패로 건너뛰는 게시판: {', '.join(sorted(failed))}")
+    return [job for job in jobs if job.tab not in failed]
+
+def write_report(args, show=True):
+    """실행 요약을 출력하고 JSON (그리고 요청 시 Prometheus 텍스트) 으로 저장"""
+    if show:
+        metrics.METRICS.print_summary()
+    try:
+        if args.metrics:
+            metrics.METRICS.write_json(args.metrics)
+        if args.prometheus:
+            metrics.METRICS.write_prometheus(args.prometheus)
+    except OSError as e:
+        print(f"메트릭 저장 실패: {e}")
 
 if __name__ == "__main__":
     main()
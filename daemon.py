@@ -0,0 +1,217 @@
+# 상주 실행 모드 - 자원(fetcher/드라이버 풀, 시트 클라이언트, 상태 DB, 캐시)을 열어 둔 채 주기적으로 증분 수집
+# 외부 cron 대신 이 프로세스 하나를 띄워 두고, 로컬 HTTP 로 상태 확인/메트릭 수집/즉시 실행을 한다.
+#   GET  /health   실행 상태 JSON (중지 중이거나 직전 실행이 통째로 실패했으면 503)
+#   GET  /metrics  Prometheus 텍스트 (프로세스 시작 이후 누적)
+#   POST /trigger  다음 예정 시각을 기다리지 않고 바로 수집 (실행 중이면 끝난 직후 한 번 더)
+# SIGTERM/Ctrl+C 를 받으면 진행 중인 게시판은 현재 페이지까지 반영(체크포인트)한 뒤 멈추고 자원을 닫는다.
+# 사용 예: python daemon.py --interval 30 --jitter 0.1 --port 8765 --workers 4 --preflight
+import os
+import sys
+import json
+import time
+import random
+import signal
+import argparse
+import datetime
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import html_parser
+import metrics
+import crawler
+
+DEFAULT_INTERVAL = 30.0
+DEFAULT_JITTER = 0.1
+DEFAULT_PORT = 8765
+DEFAULT_HOST = '127.0.0.1'
+
+
+def _iso(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp).isoformat(timespec='seconds') if timestamp else None
+
+
+class CrawlDaemon:
+    """CrawlSession 하나로 interval 분(±jitter 비율)마다 수집을 반복"""
+
+    def __init__(self, session, args, interval=DEFAULT_INTERVAL, jitter=DEFAULT_JITTER, run_on_start=True):
+        self.session = session
+        self.args = args
+        self.interval = interval * 60
+        self.jitter = jitter
+        self.stop = threading.Event()
+        self.wake = threading.Event()
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.state = 'idle'
+        self.runs = 0
+        self.last_run = None
+        self.next_run = self.started if run_on_start else self.started + self.next_delay()
+
+    def next_delay(self):
+        """여러 인스턴스/재시작이 같은 시각에 몰리지 않도록 간격을 ±jitter 만큼 흔듦"""
+        return self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def trigger(self):
+        self.wake.set()
+
+    def shutdown(self):
+        with self.lock:
+            self.state = 'stopping'
+        self.stop.set()
+        self.wake.set()
+
+    def status(self):
+        with self.lock:
+            return {
+                'state': self.state,
+                'started': _iso(self.started),
+                'uptime_seconds': round(time.time() - self.started, 1),
+                'runs': self.runs,
+                'last_run': self.last_run,
+                'next_run': _iso(self.next_run) if self.state == 'idle' else None,
+                'trigger_pending': self.wake.is_set() and not self.stop.is_set(),
+            }
+
+    def healthy(self):
+        with self.lock:
+            return self.state != 'stopping' and not (self.last_run and self.last_run.get('error'))
+
+    def run_once(self):
+        """한 번 수집 - 게시판 일부 실패는 failed 에, 수집 전체가 실패한 경우는 error 에 기록"""
+        started = time.time()
+        with self.lock:
+            self.state = 'running'
+        record = {'started': _iso(started)}
+        try:
+            results = self.session.run(stop=self.stop)
+            record['failed'] = sorted(tab for tab, error in results.items() if error is not None)
+            record['stopped'] = self.stop.is_set()
+            result = 'stopped' if record['stopped'] else 'failed' if record['failed'] else 'ok'
+            metrics.inc('daemon_runs_total', result=result)
+        except Exception as e:
+            print(f"수집 실패: {e}")
+            record['error'] = f"{type(e).__name__}: {e}"
+            metrics.inc('daemon_runs_total', result='error')
+        # 시트 전체 대조는 첫 실행에서만 (이후에는 메모리/로컬 상태로 충분)
+        self.args.reconcile = False
+        record['finished'] = _iso(time.time())
+        record['seconds'] = round(time.time() - started, 1)
+        crawler.write_report(self.args, show=False)
+        with self.lock:
+            self.runs += 1
+            self.last_run = record
+            if self.state == 'running':
+                self.state = 'idle'
+        print(f"[daemon] {self.runs}번째 수집 완료 ({record['seconds']}s)")
+
+    def serve(self):
+        """stop 이 설정될 때까지 예정 시각 또는 trigger 때마다 수집"""
+        while not self.stop.is_set():
+            if self.wake.is_set() or time.time() >= self.next_run:
+                self.wake.clear()
+                # 수집은 별도 스레드에서 하고 주 스레드는 짧게 기다리며 신호를 받음 (Windows 포함)
+                worker = threading.Thread(target=self.run_once, name='crawl')
+                worker.start()
+                while worker.is_alive():
+                    worker.join(1.0)
+                with self.lock:
+                    self.next_run = time.time() + self.next_delay()
+                if not self.stop.is_set():
+                    print(f"[daemon] 다음 수집: {_iso(self.next_run)}")
+            else:
+                self.wake.wait(min(1.0, max(self.next_run - time.time(), 0)))
+
+
+def _make_handler(daemon):
+    class Handler(BaseHTTPRequestHandler):
+        def _respond(self, status, body, content_type='application/json; charset=utf-8'):
+            data = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._respond(200 if daemon.healthy() else 503,
+                              json.dumps(daemon.status(), ensure_ascii=False))
+            elif self.path == '/metrics':
+                self._respond(200, metrics.METRICS.to_prometheus(), 'text/plain; version=0.0.4; charset=utf-8')
+            else:
+                self._respond(404, '{"error": "not found"}')
+
+        def do_POST(self):
+            if self.path != '/trigger':
+                return self._respond(404, '{"error": "not found"}')
+            if daemon.stop.is_set():
+                return self._respond(503, '{"error": "stopping"}')
+            daemon.trigger()
+            self._respond(202, json.dumps({'queued': True, 'running': daemon.status()['state'] == 'running'}))
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def install_signal_handlers(daemon):
+    """첫 신호는 정상 종료(현재 페이지까지 반영), 두 번째 신호는 즉시 종료
+
+    즉시 종료는 수집 스레드가 아직 쓰고 있는 자원을 닫지 않고 프로세스를 끝낸다.
+    체크포인트는 페이지마다 상태 DB 에 기록되어 있고 보관소 색인은 다음에 열 때 복구되므로,
+    다음 실행은 마지막으로 반영된 페이지부터 이어서 수집한다.
+    """
+    def handle(signum, frame):
+        if daemon.stop.is_set():
+            print("\n[daemon] 즉시 종료합니다.", flush=True)
+            os._exit(128 + signum)
+        print("\n[daemon] 종료 요청 - 진행 중인 페이지까지 반영하고 멈춥니다. (다시 누르면 즉시 종료)")
+        daemon.shutdown()
+
+    for name in ('SIGTERM', 'SIGINT', 'SIGBREAK'):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), handle)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="K-ICFR 크롤러 상주 실행 (나머지 옵션은 crawler.py 와 같음)")
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                        help=f"수집 간격 (분, 기본: {DEFAULT_INTERVAL:g})")
+    parser.add_argument('--jitter', type=float, default=DEFAULT_JITTER,
+                        help=f"간격을 흔드는 비율 (기본: {DEFAULT_JITTER}, 0.1 이면 ±10%%)")
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f"상태/메트릭 HTTP 주소 (기본: {DEFAULT_HOST})")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f"상태/메트릭 HTTP 포트 (기본: {DEFAULT_PORT}, 0 이면 끔)")
+    parser.add_argument('--no-initial-run', dest='run_on_start', action='store_false',
+                        help="시작하자마자 수집하지 않고 첫 간격을 기다림")
+    args, crawler_argv = parser.parse_known_args(argv)
+    if not 0 <= args.jitter < 1:
+        parser.error("--jitter 는 0 이상 1 미만이어야 합니다.")
+    crawl_args = crawler.parse_args(crawler_argv)
+    html_parser.set_default_backend(crawl_args.parser)
+    metrics.METRICS.reset()
+    print(f"=== K-ICFR 크롤러 상주 실행 ({crawl_args.backend}, {args.interval:g}분 간격) ===")
+
+    session = crawler.CrawlSession(crawl_args)
+    daemon = CrawlDaemon(session, crawl_args, interval=args.interval, jitter=args.jitter,
+                         run_on_start=args.run_on_start)
+    install_signal_handlers(daemon)
+    server = None
+    if args.port:
+        server = ThreadingHTTPServer((args.host, args.port), _make_handler(daemon))
+        threading.Thread(target=server.serve_forever, name='http', daemon=True).start()
+        print(f"상태/메트릭: http://{args.host}:{server.server_port}/health, /metrics, POST /trigger")
+    try:
+        daemon.serve()
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        session.close()
+        crawler.write_report(crawl_args)
+        print("\n상주 실행 종료.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,58 @@
 import os
+import io
+import time
 import pickle
-from googleapiclient.discovery import build
+import threading
+import json
+import random
+import hashlib
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.errors import HttpError
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload, MediaIoBaseDownload, BatchHttpRequest, HttpRequest
 import re
+import metrics
+
+try:
+    import markdown
+except ImportError:
+    markdown = None
 
 # 구글 드라이브 API 권한 범위 (파일 읽기/쓰기/생성)
 SCOPES = ['https://www.googleapis.com/auth/drive.file']
+FOLDER_MIME = 'application/vnd.google-apps.folder'
+XLSX_MIME = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+# 폴더 ID 캐시 유지 시간(초)
+FOLDER_CACHE_TTL = 600
+# 토큰 만료 이 시간(초) 전에 미리 갱신
+TOKEN_REFRESH_MARGIN = 300
+# 일괄 업로드 동시 실행 수 / 배치 요청 하나에 담는 최대 호출 수 (Drive 제한 100)
+BULK_WORKERS = 4
+BATCH_LIMIT = 100
+# 재개 가능한 업로드: 청크 크기(256KB 의 배수), 청크당 재시도 횟수, 세션 저장 파일
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+UPLOAD_RETRIES = 5
+UPLOAD_SESSION_PATH = '.upload_sessions.json'
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+# 목록 조회 한 페이지 크기 (Drive API 최대 1000) 와 기본 필드
+LIST_PAGE_SIZE = 1000
+LIST_FIELDS = 'id, name, mimeType, createdTime, webViewLink, size'
+# 로컬 메타데이터 캐시에 저장하는 필드 (LIST_FIELDS + 변경 반영용 필드)
+CACHE_FIELDS = 'id, name, mimeType, createdTime, modifiedTime, webViewLink, size, md5Checksum, parents, trashed'
+METADATA_CACHE_PATH = '.drive_metadata.json'
+UPLOAD_MANIFEST_PATH = '.upload_manifest.json'
 
-def get_drive_service():
-    """구글 드라이브 서비스 객체 생성 및 인증"""
+def load_credentials(token_path='token.pickle', credentials_path='credentials.json'):
+    """token.pickle 에서 인증 정보를 읽고, 없거나 유효하지 않으면 갱신/새로 인증"""
     creds = None
     # token.pickle 파일에 사용자 인증 정보 저장
-    if os.path.exists('token.pickle'):
-        with open('token.pickle', 'rb') as token:
+    if os.path.exists(token_path):
+        with open(token_path, 'rb') as token:
             creds = pickle.load(token)
             
     # 인증 정보가 없거나 유효하지 않으면 새로 인증
@@ -22,19 +60,23 @@ def get_drive_service():
         if creds and creds.expired and creds.refresh_token:
             creds.refresh(Request())
         else:
-            if not os.path.exists('credentials.json'):
+            if not os.path.exists(credentials_path):
                 raise FileNotFoundError("credentials.json 파일이 없습니다. 구글 클라우드 콘솔에서 다운로드하여 프로젝트 루트에 저장해주세요.")
-            flow = InstalledAppFlow.from_client_secrets_file('credentials.json', SCOPES)
+            flow = InstalledAppFlow.from_client_secrets_file(credentials_path, SCOPES)
             creds = flow.run_local_server(port=0)
         # 인증 정보 저장
-        with open('token.pickle', 'wb') as token:
+        with open(token_path, 'wb') as token:
             pickle.dump(creds, token)
 
-    return build('drive', 'v3', credentials=creds)
+    return creds
+
+def get_drive_service():
+    """구글 드라이브 서비스 객체 (공용 DriveClient 에 캐시된 것)"""
+    return get_client().service
 
 def get_or_create_folder(service, folder_name):
     """구글 드라이브에서 특정 이름의 폴더를 찾거나 생성"""
-    query = f"name = '{folder_name}' and mimeType = 'application/vnd.google-apps.folder' and trashed = false"
+    query = f"name = '{folder_name}' and mimeType = '{FOLDER_MIME}' and trashed = false"
     results = service.files().list(q=query, fields="files(id, name)").execute()
     items = results.get('files', [])
 
@@ -43,45 +85,839 @@ def get_or_create_folder(service, folder_name):
     else:
         folder_metadata = {
             'name': folder_name,
-            'mimeType': 'application/vnd.google-apps.folder'
+            'mimeType': FOLDER_MIME
         }
         folder = service.files().create(body=folder_metadata, fields='id').execute()
         return folder.get('id')
 
-def upload_to_drive(file_path, folder_name="K-Sox"):
-    """파일을 구글 드라이브 특정 폴더에 업로드"""
-    try:
-        service = get_drive_service()
-        folder_id = get_or_create_folder(service, folder_name)
-        
+# 마크다운 -> HTML 변환 시 표 태그를 바꿔 넣을 스타일 태그 (속성 없는 태그에만 적용)
+# 구글 문서 변환 시 표 너비를 문서 폭에 맞게 강제하기 위해 고정 픽셀(700px) 사용
+# 첫 번째 컬럼(180px), 두 번째 컬럼(100px) 지정을 위해 table-layout: fixed 적용
+STYLED_TAGS = {
+    '<table>': '<table width="700" style="width: 700px; border-collapse: collapse; border: 1px solid #cbd5e1; margin: 20px 0; table-layout: fixed;">',
+    '<thead>': '<thead style="background-color: #f8fafc;">',
+    '<th>': '<th style="background-color: #f8fafc; color: #1e293b; font-weight: bold; padding: 8px 10px; border: 1px solid #cbd5e1; text-align: center;">',
+    '<td>': '<td style="padding: 6px 10px; border: 1px solid #cbd5e1; text-align: left; vertical-align: top; word-wrap: break-word;">',
+}
+# 헤더 구간(<th 로 시작하는 태그(<thead> 포함)부터 첫 </th> 까지)의 줄바꿈 제거용
+TH_PATTERN = re.compile(r'(<th[^>]*>)(.*?)(</th>)', re.DOTALL | re.IGNORECASE)
+MARKDOWN_EXTENSIONS = ['tables', 'nl2br', 'sane_lists', 'fenced_code']
+
+# UTF-8 선언이 포함된 HTML 문서 틀 (본문만 끼워 넣음)
+DOC_HTML_HEAD = """
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="utf-8">
+        <style>
+            body { 
+                font-family: 'Nanum Gothic', 'Malgun Gothic', sans-serif; 
+                line-height: 1.6; 
+                color: #333; 
+                padding: 20px; 
+                width: 700px;
+                margin: 0 auto;
+            }
+            h1 { color: #1e293b; border-bottom: 2px solid #6366f1; padding-bottom: 10px; text-align: center; }
+            h2 { color: #4338ca; margin-top: 30px; border-left: 5px solid #6366f1; padding-left: 10px; background-color: #f1f5f9; padding: 8px 10px; }
+            h3 { color: #1e40af; margin-top: 20px; }
+            
+            table { 
+                width: 700px !important; 
+                border-collapse: collapse; 
+                margin: 20px 0; 
+                table-layout: fixed;
+            }
+            th, td {
+                border: 1px solid #cbd5e1;
+                padding: 6px 10px;
+                text-align: left;
+                font-size: 10pt;
+                word-wrap: break-word;
+                line-height: 1.4;
+            }
+            th {
+                background-color: #f8fafc;
+                color: #1e293b;
+                font-weight: bold;
+                text-align: center;
+                padding: 8px 10px;
+                line-height: 1.3;
+            }
+            
+            /* 첫 번째 컬럼 (종목명 등) - 기존 60px에서 3배인 180px로 확대 */
+            th:first-child, td:first-child { 
+                width: 180px; 
+                text-align: center; 
+            }
+            
+            /* 두 번째 컬럼 (업종 등) - 너비 축소 (약 100px) */
+            th:nth-child(2), td:nth-child(2) { 
+                width: 100px; 
+                text-align: center;
+            }
+
+            /* 세 번째 컬럼 (추천 요약 등) - 나머지 모든 폭 사용 */
+            th:nth-child(3), td:nth-child(3) { 
+                width: auto; 
+            }
+            
+            blockquote { 
+                border-left: 4px solid #e2e8f0; 
+                padding-left: 15px; 
+                color: #64748b; 
+                font-style: italic; 
+                background-color: #f8fafc; 
+                padding: 10px 15px; 
+            }
+            .highlight { background-color: #fef9c3; padding: 2px 5px; border-radius: 3px; }
+        </style>
+    </head>
+    <body>
+        """
+DOC_HTML_TAIL = """
+    </body>
+    </html>
+    """
+
+_markdown_local = threading.local()
+
+def _markdown_converter():
+    """스레드별로 한 번만 만든 markdown.Markdown 인스턴스 (확장 로딩 비용 절약)"""
+    converter = getattr(_markdown_local, 'converter', None)
+    if converter is None:
+        # tables: 테이블 지원, nl2br: 줄바꿈 지원, sane_lists: 리스트 개선
+        converter = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+        _markdown_local.converter = converter
+    return converter
+
+def _flatten_th(match):
+    body = match.group(2).replace('<br>', ' ').replace('<br/>', ' ').replace('\n', ' ')
+    return f"{match.group(1)}{body}{match.group(3)}"
+
+def render_doc_html(content):
+    """마크다운(또는 텍스트) 내용을 구글 문서 변환용 HTML 로 만듦"""
+    if markdown is None:
+        print("markdown 라이브러리가 없어 plain text 방식으로 처리합니다.")
+        html_body = content.replace('\n', '<br>')
+    else:
+        converter = _markdown_converter()
+        try:
+            html_body = converter.convert(content)
+        except Exception as e:
+            print(f"마크다운 변환 중 오류: {e}")
+            html_body = content.replace('\n', '<br>')
+        finally:
+            converter.reset()
+
+    # [추가] 표 스타일 적용, 헤더(th) 내용에 포함된 강제 줄바꿈(<br>, \n)은 공백으로
+    # 표 태그 스타일은 str.replace 가 정규식 한 번 스캔보다 빠름
+    for tag, styled in STYLED_TAGS.items():
+        html_body = html_body.replace(tag, styled)
+    html_body = TH_PATTERN.sub(_flatten_th, html_body)
+    return ''.join((DOC_HTML_HEAD, html_body, DOC_HTML_TAIL))
+
+class JsonStore:
+    """작은 JSON 파일 하나를 통째로 읽고 원자적으로 다시 쓰는 저장소 (스레드 간 lock 공유)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, data):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+class UploadSessions(JsonStore):
+    """재개 가능한 업로드 세션(URI, 전송 오프셋)을 디스크에 저장
+
+    프로세스가 죽어도 같은 파일(경로+크기+수정시각)을 다시 올리면 저장된 세션으로 이어서 보낸다.
+    """
+
+    def __init__(self, path=UPLOAD_SESSION_PATH):
+        super().__init__(path)
+
+    @staticmethod
+    def key(file_path, folder_id, target_id=None):
+        stat = os.stat(file_path)
+        key = f"{os.path.abspath(file_path)}|{stat.st_size}|{int(stat.st_mtime)}|{folder_id}"
+        # 기존 파일 갱신용 세션은 새 파일 생성 세션과 구분
+        return f"{key}|{target_id}" if target_id else key
+
+    def get(self, key):
+        with self.lock:
+            return self._load().get(key)
+
+    def put(self, key, uri, offset):
+        with self.lock:
+            sessions = self._load()
+            sessions[key] = {'uri': uri, 'offset': offset, 'updated': time.time()}
+            self._save(sessions)
+
+    def remove(self, key):
+        with self.lock:
+            sessions = self._load()
+            if sessions.pop(key, None) is not None:
+                self._save(sessions)
+
+
+class MetadataCache(JsonStore):
+    """폴더별 파일 메타데이터와 Drive changes 피드 토큰을 디스크에 저장
+
+    {폴더 ID: {'token': changes 페이지 토큰, 'files': {파일 ID: 메타데이터}, 'synced': 시각}}
+    """
+
+    def __init__(self, path=METADATA_CACHE_PATH):
+        super().__init__(path)
+
+    def get(self, folder_id):
+        with self.lock:
+            return self._load().get(folder_id)
+
+    def put(self, folder_id, token, files):
+        with self.lock:
+            folders = self._load()
+            folders[folder_id] = {'token': token, 'files': files, 'synced': time.time()}
+            self._save(folders)
+
+    def remove(self, folder_id=None):
+        """폴더 캐시 삭제 (폴더 ID 를 주지 않으면 전체)"""
+        with self.lock:
+            folders = self._load()
+            if folder_id is None:
+                folders = {}
+            elif folders.pop(folder_id, None) is None:
+                return
+            self._save(folders)
+
+
+class UploadManifest(JsonStore):
+    """업로드한 파일의 내용 해시 기록 - (폴더 ID, 이름) -> {'id', 'link', 'sha256', 'uploaded'}
+
+    Drive 의 appProperties 에도 같은 해시를 남기므로 이 파일이 없어져도 중복 업로드는 막힌다.
+    """
+
+    def __init__(self, path=UPLOAD_MANIFEST_PATH):
+        super().__init__(path)
+
+    @staticmethod
+    def key(folder_id, name):
+        return f"{folder_id}|{name}"
+
+    def get(self, key):
+        with self.lock:
+            return self._load().get(key)
+
+    def put(self, key, file_id, link, digest):
+        with self.lock:
+            entries = self._load()
+            entries[key] = {'id': file_id, 'link': link, 'sha256': digest, 'uploaded': time.time()}
+            self._save(entries)
+
+    def remove(self, key):
+        with self.lock:
+            entries = self._load()
+            if entries.pop(key, None) is not None:
+                self._save(entries)
+
+
+def file_sha256(file_path, chunk_size=1024 * 1024):
+    """파일 내용의 sha256 (큰 파일도 chunk_size 씩 읽음)"""
+    hasher = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def _quote(value):
+    """Drive 검색어(q) 의 문자열 리터럴로 쓰도록 역슬래시/작은따옴표 이스케이프"""
+    return value.replace('\\', '\\\\').replace("'", "\\'")
+
+
+def _field_names(fields):
+    return [name.strip() for name in fields.split(',') if name.strip()]
+
+
+class TimedHttpRequest(HttpRequest):
+    """API 호출(execute)과 업로드 청크(next_chunk) 시간을 drive_call 단계로 기록하는 HttpRequest"""
+
+    def execute(self, *args, **kwargs):
+        with metrics.timer('drive_call', op=self.methodId or 'unknown'):
+            try:
+                return super().execute(*args, **kwargs)
+            except HttpError as e:
+                metrics.inc('errors_total', stage='drive_call', reason=str(e.resp.status))
+                raise
+
+    def next_chunk(self, *args, **kwargs):
+        with metrics.timer('drive_call', op=f"{self.methodId or 'unknown'}.chunk"):
+            return super().next_chunk(*args, **kwargs)
+
+
+def _is_retryable(error):
+    if isinstance(error, HttpError):
+        return error.resp.status in RETRY_STATUSES
+    return isinstance(error, (OSError, TimeoutError))
+
+
+def execute_resumable(request, label, sessions=None, session_key=None, progress=None, retries=UPLOAD_RETRIES):
+    """재개 가능한 업로드 요청을 청크 단위로 실행
+
+    - 청크마다 next_chunk() 로 보내고 progress(보낸 바이트, 전체 바이트) 호출
+    - 실패한 청크는 지수 백오프로 재시도 (googleapiclient 가 다음 호출 때 서버의 수신 위치를 먼저 확인)
+    - sessions 가 있으면 세션 URI 와 오프셋을 청크마다 저장, 끝나면 삭제
+    """
+    saved = sessions.get(session_key) if sessions else None
+    if saved:
+        request.resumable_uri = saved['uri']
+        request.resumable_progress = saved['offset']
+        # 서버가 실제로 받은 위치부터 이어가도록 첫 호출에서 상태 조회
+        request._in_error_state = True
+        print(f"  업로드 재개: {label} ({saved['offset']} 바이트부터)")
+
+    total = request.resumable.size()
+    failures = 0
+    response = None
+    while response is None:
+        try:
+            status, response = request.next_chunk()
+            failures = 0
+        except Exception as e:
+            if saved and isinstance(e, HttpError) and e.resp.status in (404, 410):
+                # 세션 만료 - 처음부터 다시
+                print(f"  저장된 업로드 세션이 만료되어 처음부터 다시 보냅니다: {label}")
+                sessions.remove(session_key)
+                saved = None
+                request.resumable_uri = None
+                request.resumable_progress = 0
+                request._in_error_state = False
+                continue
+            failures += 1
+            if not _is_retryable(e) or failures > retries:
+                raise
+            metrics.inc('retries_total', component='drive', reason=type(e).__name__)
+            wait = min(32, 2 ** (failures - 1)) + random.uniform(0, 1)
+            print(f"  업로드 청크 실패({e}), {wait:.1f}초 후 재시도 ({failures}/{retries}): {label}")
+            time.sleep(wait)
+            continue
+        if status is not None:
+            if sessions and request.resumable_uri:
+                sessions.put(session_key, request.resumable_uri, status.resumable_progress)
+            if progress:
+                progress(status.resumable_progress, total)
+    if sessions and session_key:
+        sessions.remove(session_key)
+    if progress:
+        progress(total, total)
+    return response
+
+
+def print_progress(label):
+    """청크가 여러 개인 업로드만 진행률 출력"""
+    def progress(sent, total):
+        if total and sent < total:
+            print(f"  업로드 진행 {sent * 100 // total}% ({sent}/{total} 바이트): {label}")
+    return progress
+
+
+class _HashingWriter:
+    """쓰는 내용을 그대로 전달하면서 해시를 계산하는 파일 래퍼"""
+
+    def __init__(self, fh, hasher):
+        self.fh = fh
+        self.hasher = hasher
+
+    def write(self, data):
+        self.hasher.update(data)
+        return self.fh.write(data)
+
+
+class DriveClient:
+    """오래 유지되는 구글 드라이브 클라이언트 (여러 스레드에서 공유 가능)
+
+    - 인증 정보는 한 번만 읽고, 만료 TOKEN_REFRESH_MARGIN 초 전에 미리 갱신
+    - 서비스 객체는 스레드마다 한 번만 만들어 재사용 (httplib2 는 스레드 간 공유 불가)
+    - 폴더 이름 -> ID 는 folder_ttl 초 동안 캐시, 폴더가 사라졌으면(404) 무효화 후 한 번 재시도
+
+    root_url 을 주면 API/업로드/배치 요청을 모두 그 주소로 보낸다 (로컬 가짜 Drive 서버 테스트용,
+    이때 credentials 에 google.auth.credentials.AnonymousCredentials() 를 넘기면 된다).
+    """
+
+    def __init__(self, token_path='token.pickle', credentials_path='credentials.json',
+                 folder_ttl=FOLDER_CACHE_TTL, refresh_margin=TOKEN_REFRESH_MARGIN, credentials=None,
+                 root_url=None):
+        self.token_path = token_path
+        self.credentials_path = credentials_path
+        self.folder_ttl = folder_ttl
+        self.refresh_margin = refresh_margin
+        self.root_url = root_url
+        self.upload_sessions = UploadSessions()
+        self.metadata = MetadataCache()
+        self.manifest = UploadManifest()
+        self.creds = credentials
+        self.lock = threading.RLock()
+        self.local = threading.local()
+        self.folders = {}
+
+    # --- 인증 / 서비스 ---
+
+    def credentials(self):
+        with self.lock:
+            if self.creds is None:
+                self.creds = load_credentials(self.token_path, self.credentials_path)
+            elif self._expiring(self.creds):
+                self.creds.refresh(Request())
+                with open(self.token_path, 'wb') as token:
+                    pickle.dump(self.creds, token)
+            return self.creds
+
+    def _expiring(self, creds):
+        if not getattr(creds, 'refresh_token', None):
+            return False
+        expiry = getattr(creds, 'expiry', None)
+        if expiry is None:
+            return not creds.valid
+        # google-auth 의 expiry 는 naive UTC
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        return (expiry - now).total_seconds() < self.refresh_margin
+
+    @property
+    def service(self):
+        creds = self.credentials()
+        service = getattr(self.local, 'service', None)
+        if service is None or self.local.creds is not creds:
+            if self.root_url:
+                document = json.loads(get_static_doc('drive', 'v3'))
+                document['rootUrl'] = self.root_url
+                service = build_from_document(document, credentials=creds, requestBuilder=TimedHttpRequest)
+            else:
+                service = build('drive', 'v3', credentials=creds, cache_discovery=False,
+                                requestBuilder=TimedHttpRequest)
+            self.local.service = service
+            self.local.creds = creds
+        return service
+
+    def new_batch(self, callback):
+        """배치 요청 객체 (root_url 을 쓰면 배치 주소도 그쪽으로)"""
+        if self.root_url:
+            return BatchHttpRequest(callback=callback, batch_uri=self.root_url.rstrip('/') + '/batch/drive/v3')
+        return self.service.new_batch_http_request(callback=callback)
+
+    def execute_batch(self, requests):
+        """[(key, HttpRequest)] 를 BATCH_LIMIT 개씩 배치 HTTP 요청으로 실행해 {key: (응답, 예외)} 반환"""
+        results = {}
+        def callback(request_id, response, exception):
+            results[request_id] = (response, exception)
+        for start in range(0, len(requests), BATCH_LIMIT):
+            batch = self.new_batch(callback)
+            for key, request in requests[start:start + BATCH_LIMIT]:
+                batch.add(request, request_id=key)
+            with metrics.timer('drive_call', op='batch'):
+                batch.execute()
+        return results
+
+    # --- 폴더 캐시 ---
+
+    def folder_id(self, folder_name):
+        with self.lock:
+            cached = self.folders.get(folder_name)
+            if cached and cached[1] > time.monotonic():
+                return cached[0]
+        folder_id = get_or_create_folder(self.service, folder_name)
+        with self.lock:
+            self.folders[folder_name] = (folder_id, time.monotonic() + self.folder_ttl)
+        return folder_id
+
+    def resolve_folders(self, folder_names):
+        """여러 폴더 ID 를 한 번에 확인 - 캐시에 없는 폴더만 배치 요청으로 조회하고 없으면 생성"""
+        now = time.monotonic()
+        with self.lock:
+            missing = [name for name in dict.fromkeys(folder_names)
+                       if not (name in self.folders and self.folders[name][1] > now)]
+        if missing:
+            files = self.service.files()
+            keys = {f"folder-{i}": name for i, name in enumerate(missing)}
+            found = self.execute_batch([
+                (key, files.list(q=f"name = '{name}' and mimeType = '{FOLDER_MIME}' and trashed = false",
+                                 fields="files(id, name)"))
+                for key, name in keys.items()])
+            for key, name in keys.items():
+                response, exception = found.get(key, (None, None))
+                items = (response or {}).get('files', []) if exception is None else []
+                folder_id = items[0]['id'] if items else get_or_create_folder(self.service, name)
+                with self.lock:
+                    self.folders[name] = (folder_id, time.monotonic() + self.folder_ttl)
+        return {name: self.folder_id(name) for name in folder_names}
+
+    def invalidate_folder(self, folder_name=None):
+        """폴더 ID 캐시 삭제 (이름을 주지 않으면 전체)"""
+        with self.lock:
+            if folder_name is None:
+                self.folders.clear()
+            else:
+                self.folders.pop(folder_name, None)
+
+    def _in_folder(self, folder_name, func):
+        """func(folder_id) 실행 - 캐시된 폴더가 삭제되어 404 가 나면 캐시를 비우고 한 번 재시도"""
+        try:
+            return func(self.folder_id(folder_name))
+        except HttpError as e:
+            if e.resp.status != 404:
+                raise
+            self.invalidate_folder(folder_name)
+            return func(self.folder_id(folder_name))
+
+    # --- 파일 작업 ---
+
+    def upload(self, file_path, folder_name="K-Sox", chunk_size=UPLOAD_CHUNK_SIZE, progress=None, dedup=True):
+        """xlsx 를 구글 시트로 변환 업로드 (청크 단위, 중단되면 다음 호출에서 이어서 전송)
+
+        dedup 이면 파일 내용의 sha256 을 로컬 manifest / Drive appProperties 와 비교해
+        같은 내용이 이미 있으면 건너뛰고('skipped'), 같은 이름의 파일이 있으면 그 파일을
+        제자리에서 갱신하며('updated'), 없을 때만 새로 만든다('created').
+        """
         file_name = os.path.basename(file_path)
         # .xlsx 확장자 제거 (구글 시트 변환 시 깔끔하게 보이기 위함)
         display_name = os.path.splitext(file_name)[0]
-        
-        file_metadata = {
-            'name': display_name,
-            'parents': [folder_id],
-            'mimeType': 'application/vnd.google-apps.spreadsheet'  # 구글 시트로 변환 설정
+        digest = file_sha256(file_path) if dedup else None
+
+        def send(folder_id):
+            existing = self._find_uploaded(folder_id, display_name, digest) if dedup else None
+            if existing and existing.get('appProperties', {}).get('sha256') == digest:
+                return existing, 'skipped'
+            media = MediaFileUpload(file_path, mimetype=XLSX_MIME, chunksize=chunk_size, resumable=True)
+            app_properties = {'sha256': digest} if digest else None
+            if existing:
+                request = self.service.files().update(
+                    fileId=existing['id'],
+                    body={'appProperties': app_properties},
+                    media_body=media,
+                    fields='id, webViewLink'
+                )
+                status = 'updated'
+            else:
+                file_metadata = {
+                    'name': display_name,
+                    'parents': [folder_id],
+                    'mimeType': 'application/vnd.google-apps.spreadsheet'  # 구글 시트로 변환 설정
+                }
+                if app_properties:
+                    file_metadata['appProperties'] = app_properties
+                request = self.service.files().create(
+                    body=file_metadata,
+                    media_body=media,
+                    fields='id, webViewLink'
+                )
+                status = 'created'
+            file = execute_resumable(request, file_name, self.upload_sessions,
+                                     UploadSessions.key(file_path, folder_id, existing and existing['id']),
+                                     progress or print_progress(file_name))
+            return file, status
+
+        def run(folder_id):
+            file, status = send(folder_id)
+            if dedup:
+                self.manifest.put(UploadManifest.key(folder_id, display_name),
+                                  file.get('id'), file.get('webViewLink'), digest)
+            return file, status
+
+        file, status = self._in_folder(folder_name, run)
+        if status == 'skipped':
+            print(f"내용이 같아 업로드 건너뜀: {file_name} (ID: {file.get('id')})")
+        elif status == 'updated':
+            print(f"파일 갱신 완료: {file_name} (ID: {file.get('id')})")
+        else:
+            print(f"파일 업로드 완료: {file_name} (ID: {file.get('id')})")
+        return {
+            'id': file.get('id'),
+            'link': file.get('webViewLink'),
+            'status': status
         }
-        
-        media = MediaFileUpload(
-            file_path,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            resumable=True
-        )
-        
-        file = service.files().create(
-            body=file_metadata,
-            media_body=media,
-            fields='id, webViewLink'
-        ).execute()
-        
-        print(f"파일 업로드 완료: {file_name} (ID: {file.get('id')})")
+
+    def _find_uploaded(self, folder_id, name, digest):
+        """이전에 올린 같은 파일 찾기 - manifest 의 ID, 같은 해시, 같은 이름 순으로 확인"""
+        files = self.service.files()
+        fields = 'id, webViewLink, appProperties'
+        key = UploadManifest.key(folder_id, name)
+        entry = self.manifest.get(key)
+        if entry:
+            try:
+                file = files.get(fileId=entry['id'], fields=f"{fields}, trashed").execute()
+                if not file.get('trashed'):
+                    return file
+            except HttpError as e:
+                if e.resp.status != 404:
+                    raise
+            # 삭제되었거나 휴지통에 있으면 manifest 에서 제거하고 Drive 에서 다시 찾음
+            self.manifest.remove(key)
+
+        folder = f"'{folder_id}' in parents and trashed = false"
+        for query in (f"{folder} and appProperties has {{ key='sha256' and value='{digest}' }}",
+                      f"{folder} and name = '{_quote(name)}'"):
+            found = files.list(q=query, fields=f"files({fields})", pageSize=1).execute().get('files', [])
+            if found:
+                return found[0]
+        return None
+
+    def create_doc(self, title, content, folder_name="K-Sox"):
+        html_content = render_doc_html(content)
+
+        def create(folder_id):
+            file_metadata = {
+                'name': title,
+                'parents': [folder_id],
+                'mimeType': 'application/vnd.google-apps.document'
+            }
+            fh = io.BytesIO(html_content.encode('utf-8'))
+            media = MediaIoBaseUpload(fh, mimetype='text/html', chunksize=UPLOAD_CHUNK_SIZE, resumable=True)
+            request = self.service.files().create(
+                body=file_metadata,
+                media_body=media,
+                fields='id, webViewLink'
+            )
+            return execute_resumable(request, title)
+
+        file = self._in_folder(folder_name, create)
+        print(f"구글 문서 생성 완료: {title} (ID: {file.get('id')})")
         return {
             'id': file.get('id'),
             'link': file.get('webViewLink')
         }
-        
+
+    def delete(self, file_id):
+        self.service.files().delete(fileId=file_id).execute()
+        print(f"구글 드라이브 파일 삭제 완료 (ID: {file_id})")
+        return True
+
+    def download(self, file_id):
+        """작은 파일용: 구글 시트를 엑셀로 내보내 bytes 로 반환"""
+        buffer = io.BytesIO()
+        self.download_to(file_id, buffer)
+        return buffer.getvalue()
+
+    def download_to(self, file_id, dest, mime_type=XLSX_MIME, export=True, chunk_size=DOWNLOAD_CHUNK_SIZE,
+                    verify=True, progress=None):
+        """파일을 메모리에 모으지 않고 청크 단위로 dest(경로 또는 파일 객체)에 기록
+
+        - export=True: 구글 문서/시트를 mime_type 으로 내보내기 (내보내기는 Range 를 지원하지 않으므로
+          경로로 받을 때는 '.part' 파일에 받은 뒤 완료 시 이름을 바꿔 불완전한 파일이 남지 않게 함)
+        - export=False: 일반 바이너리 파일. 경로로 받다가 끊기면 다음 호출에서 '.part' 크기부터 Range 로 이어받고,
+          verify=True 면 Drive 의 md5Checksum 과 비교
+        반환: {'bytes': 받은 크기, 'md5': 전체 내용의 md5}
+        """
+        files = self.service.files()
+        expected_md5 = None
+        if export:
+            request = files.export_media(fileId=file_id, mimeType=mime_type)
+        else:
+            request = files.get_media(fileId=file_id)
+            if verify:
+                expected_md5 = files.get(fileId=file_id, fields='md5Checksum').execute().get('md5Checksum')
+
+        hasher = hashlib.md5()
+        offset = 0
+        part_path = None
+        if isinstance(dest, (str, os.PathLike)):
+            part_path = f"{dest}.part"
+            if not export and os.path.exists(part_path):
+                # 이전에 받은 부분의 해시를 이어서 계산
+                with open(part_path, 'rb') as f:
+                    for block in iter(lambda: f.read(1024 * 1024), b''):
+                        hasher.update(block)
+                offset = os.path.getsize(part_path)
+                print(f"  다운로드 재개: {file_id} ({offset} 바이트부터)")
+            fh = open(part_path, 'ab' if offset else 'wb')
+        else:
+            fh = dest
+
+        try:
+            downloader = MediaIoBaseDownload(_HashingWriter(fh, hasher), request, chunksize=chunk_size)
+            # MediaIoBaseDownload 는 _progress 위치부터 Range 요청을 보냄
+            downloader._progress = offset
+            done = False
+            while not done:
+                with metrics.timer('drive_call', op='download.chunk'):
+                    status, done = downloader.next_chunk(num_retries=UPLOAD_RETRIES)
+                if progress:
+                    progress(status.resumable_progress, status.total_size)
+        finally:
+            if part_path:
+                fh.close()
+
+        digest = hasher.hexdigest()
+        if expected_md5 and digest != expected_md5:
+            if part_path:
+                os.remove(part_path)
+            raise ValueError(f"체크섬 불일치 (기대 {expected_md5}, 실제 {digest})")
+        if part_path:
+            os.replace(part_path, dest)
+        return {'bytes': downloader._progress, 'md5': digest}
+
+    def delete_many(self, file_ids):
+        """여러 파일을 배치 요청으로 삭제하고 {file_id: True/False} 반환"""
+        files = self.service.files()
+        results = self.execute_batch([(file_id, files.delete(fileId=file_id)) for file_id in file_ids])
+        outcome = {}
+        for file_id in file_ids:
+            exception = results.get(file_id, (None, RuntimeError("응답 없음")))[1]
+            if exception is not None:
+                print(f"구글 드라이브 파일 삭제 실패 (ID: {file_id}): {exception}")
+            outcome[file_id] = exception is None
+        print(f"구글 드라이브 파일 {sum(outcome.values())}/{len(file_ids)}건 삭제 완료")
+        return outcome
+
+    def bulk_upload(self, items, folder_name="K-Sox", max_workers=BULK_WORKERS):
+        """여러 파일/문서를 동시에 업로드하고 입력 순서대로 항목별 결과 반환
+
+        items 의 각 항목:
+          - 'report.xlsx' 같은 경로 문자열 (구글 시트로 변환 업로드)
+          - {'path': ..., 'folder': ...} 또는 {'title': ..., 'content': ..., 'folder': ...} (구글 문서)
+        결과: {'item', 'ok', 'id', 'link', 'status', 'error', 'seconds'}
+        (status 는 'created' / 'updated' / 'skipped', 파일 업로드의 중복 처리는 upload 참고)
+        """
+        items = [{'path': item} if isinstance(item, str) else item for item in items]
+        # 폴더는 업로드 전에 한 번에 확인해 두어 각 작업이 폴더 조회를 반복하지 않게 함
+        self.resolve_folders([item.get('folder', folder_name) for item in items])
+
+        def run(item):
+            started = time.perf_counter()
+            result = {'item': item, 'ok': False, 'id': None, 'link': None, 'status': None, 'error': None}
+            try:
+                folder = item.get('folder', folder_name)
+                if 'path' in item:
+                    file = self.upload(item['path'], folder)
+                else:
+                    file = self.create_doc(item['title'], item['content'], folder)
+                result.update(ok=True, id=file['id'], link=file['link'], status=file.get('status', 'created'))
+            except Exception as e:
+                result['error'] = str(e)
+                print(f"일괄 업로드 실패: {item.get('path') or item.get('title')} - {e}")
+            result['seconds'] = time.perf_counter() - started
+            return result
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            results = list(executor.map(run, items))
+        counts = {status: sum(r['status'] == status for r in results) for status in ('created', 'updated', 'skipped')}
+        print(f"일괄 업로드 완료: {sum(r['ok'] for r in results)}/{len(results)}건 "
+              f"(생성 {counts['created']}, 갱신 {counts['updated']}, 건너뜀 {counts['skipped']})")
+        return results
+
+    def iter_files(self, folder_name="K-Sox", fields=LIST_FIELDS, page_size=LIST_PAGE_SIZE,
+                   order_by="createdTime desc"):
+        """폴더의 파일을 한 페이지씩 받아오며 하나씩 yield (nextPageToken 이 없을 때까지)"""
+        folder_id = self.folder_id(folder_name)
+        page_token = None
+        while True:
+            request = self.service.files().list(
+                q=f"'{folder_id}' in parents and trashed = false",
+                fields=f"nextPageToken, files({fields})",
+                pageSize=page_size,
+                orderBy=order_by,
+                pageToken=page_token
+            )
+            try:
+                results = request.execute()
+            except HttpError as e:
+                # 캐시된 폴더가 삭제된 경우 - 첫 페이지에서만 폴더를 다시 확인
+                if e.resp.status != 404 or page_token is not None:
+                    raise
+                self.invalidate_folder(folder_name)
+                folder_id = self.folder_id(folder_name)
+                continue
+            yield from results.get('files', [])
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                return
+
+    def sync_metadata(self, folder_name="K-Sox"):
+        """폴더의 로컬 메타데이터 캐시를 최신으로 맞추고 {파일 ID: 메타데이터} 반환
+
+        처음에는 전체 목록을 받고, 이후에는 changes 피드에서 바뀐 파일만 받아 반영한다.
+        (modifiedTime 필터와 달리 삭제/휴지통/폴더 이동도 잡힘)
+        """
+        folder_id = self.folder_id(folder_name)
+        cached = self.metadata.get(folder_id)
+        if cached is not None:
+            try:
+                files, token = self._apply_changes(folder_id, cached['files'], cached['token'])
+            except HttpError as e:
+                # 토큰이 만료/무효가 되면 전체 목록으로 다시 시작
+                if e.resp.status not in (400, 404, 410):
+                    raise
+                print(f"드라이브 변경 피드 토큰 만료 - '{folder_name}' 목록 전체 재조회")
+            else:
+                if token != cached['token']:
+                    self.metadata.put(folder_id, token, files)
+                return files
+
+        # 목록을 받기 전에 토큰을 잡아야 그 사이의 변경을 놓치지 않음
+        token = self.service.changes().getStartPageToken().execute()['startPageToken']
+        files = {item['id']: item for item in self.iter_files(folder_name, CACHE_FIELDS, order_by=None)}
+        self.metadata.put(folder_id, token, files)
+        return files
+
+    def _apply_changes(self, folder_id, files, token):
+        files = dict(files)
+        page_token = token
+        while True:
+            results = self.service.changes().list(
+                pageToken=page_token,
+                pageSize=LIST_PAGE_SIZE,
+                spaces='drive',
+                fields=f"nextPageToken, newStartPageToken, changes(fileId, removed, file({CACHE_FIELDS}))"
+            ).execute()
+            for change in results.get('changes', []):
+                item = change.get('file')
+                if change.get('removed') or not item or item.get('trashed') or folder_id not in item.get('parents', []):
+                    files.pop(change['fileId'], None)
+                else:
+                    files[change['fileId']] = item
+            if 'newStartPageToken' in results:
+                return files, results['newStartPageToken']
+            page_token = results['nextPageToken']
+
+    def list_files(self, folder_name="K-Sox", fields=LIST_FIELDS, use_cache=True):
+        """폴더의 파일 목록 (최근 생성 순)
+
+        use_cache 이고 요청한 필드가 모두 캐시 필드면 로컬 메타데이터 캐시를 갱신해 그 내용을 반환하고,
+        아니면 전체 페이지를 직접 받아온다.
+        """
+        names = _field_names(fields)
+        if not use_cache or not set(names) <= set(_field_names(CACHE_FIELDS)):
+            return list(self.iter_files(folder_name, fields))
+        files = sorted(self.sync_metadata(folder_name).values(),
+                       key=lambda item: item.get('createdTime', ''), reverse=True)
+        return [{name: item[name] for name in names if name in item} for item in files]
+
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """프로세스 전체에서 공유하는 DriveClient"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = DriveClient()
+        return _client
+
+def upload_to_drive(file_path, folder_name="K-Sox", dedup=True):
+    """파일을 구글 드라이브 특정 폴더에 업로드 (내용이 같으면 건너뛰고, 같은 이름이면 갱신)"""
+    try:
+        return get_client().upload(file_path, folder_name, dedup=dedup)
     except Exception as e:
         print(f"구글 드라이브 업로드 중 오류 발생: {e}")
         return None
@@ -89,135 +925,7 @@ def upload_to_drive(file_path, folder_name="K-Sox"):
 def create_google_doc(title, content, folder_name="K-Sox"):
     """마크다운 또는 HTML 내용을 구글 문서(Google Docs)로 생성 (서식 보존)"""
     try:
-        service = get_drive_service()
-        folder_id = get_or_create_folder(service, folder_name)
-        
-        # 마크다운 변환 시도 (ImportError 발생 시 fallback)
-        try:
-            import markdown
-            # tables: 테이블 지원, nl2br: 줄바꿈 지원, sane_lists: 리스트 개선
-            html_body = markdown.markdown(content, extensions=['tables', 'nl2br', 'sane_lists', 'fenced_code'])
-        except ImportError:
-            print("markdown 라이브러리가 없어 plain text 방식으로 처리합니다.")
-            html_body = content.replace('\n', '<br>')
-        except Exception as e:
-            print(f"마크다운 변환 중 오류: {e}")
-            html_body = content.replace('\n', '<br>')
-
-        # 구글 문서 변환 시 표 너비를 문서 폭에 맞게 강제하기 위해 고정 픽셀(700px) 사용
-        # 첫 번째 컬럼(180px), 두 번째 컬럼(100px) 지정을 위해 table-layout: fixed 적용
-        html_body = html_body.replace('<table>', '<table width="700" style="width: 700px; border-collapse: collapse; border: 1px solid #cbd5e1; margin: 20px 0; table-layout: fixed;">')
-        html_body = html_body.replace('<thead>', '<thead style="background-color: #f8fafc;">')
-        html_body = html_body.replace('<th>', '<th style="background-color: #f8fafc; color: #1e293b; font-weight: bold; padding: 8px 10px; border: 1px solid #cbd5e1; text-align: center;">')
-        html_body = html_body.replace('<td>', '<td style="padding: 6px 10px; border: 1px solid #cbd5e1; text-align: left; vertical-align: top; word-wrap: break-word;">')
-
-        # [추가] 헤더(th) 내용에 포함된 강제 줄바꿈 태그 제거 (데이터 차원의 수정)
-        # 이미 스타일이 적용된 <th style="..."> 태그 내부의 내용물에서 <br>과 \n을 공백으로 치환
-        html_body = re.sub(r'(<th[^>]*>)(.*?)(</th>)', 
-                          lambda m: m.group(1) + m.group(2).replace('<br>', ' ').replace('<br/>', ' ').replace('\n', ' ') + m.group(3), 
-                          html_body, 
-                          flags=re.DOTALL | re.IGNORECASE)
-
-        file_metadata = {
-            'name': title,
-            'parents': [folder_id],
-            'mimeType': 'application/vnd.google-apps.document'
-        }
-        
-        import io
-        from googleapiclient.http import MediaIoBaseUpload
-        
-        # UTF-8 BOM을 추가하여 한글 깨짐 방지 및 HTML 선언
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <style>
-                body {{ 
-                    font-family: 'Nanum Gothic', 'Malgun Gothic', sans-serif; 
-                    line-height: 1.6; 
-                    color: #333; 
-                    padding: 20px; 
-                    width: 700px;
-                    margin: 0 auto;
-                }}
-                h1 {{ color: #1e293b; border-bottom: 2px solid #6366f1; padding-bottom: 10px; text-align: center; }}
-                h2 {{ color: #4338ca; margin-top: 30px; border-left: 5px solid #6366f1; padding-left: 10px; background-color: #f1f5f9; padding: 8px 10px; }}
-                h3 {{ color: #1e40af; margin-top: 20px; }}
-                
-                table {{ 
-                    width: 700px !important; 
-                    border-collapse: collapse; 
-                    margin: 20px 0; 
-                    table-layout: fixed;
-                }}
-                th, td {{
-                    border: 1px solid #cbd5e1;
-                    padding: 6px 10px;
-                    text-align: left;
-                    font-size: 10pt;
-                    word-wrap: break-word;
-                    line-height: 1.4;
-                }}
-                th {{
-                    background-color: #f8fafc;
-                    color: #1e293b;
-                    font-weight: bold;
-                    text-align: center;
-                    padding: 8px 10px;
-                    line-height: 1.3;
-                }}
-                
-                /* 첫 번째 컬럼 (종목명 등) - 기존 60px에서 3배인 180px로 확대 */
-                th:first-child, td:first-child {{ 
-                    width: 180px; 
-                    text-align: center; 
-                }}
-                
-                /* 두 번째 컬럼 (업종 등) - 너비 축소 (약 100px) */
-                th:nth-child(2), td:nth-child(2) {{ 
-                    width: 100px; 
-                    text-align: center;
-                }}
-
-                /* 세 번째 컬럼 (추천 요약 등) - 나머지 모든 폭 사용 */
-                th:nth-child(3), td:nth-child(3) {{ 
-                    width: auto; 
-                }}
-                
-                blockquote {{ 
-                    border-left: 4px solid #e2e8f0; 
-                    padding-left: 15px; 
-                    color: #64748b; 
-                    font-style: italic; 
-                    background-color: #f8fafc; 
-                    padding: 10px 15px; 
-                }}
-                .highlight {{ background-color: #fef9c3; padding: 2px 5px; border-radius: 3px; }}
-            </style>
-        </head>
-        <body>
-            {html_body}
-        </body>
-        </html>
-        """
-        
-        fh = io.BytesIO(html_content.encode('utf-8'))
-        media = MediaIoBaseUpload(fh, mimetype='text/html', resumable=True)
-        
-        file = service.files().create(
-            body=file_metadata,
-            media_body=media,
-            fields='id, webViewLink'
-        ).execute()
-        
-        print(f"구글 문서 생성 완료: {title} (ID: {file.get('id')})")
-        return {
-            'id': file.get('id'),
-            'link': file.get('webViewLink')
-        }
-        
+        return get_client().create_doc(title, content, folder_name)
     except Exception as e:
         print(f"구글 문서 생성 중 오류 발생: {e}")
         return None
@@ -227,41 +935,50 @@ def delete_from_drive(file_id):
     if not file_id:
         return False
     try:
-        service = get_drive_service()
-        service.files().delete(fileId=file_id).execute()
-        print(f"구글 드라이브 파일 삭제 완료 (ID: {file_id})")
-        return True
+        return get_client().delete(file_id)
     except Exception as e:
         print(f"구글 드라이브 파일 삭제 중 오류 발생: {e}")
         return False
 
+def bulk_upload_to_drive(items, folder_name="K-Sox", max_workers=BULK_WORKERS):
+    """여러 파일/문서를 동시에 업로드 (항목별 결과 목록 반환, 항목 형식은 DriveClient.bulk_upload 참고)"""
+    try:
+        return get_client().bulk_upload(items, folder_name, max_workers)
+    except Exception as e:
+        print(f"구글 드라이브 일괄 업로드 중 오류 발생: {e}")
+        return []
+
+def delete_many_from_drive(file_ids):
+    """여러 파일을 배치 요청 한 번으로 삭제 ({file_id: 성공 여부} 반환)"""
+    file_ids = [file_id for file_id in file_ids if file_id]
+    if not file_ids:
+        return {}
+    try:
+        return get_client().delete_many(file_ids)
+    except Exception as e:
+        print(f"구글 드라이브 일괄 삭제 중 오류 발생: {e}")
+        return {file_id: False for file_id in file_ids}
+
 def download_from_drive(file_id):
     """구글 드라이브에서 파일을 엑셀 형식으로 다운로드"""
     try:
-        service = get_drive_service()
-        # 구글 시트를 엑셀로 내보내기
-        request = service.files().export_media(
-            fileId=file_id,
-            mimeType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        return request.execute()
+        return get_client().download(file_id)
+    except Exception as e:
+        print(f"구글 드라이브 다운로드 중 오류 발생: {e}")
+        return None
+
+def download_file_from_drive(file_id, dest, export=True):
+    """구글 드라이브 파일을 청크 단위로 dest(경로 또는 파일 객체)에 저장 (큰 파일용)"""
+    try:
+        return get_client().download_to(file_id, dest, export=export)
     except Exception as e:
         print(f"구글 드라이브 다운로드 중 오류 발생: {e}")
         return None
 
-def list_files_in_folder(folder_name="K-Sox"):
-    """구글 드라이브 특정 폴더의 파일 목록 가져오기"""
+def list_files_in_folder(folder_name="K-Sox", fields=LIST_FIELDS, use_cache=True):
+    """구글 드라이브 특정 폴더의 파일 목록 가져오기 (로컬 메타데이터 캐시 사용)"""
     try:
-        service = get_drive_service()
-        folder_id = get_or_create_folder(service, folder_name)
-        
-        query = f"'{folder_id}' in parents and trashed = false"
-        results = service.files().list(
-            q=query, 
-            fields="files(id, name, mimeType, createdTime, webViewLink, size)",
-            orderBy="createdTime desc"
-        ).execute()
-        return results.get('files', [])
+        return get_client().list_files(folder_name, fields, use_cache)
     except Exception as e:
         print(f"구글 드라이브 목록 조회 중 오류 발생: {e}")
         return []
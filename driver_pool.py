@@ -0,0 +1,141 @@
+import os
+import json
+import time
+import queue
+import threading
+from contextlib import contextmanager
+
+# 확인된 chromedriver 경로를 저장해 두는 파일 (매 실행마다 ChromeDriverManager 조회를 피함)
+DRIVER_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.chromedriver_cache.json')
+DRIVER_CACHE_MAX_AGE = 7 * 24 * 3600
+
+
+def resolve_chromedriver(cache_path=DRIVER_CACHE_PATH, max_age=DRIVER_CACHE_MAX_AGE):
+    """chromedriver 경로 반환 - 캐시가 유효하면 ChromeDriverManager 를 호출하지 않음"""
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if os.path.exists(cached['path']) and time.time() - cached['resolved_at'] < max_age:
+                return cached['path']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    from webdriver_manager.chrome import ChromeDriverManager
+    path = ChromeDriverManager().install()
+    try:
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump({'path': path, 'resolved_at': time.time()}, f)
+    except OSError as e:
+        print(f"chromedriver 경로 캐시 저장 실패: {e}")
+    return path
+
+
+class _PooledDriver:
+    def __init__(self, driver, owned=True):
+        self.driver = driver
+        self.owned = owned
+        self.created = time.monotonic()
+        self.last_used = self.created
+        self.uses = 0
+        self.suspect = False
+
+
+class DriverPool:
+    """따뜻한(이미 실행 중인) 브라우저를 재사용하는 드라이버 풀
+
+    - 최대 size 개까지 필요할 때 만들고, 반납된 드라이버는 다음 요청에 그대로 재사용
+    - max_uses 회 사용했거나 max_age 초가 지난 드라이버는 메모리 누적을 막기 위해 새로 띄움
+    - 오류가 났거나 idle_check 초 이상 쉬었던 드라이버는 꺼내기 전에 health check
+    """
+
+    def __init__(self, factory, size=1, max_uses=200, max_age=1800, idle_check=60, drivers=None):
+        self.factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.idle_check = idle_check
+        # 가장 최근에 쓴(가장 따뜻한) 드라이버부터 꺼냄
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+        self.lock = threading.Lock()
+        self.live = []
+        # 외부에서 만든 드라이버는 풀이 종료하지 않음
+        for driver in drivers or []:
+            self._track(_PooledDriver(driver, owned=False))
+
+    def _track(self, entry):
+        with self.lock:
+            self.live.append(entry)
+        self.idle.put(entry)
+
+    def _discard(self, entry, reason):
+        with self.lock:
+            if entry in self.live:
+                self.live.remove(entry)
+        if entry.owned:
+            print(f"    [driver-pool] 드라이버 교체 ({reason})")
+            try:
+                entry.driver.quit()
+            except Exception:
+                pass
+
+    @staticmethod
+    def healthy(driver):
+        try:
+            driver.execute_script('return document.readyState')
+            return True
+        except Exception:
+            return False
+
+    def _checkout(self):
+        while True:
+            try:
+                entry = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            now = time.monotonic()
+            if entry.owned and entry.uses >= self.max_uses:
+                self._discard(entry, f"{entry.uses}회 사용")
+            elif entry.owned and now - entry.created >= self.max_age:
+                self._discard(entry, "수명 초과")
+            elif (entry.suspect or now - entry.last_used >= self.idle_check) and not self.healthy(entry.driver):
+                self._discard(entry, "health check 실패")
+            else:
+                entry.suspect = False
+                return entry
+        if self.factory is None:
+            raise RuntimeError("사용 가능한 드라이버가 없습니다.")
+        entry = _PooledDriver(self.factory())
+        with self.lock:
+            self.live.append(entry)
+        return entry
+
+    @contextmanager
+    def driver(self):
+        """드라이버 하나를 빌려 블록 실행 후 반납 (동시에 최대 size 개)"""
+        with self.slots:
+            entry = self._checkout()
+            try:
+                yield entry.driver
+            except BaseException:
+                # 오류가 난 드라이버는 다음에 꺼낼 때 health check
+                entry.suspect = True
+                raise
+            finally:
+                entry.uses += 1
+                entry.last_used = time.monotonic()
+                self.idle.put(entry)
+
+    def close(self):
+        """풀이 만든 드라이버를 모두 종료"""
+        with self.lock:
+            entries, self.live = self.live, []
+        for entry in entries:
+            if entry.owned:
+                try:
+                    entry.driver.quit()
+                except Exception:
+                    pass
+        while not self.idle.empty():
+            self.idle.get_nowait()
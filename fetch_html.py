@@ -1,14 +1,41 @@
-import requests
-
-url = "https://www.k-icfr.org/bbs/board.php?bo_table=sub05_02"
-headers = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-}
-try:
-    res = requests.get(url, headers=headers)
-    res.raise_for_status()
-    with open('debug_page.html', 'w', encoding='utf-8') as f:
-        f.write(res.text)
-    print("Download complete.")
-except Exception as e:
-    print(f"Error: {e}")
+import os
+import sys
+import argparse
+from fetcher import HttpFetcher
+from http_cache import ResponseCache, DEFAULT_CACHE_DIR
+
+# 구조 확인용으로 게시판 페이지 원본을 저장 (crawler 와 같은 페이지 캐시를 써서 바뀌지 않았으면 다시 받지 않음)
+DEFAULT_URL = "https://www.k-icfr.org/bbs/board.php?bo_table=sub05_02"
+DEFAULT_OUTPUT = 'debug_page.html'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="게시판 페이지 HTML 저장")
+    parser.add_argument('url', nargs='?', default=DEFAULT_URL)
+    parser.add_argument('--out', default=DEFAULT_OUTPUT, help=f"저장할 파일 (기본: {DEFAULT_OUTPUT})")
+    parser.add_argument('--cache', default=DEFAULT_CACHE_DIR, help="페이지 캐시 폴더")
+    parser.add_argument('--no-cache', dest='cache', action='store_const', const=None, help="캐시 없이 항상 다시 받기")
+    args = parser.parse_args(argv)
+
+    cache = ResponseCache(args.cache) if args.cache else None
+    fetcher = HttpFetcher(pool_size=1, cache=cache)
+    try:
+        page = fetcher.get(args.url)
+        if page.cache_state in ('unchanged', 'revalidated') and os.path.exists(args.out):
+            print(f"변경 없음 ({page.cache_state}): {args.out}")
+            return 0
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(page.html)
+        print(f"Download complete. ({page.cache_state or 'no-cache'})")
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+    finally:
+        fetcher.close()
+        if cache is not None:
+            cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
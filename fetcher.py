@@ -0,0 +1,294 @@
+import time
+from contextlib import nullcontext
+import requests
+from requests.adapters import HTTPAdapter
+import html_parser
+import metrics
+from ratelimit import AdaptiveDelay
+from driver_pool import DriverPool
+from http_cache import body_hash
+
+# 실제 브라우저와 동일한 User-Agent (crawler.init_driver 와 동일)
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+DEFAULT_TIMEOUT = 15
+MAX_RETRIES = 3
+# 이 상태코드는 서버 과부하로 보고 대기시간을 늘린 뒤 재시도
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# 재시도 후에도 이 상태코드면 봇 차단으로 보고 브라우저 백엔드로 전환
+BLOCK_STATUSES = {403, 429}
+# 브라우저 백엔드로 전환한 뒤 다시 HTTP 로 시도하기까지의 시간 (초)
+FALLBACK_SECONDS = 600
+
+
+class Page:
+    """가져온 페이지 (URL, HTML, 상태코드) - doc 은 처음 접근할 때 한 번만 파싱
+
+    캐시에서 같은 본문을 이미 파싱해 두었으면 doc 으로 넘겨받아 다시 파싱하지 않고,
+    on_parse 가 있으면 새로 파싱한 문서를 넘겨준다 (캐시에 기억).
+    cache_state 는 캐시를 쓸 때 'miss' / 'changed' / 'unchanged' / 'revalidated'(304),
+    verified 는 같은 본문에서 이전에 있는 것으로 확인한 wait_for 선택자.
+    """
+
+    def __init__(self, url, html, status=200, doc=None, on_parse=None, cache_state=None, verified=None):
+        self.url = url
+        self.html = html
+        self.status = status
+        self._doc = doc
+        self.on_parse = on_parse
+        self.cache_state = cache_state
+        self.verified = verified
+
+    @property
+    def doc(self):
+        """html_parser 기본 백엔드로 파싱한 문서 (select/select_one/get_text 지원)"""
+        if self._doc is None:
+            with metrics.timer('parse'):
+                self._doc = html_parser.parse(self.html)
+            if self.on_parse:
+                self.on_parse(self._doc)
+        return self._doc
+
+    # 이전 이름 호환
+    soup = doc
+
+    def ready(self, wait_for):
+        """wait_for 요소가 있는 응답인지 - 캐시와 본문이 같고 같은 선택자로 확인했으면 파싱하지 않고 True
+
+        캐시 항목에는 저장할 때 확인한 선택자가 함께 기록되므로, wait_for 없이 가져와 저장한 본문
+        (structure_check/fetch_html 등)이나 다른 선택자로 확인한 본문은 다시 확인한다.
+        """
+        if not wait_for:
+            return True
+        if self.cache_state in ('unchanged', 'revalidated') and self.verified == wait_for:
+            return True
+        return self.doc.select_one(wait_for) is not None
+
+
+class HttpFetcher:
+    """requests.Session 기반 기본 백엔드 (커넥션 풀 재사용)"""
+
+    name = 'http'
+
+    def __init__(self, pool_size=10, timeout=DEFAULT_TIMEOUT, headers=None, limiter=None,
+                 delay=None, max_retries=MAX_RETRIES, cache=None):
+        self.timeout = timeout
+        # http_cache.ResponseCache - 있으면 조건부 요청을 보내고 바뀌지 않은 페이지는 파싱한 문서를 재사용
+        self.cache = cache
+        self.limiter = limiter
+        self.delay = delay or AdaptiveDelay(name='http')
+        self.max_retries = max_retries
+        # 세션 커넥션 풀 크기만큼 상세 페이지를 동시에 가져올 수 있음
+        self.max_concurrency = pool_size
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept-Language': 'ko-KR,ko;q=0.9,en;q=0.8',
+        })
+        if headers:
+            self.session.headers.update(headers)
+
+    def get(self, url, wait_for=None):
+        """URL 을 가져와 Page 반환
+
+        wait_for 선택자가 주어지면 해당 요소가 있는 응답을 받을 때까지 재시도한다
+        (끝내 없으면 마지막 응답을 그대로 반환).
+        """
+        entry = self.cache.lookup(url) if self.cache else None
+        for attempt in range(self.max_retries + 1):
+            last = attempt == self.max_retries
+            self.delay.wait()
+            started = time.monotonic()
+            try:
+                res = self._request(url, self.cache.validators(entry) if entry else None)
+                if res.status_code == 304 and entry:
+                    cached = self.cache.load(url)
+                    if cached is None:
+                        # 본문 파일이 지워졌으면 조건 없이 다시 요청
+                        entry = None
+                        res = self._request(url)
+            except (requests.Timeout, requests.ConnectionError) as e:
+                if last:
+                    metrics.inc('errors_total', stage='http', reason=type(e).__name__)
+                    raise
+                metrics.inc('retries_total', component='http', reason=type(e).__name__)
+                self.delay.on_failure(f"타임아웃/연결 오류({type(e).__name__})")
+                continue
+            latency = time.monotonic() - started
+            metrics.observe('request_seconds', latency, backend=self.name)
+
+            if res.status_code in RETRY_STATUSES and not last:
+                metrics.inc('retries_total', component='http', reason=str(res.status_code))
+                self.delay.on_failure(f"HTTP {res.status_code}", _retry_after(res))
+                continue
+            if res.status_code >= 400:
+                metrics.inc('errors_total', stage='http', reason=str(res.status_code))
+            res.raise_for_status()
+
+            if res.status_code == 304 and entry:
+                page = self._cached_page(url, entry['final_url'], cached, entry['body_hash'], 'revalidated',
+                                         entry['verified'])
+            else:
+                # Content-Type 에 charset 이 없으면 requests 가 ISO-8859-1 로 가정하므로 본문 기준으로 추정
+                if not res.encoding or res.encoding.lower() == 'iso-8859-1':
+                    res.encoding = res.apparent_encoding
+                if self.cache:
+                    # 검증값을 주지 않는 서버도 본문 해시가 같으면 바뀌지 않은 것으로 보고 파싱 결과 재사용
+                    digest = body_hash(res.text)
+                    state = 'miss' if entry is None else 'unchanged' if entry['body_hash'] == digest else 'changed'
+                    page = self._cached_page(url, res.url, res.text, digest, state,
+                                             entry['verified'] if state == 'unchanged' else None)
+                else:
+                    page = Page(res.url, res.text, res.status_code)
+
+            if not page.ready(wait_for) and not last:
+                metrics.inc('retries_total', component='http', reason='missing_selector')
+                self.delay.on_failure(f"'{wait_for}' 요소 없음")
+                continue
+            if self.cache:
+                metrics.inc('cache_total', result=page.cache_state)
+                # 요소가 빠진 응답(점검 페이지 등)은 저장하지 않음, 확인한 선택자를 함께 기록
+                if page.cache_state == 'revalidated':
+                    self.cache.touch(url)
+                elif res.status_code == 200 and page.ready(wait_for):
+                    self.cache.store(url, res.url, res.text, res.headers.get('ETag'), res.headers.get('Last-Modified'),
+                                     verified=wait_for)
+            self.delay.on_success(latency)
+            return page
+
+    def _request(self, url, headers=None):
+        with self.limiter.slot(url) if self.limiter else nullcontext():
+            return self.session.get(url, timeout=self.timeout, headers=headers)
+
+    def _cached_page(self, url, final_url, html, digest, state, verified=None):
+        """캐시에 같은 본문의 파싱 결과가 있으면 재사용하는 Page"""
+        return Page(final_url, html, 200, doc=self.cache.parsed_doc(url, digest), cache_state=state,
+                    verified=verified, on_parse=lambda doc: self.cache.remember_doc(url, digest, doc))
+
+    def close(self):
+        self.session.close()
+
+
+class SeleniumFetcher:
+    """Selenium 드라이버 백엔드 (HTTP 로 수집이 안 될 때만 사용하는 fallback)
+
+    드라이버는 DriverPool 에서 빌려 쓰며, 풀은 처음 요청할 때 드라이버를 만들므로
+    HTTP 로 끝나는 실행에서는 브라우저를 띄우지 않는다. 동시 수집 수는 풀 크기와 같다.
+    """
+
+    name = 'selenium'
+
+    def __init__(self, driver_factory=None, driver=None, limiter=None, delay=None, timeout=DEFAULT_TIMEOUT,
+                 pool=None):
+        self.pool = pool or DriverPool(driver_factory, size=1, drivers=[driver] if driver else None)
+        self.limiter = limiter
+        self.delay = delay or AdaptiveDelay(name='selenium')
+        self.timeout = timeout
+
+    @property
+    def max_concurrency(self):
+        return self.pool.size
+
+    def get(self, url, wait_for=None):
+        """페이지 이동 후 wait_for 요소가 나타날 때까지 대기 (고정 sleep 대신)"""
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+
+        with self.pool.driver() as driver:
+            self.delay.wait()
+            started = time.monotonic()
+            with self.limiter.slot(url) if self.limiter else nullcontext():
+                driver.get(url)
+            if wait_for:
+                try:
+                    WebDriverWait(driver, self.timeout).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, wait_for)))
+                except TimeoutException:
+                    metrics.inc('errors_total', stage='selenium', reason='wait_timeout')
+                    self.delay.on_failure(f"'{wait_for}' 대기 시간 초과")
+                    return Page(driver.current_url, driver.page_source)
+            latency = time.monotonic() - started
+            metrics.observe('request_seconds', latency, backend=self.name)
+            self.delay.on_success(latency)
+            return Page(driver.current_url, driver.page_source)
+
+    def close(self):
+        self.pool.close()
+
+
+class FallbackFetcher:
+    """기본 백엔드로 시도하고 차단/연결 실패로 보이면 fallback 백엔드로 전환
+
+    전환하는 경우: 타임아웃/연결 오류, 재시도 후에도 403/429, wait_for 요소가 끝내 없는 응답.
+    404/410 같은 그 밖의 HTTP 오류는 그 글만의 문제이므로 전환하지 않고 그대로 올린다.
+    전환은 fallback_seconds 동안만 유지하고, 그 뒤에는 다시 기본 백엔드로 시도한다
+    (상주 실행에서 한 번의 장애로 계속 브라우저로 수집하지 않도록).
+    """
+
+    def __init__(self, primary, fallback, fallback_seconds=FALLBACK_SECONDS):
+        self.primary = primary
+        self.fallback = fallback
+        self.fallback_seconds = fallback_seconds
+        self.fallback_until = 0.0
+
+    @property
+    def active(self):
+        return self.fallback if time.monotonic() < self.fallback_until else self.primary
+
+    @property
+    def name(self):
+        return self.active.name
+
+    @property
+    def max_concurrency(self):
+        return self.active.max_concurrency
+
+    def get(self, url, wait_for=None):
+        if self.active is self.fallback:
+            return self.fallback.get(url, wait_for=wait_for)
+        page = error = None
+        try:
+            page = self.primary.get(url, wait_for=wait_for)
+            if page.ready(wait_for):
+                return page
+            reason = f"'{wait_for}' 요소 없음"
+        except (requests.Timeout, requests.ConnectionError) as e:
+            error, reason = e, f"요청 실패({e})"
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code not in BLOCK_STATUSES:
+                raise
+            error, reason = e, f"차단 응답({e.response.status_code})"
+        print(f"    [{self.primary.name}] {reason}, {self.fallback_seconds:g}초 동안 {self.fallback.name} 백엔드로 수집합니다.")
+        metrics.inc('fallbacks_total', backend=self.fallback.name)
+        try:
+            result = self.fallback.get(url, wait_for=wait_for)
+        except Exception as e:
+            # 브라우저를 쓸 수 없으면 전환하지 않고 원래 결과로 처리 (요소가 빠진 응답 또는 원래 오류)
+            print(f"    [{self.fallback.name}] 사용할 수 없습니다({e}).")
+            metrics.inc('errors_total', stage='fallback', reason=type(e).__name__)
+            if page is None:
+                raise error
+            return page
+        self.fallback_until = time.monotonic() + self.fallback_seconds
+        return result
+
+    def close(self):
+        self.primary.close()
+        self.fallback.close()
+
+
+def _retry_after(res):
+    """Retry-After 헤더(초 단위)를 숫자로, 없거나 날짜 형식이면 None"""
+    value = res.headers.get('Retry-After', '')
+    return float(value) if value.isdigit() else None
+
+
+def as_fetcher(source):
+    """fetcher 또는 Selenium WebDriver 를 받아 fetcher 로 반환 (기존 driver 인자 호환)"""
+    if hasattr(source, 'page_source'):
+        return SeleniumFetcher(driver=source)
+    return source
@@ -0,0 +1,104 @@
+# HTML 파싱 백엔드 추상화
+# crawler 가 쓰는 BeautifulSoup 메서드(select, select_one, get_text, get)와 같은 이름의
+# 인터페이스를 lxml / selectolax(lexbor) 위에 제공한다. 빠른 백엔드는 선택 설치이며,
+# 없으면 BeautifulSoup(html.parser)로 동작한다.
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml.html
+    import cssselect  # noqa: F401 (lxml 의 cssselect() 에 필요)
+except ImportError:
+    lxml = None
+
+# 본문 텍스트에 포함하지 않는 태그 (BeautifulSoup get_text 와 동일하게 제외)
+SKIP_TAGS = ('script', 'style', 'template')
+
+
+class LxmlNode:
+    def __init__(self, element):
+        self.element = element
+
+    def select(self, selector):
+        return [LxmlNode(e) for e in self.element.cssselect(selector)]
+
+    def select_one(self, selector):
+        found = self.element.cssselect(selector)
+        return LxmlNode(found[0]) if found else None
+
+    def get_text(self, separator=''):
+        return separator.join(self.element.itertext())
+
+    def get(self, name, default=None):
+        return self.element.get(name, default)
+
+
+class LexborNode:
+    def __init__(self, node):
+        self.node = node
+
+    def select(self, selector):
+        return [LexborNode(n) for n in self.node.css(selector)]
+
+    def select_one(self, selector):
+        found = self.node.css_first(selector)
+        return LexborNode(found) if found is not None else None
+
+    def get_text(self, separator=''):
+        return self.node.text(deep=True, separator=separator)
+
+    def get(self, name, default=None):
+        value = self.node.attributes.get(name)
+        return default if value is None else value
+
+
+def _parse_bs4(html):
+    return BeautifulSoup(html, 'html.parser')
+
+
+def _parse_lxml(html):
+    if not html.strip():
+        html = '<html></html>'
+    root = lxml.html.document_fromstring(html)
+    for element in list(root.iter(*SKIP_TAGS)):
+        element.drop_tree()
+    return LxmlNode(root)
+
+
+def _parse_selectolax(html):
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(list(SKIP_TAGS))
+    return LexborNode(tree.root)
+
+
+BACKENDS = {'bs4': _parse_bs4}
+if lxml is not None:
+    BACKENDS['lxml'] = _parse_lxml
+if LexborHTMLParser is not None:
+    BACKENDS['selectolax'] = _parse_selectolax
+
+# 설치된 것 중 가장 빠른 백엔드를 기본으로
+DEFAULT_BACKEND = 'selectolax' if 'selectolax' in BACKENDS else 'lxml' if 'lxml' in BACKENDS else 'bs4'
+
+
+def available_backends():
+    return list(BACKENDS)
+
+
+def parse(html, backend=None):
+    """html 을 파싱해 select/select_one/get_text/get 을 지원하는 문서 객체 반환"""
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"사용할 수 없는 HTML 파서입니다: {backend} (가능: {', '.join(BACKENDS)})")
+    return BACKENDS[backend](html)
+
+
+def set_default_backend(backend):
+    global DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"사용할 수 없는 HTML 파서입니다: {backend} (가능: {', '.join(BACKENDS)})")
+    DEFAULT_BACKEND = backend
@@ -0,0 +1,186 @@
+# 수집 페이지 디스크 캐시 (조건부 요청 + 본문 해시 비교)
+# - 본문은 URL 해시 이름의 파일로, 검증값(ETag/Last-Modified)/본문 해시/크기/마지막 사용 시각은 SQLite 색인에 저장
+# - 다음 요청 때 If-None-Match / If-Modified-Since 를 보내고 304 면 저장된 본문을 씀
+# - 서버가 검증값을 주지 않으면(k-icfr 의 asp 페이지 등) 본문을 받아 해시로 변경 여부만 판단
+# - 바뀌지 않은 페이지는 같은 프로세스 안에서 파싱한 문서를 재사용 (다시 파싱하지 않음)
+#   파싱 결과는 메모리에만 있으므로 이 재사용은 상주 실행(daemon.py)에서만 효과가 있다.
+#   한 번 실행하는 crawler.py 는 대신 wait_for 확인을 생략하고(저장된 본문은 이미 확인됨),
+#   상태 DB 의 목록 본문 해시(CrawlState.list_hashes)로 바뀌지 않은 목록 페이지를 건너뛴다.
+# - 전체 크기가 max_bytes 를 넘으면 오래 안 쓴 항목부터 삭제 (LRU)
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from crawl_state import DEFAULT_STATE_PATH
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(DEFAULT_STATE_PATH), '.http_cache')
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+# 파싱한 문서를 메모리에 들고 있는 페이지 수
+PARSED_ENTRIES = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    url TEXT PRIMARY KEY,
+    final_url TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    body_hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    fetched REAL,
+    accessed REAL,
+    verified TEXT
+)
+"""
+
+
+def body_hash(html):
+    return hashlib.sha256(html.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """URL 단위 응답 캐시 (스레드 안전, 여러 fetcher 가 공유 가능)"""
+
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, parsed_entries=PARSED_ENTRIES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.parsed_entries = parsed_entries
+        os.makedirs(root, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(root, 'index.db'), check_same_thread=False)
+        self.lock = threading.Lock()
+        # url -> (본문 해시, 파싱한 문서)
+        self.parsed = OrderedDict()
+        with self.lock, self.conn:
+            self.conn.execute(SCHEMA)
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(entries)")]
+            if 'verified' not in columns:
+                # 이전 버전 색인 - 확인된 선택자가 없는 것으로 시작
+                self.conn.execute("ALTER TABLE entries ADD COLUMN verified TEXT")
+            self.total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _path(self, url):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.root, key[:2], key + '.html')
+
+    def lookup(self, url):
+        """저장된 항목 {'final_url', 'etag', 'last_modified', 'body_hash', 'verified'} (없으면 None)
+
+        verified 는 이 본문에 있는 것으로 확인한 wait_for 선택자 (확인하지 않고 저장했으면 None).
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT final_url, etag, last_modified, body_hash, verified FROM entries WHERE url = ?",
+                (url,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('final_url', 'etag', 'last_modified', 'body_hash', 'verified'), row))
+
+    def validators(self, entry):
+        """조건부 요청 헤더"""
+        headers = {}
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def load(self, url):
+        """저장된 본문 (파일이 없어졌으면 색인에서도 지우고 None)"""
+        try:
+            with open(self._path(url), encoding='utf-8') as f:
+                html = f.read()
+        except OSError:
+            self._remove(url)
+            return None
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE entries SET accessed = ? WHERE url = ?", (time.time(), url))
+        return html
+
+    def store(self, url, final_url, html, etag=None, last_modified=None, verified=None):
+        """새 응답 저장 -> 본문 해시 (내용이 같으면 파일은 다시 쓰지 않고 검증값/시각만 갱신)
+
+        verified 는 본문에서 확인한 wait_for 선택자. 본문이 같으면 이전에 확인한 선택자를 유지한다.
+        """
+        digest = body_hash(html)
+        size = len(html.encode('utf-8'))
+        previous = self.lookup(url)
+        if previous is None or previous['body_hash'] != digest or not os.path.exists(self._path(url)):
+            path = self._path(url)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(html)
+            os.replace(tmp_path, path)
+        if verified is None and previous is not None and previous['body_hash'] == digest:
+            verified = previous['verified']
+        now = time.time()
+        with self.lock, self.conn:
+            row = self.conn.execute("SELECT size FROM entries WHERE url = ?", (url,)).fetchone()
+            self.total += size - (row[0] if row else 0)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(url, final_url, etag, last_modified, body_hash, size, fetched, accessed, verified) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, final_url, etag, last_modified, digest, size, now, now, verified))
+        if self.total > self.max_bytes:
+            self.evict()
+        return digest
+
+    def touch(self, url):
+        """304 로 확인된 항목의 검증 시각 갱신"""
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE entries SET fetched = ?, accessed = ? WHERE url = ?", (now, now, url))
+
+    # --- 파싱한 문서 재사용 ---
+
+    def parsed_doc(self, url, digest):
+        """같은 본문을 이미 파싱했으면 그 문서 (없으면 None)"""
+        with self.lock:
+            found = self.parsed.get(url)
+            if found is None or found[0] != digest:
+                return None
+            self.parsed.move_to_end(url)
+            return found[1]
+
+    def remember_doc(self, url, digest, doc):
+        with self.lock:
+            self.parsed[url] = (digest, doc)
+            self.parsed.move_to_end(url)
+            while len(self.parsed) > self.parsed_entries:
+                self.parsed.popitem(last=False)
+
+    # --- 정리 ---
+
+    def _remove(self, url):
+        with self.lock, self.conn:
+            row = self.conn.execute("SELECT size FROM entries WHERE url = ?", (url,)).fetchone()
+            if row:
+                self.total -= row[0]
+                self.conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+            self.parsed.pop(url, None)
+
+    def evict(self, target=None):
+        """전체 크기가 target(기본 max_bytes 의 90%) 이하가 될 때까지 오래 안 쓴 항목 삭제 -> 삭제 건수"""
+        target = int(self.max_bytes * 0.9) if target is None else target
+        removed = []
+        with self.lock, self.conn:
+            for url, size in self.conn.execute("SELECT url, size FROM entries ORDER BY accessed").fetchall():
+                if self.total <= target:
+                    break
+                removed.append(url)
+                self.total -= size
+            self.conn.executemany("DELETE FROM entries WHERE url = ?", [(url,) for url in removed])
+            for url in removed:
+                self.parsed.pop(url, None)
+        for url in removed:
+            try:
+                os.remove(self._path(url))
+            except OSError:
+                pass
+        return len(removed)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,187 @@
+import os
+import json
+import time
+import threading
+import datetime
+from contextlib import contextmanager
+
+# 지연시간 히스토그램 구간(초) - 파싱(ms 단위)부터 느린 페이지 로드/백오프(수십 초)까지
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Prometheus 텍스트 내보내기 시 메트릭 이름 앞에 붙이는 접두사
+PROMETHEUS_PREFIX = 'kicfr_'
+
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items())))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _label_text(labels):
+    """(('board', 'Q&A'),) -> '{board="Q&A"}' (Prometheus 레이블 표기)"""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels) + '}'
+
+
+class Histogram:
+    """고정 구간 히스토그램 (count/sum/min/max 와 구간별 누적 개수)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def quantile(self, q):
+        """구간 상한으로 추정한 분위수 (마지막 구간을 넘으면 max)"""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'total': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'max': self.max,
+        }
+
+
+class Metrics:
+    """수집/동기화 실행 중 카운터와 지연시간 히스토그램을 모으는 레지스트리 (스레드 안전)
+
+    - inc('pages_total', board='Q&A') : 카운터 증가
+    - observe('stage_seconds', 0.3, stage='parse') : 히스토그램에 값 추가
+    - with timer('list_fetch'): ... : 블록 실행 시간을 stage_seconds{stage=...} 에 기록
+    단계는 겹칠 수 있다 (예: wait_for 가 있는 fetch 안에서 parse 가 일어남).
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.counters = {}
+            self.histograms = {}
+            self.started = time.time()
+
+    def inc(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = _key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, stage, **labels):
+        """블록 실행 시간을 stage_seconds 히스토그램에 기록 (예외가 나도 기록)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('stage_seconds', time.perf_counter() - started, stage=stage, **labels)
+
+    def counter(self, name, **labels):
+        with self.lock:
+            return self.counters.get(_key(name, labels), 0)
+
+    # --- 리포트 ---
+
+    def summary(self):
+        """JSON 으로 저장할 실행 요약 - 단계별 시간 분포와 카운터"""
+        with self.lock:
+            counters = {f"{name}{_label_text(labels)}": value
+                        for (name, labels), value in sorted(self.counters.items())}
+            histograms = {f"{name}{_label_text(labels)}": histogram.summary()
+                          for (name, labels), histogram in sorted(self.histograms.items())}
+        return {
+            'started': datetime.datetime.fromtimestamp(self.started).isoformat(timespec='seconds'),
+            'elapsed_seconds': round(time.time() - self.started, 3),
+            'counters': counters,
+            'histograms': histograms,
+        }
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+
+    def to_prometheus(self, prefix=PROMETHEUS_PREFIX):
+        """Prometheus 텍스트 노출 형식 (카운터는 counter, 히스토그램은 _bucket/_sum/_count)"""
+        lines = []
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items(), key=lambda item: item[0])
+            declared = set()
+            for (name, labels), value in counters:
+                metric = prefix + name
+                if metric not in declared:
+                    lines.append(f"# TYPE {metric} counter")
+                    declared.add(metric)
+                lines.append(f"{metric}{_label_text(labels)} {value}")
+            for (name, labels), histogram in histograms:
+                metric = prefix + name
+                if metric not in declared:
+                    lines.append(f"# TYPE {metric} histogram")
+                    declared.add(metric)
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f"{metric}_bucket{_label_text(labels + (('le', repr(bound)),))} {cumulative}")
+                lines.append(f"{metric}_bucket{_label_text(labels + (('le', '+Inf'),))} {histogram.count}")
+                lines.append(f"{metric}_sum{_label_text(labels)} {histogram.sum}")
+                lines.append(f"{metric}_count{_label_text(labels)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path, prefix=PROMETHEUS_PREFIX):
+        # node_exporter textfile collector 가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus(prefix))
+        os.replace(tmp_path, path)
+
+    def print_summary(self):
+        """단계별 소요 시간과 카운터를 콘솔에 출력"""
+        summary = self.summary()
+        print(f"\n--- 실행 요약 ({summary['elapsed_seconds']:.1f}s) ---")
+        for name, h in summary['histograms'].items():
+            print(f"  {name:<60} {h['count']:>6}회  합계 {h['total']:>8.2f}s  p50 {h['p50']:.3f}s  p95 {h['p95']:.3f}s")
+        for name, value in summary['counters'].items():
+            print(f"  {name:<60} {value:>6}")
+
+
+# 프로세스 전체에서 공유하는 기본 레지스트리
+METRICS = Metrics()
+inc = METRICS.inc
+observe = METRICS.observe
+timer = METRICS.timer
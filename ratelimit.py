@@ -0,0 +1,124 @@
+import time
+import random
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+import metrics
+
+
+class TokenBucket:
+    """토큰 버킷 - 초당 rate 개, 최대 burst 개까지 몰아서 허용"""
+
+    def __init__(self, rate, burst=1, name='bucket'):
+        self.name = name
+        self.rate = float(rate)
+        self.capacity = float(max(burst, 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 하나를 얻을 때까지 대기"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+        if waited:
+            metrics.observe('stage_seconds', waited, stage='throttle', source=self.name)
+
+
+class HostLimiter:
+    """호스트별 요청 속도(토큰 버킷)와 동시 요청 수(in-flight) 제한"""
+
+    def __init__(self, rate=2.0, burst=2, max_in_flight=4, overrides=None):
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        # {'www.k-icfr.org': {'rate': 2.0, 'burst': 2, 'max_in_flight': 4}}
+        self.overrides = overrides or {}
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def _host_state(self, host):
+        with self.lock:
+            if host not in self.hosts:
+                conf = self.overrides.get(host, {})
+                bucket = TokenBucket(conf.get('rate', self.rate), conf.get('burst', self.burst), name=host)
+                slots = threading.BoundedSemaphore(conf.get('max_in_flight', self.max_in_flight))
+                self.hosts[host] = (bucket, slots)
+            return self.hosts[host]
+
+    @contextmanager
+    def slot(self, url):
+        """해당 URL 호스트의 동시 요청 자리와 토큰을 확보한 상태로 블록 실행"""
+        bucket, slots = self._host_state(urlsplit(url).hostname or '')
+        with slots:
+            bucket.acquire()
+            yield
+
+
+class AdaptiveDelay:
+    """응답 속도와 오류에 따라 조절되는 요청 간 대기시간 (고정 sleep 대체)
+
+    - 정상 응답: 측정한 응답시간 * latency_factor 쪽으로 부드럽게 수렴 (서버가 빠르면 짧게)
+    - 429/5xx/타임아웃: backoff_factor 배씩 지수적으로 증가 (Retry-After 가 있으면 그 이상)
+    - 항상 [min_delay, max_delay] 범위, 실제 대기는 ±jitter 비율만큼 흔들어 요청이 몰리지 않게 함
+    """
+
+    def __init__(self, initial=1.0, min_delay=0.2, max_delay=30.0, latency_factor=1.0,
+                 backoff_factor=2.0, jitter=0.25, smoothing=0.3, name='delay'):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.latency_factor = latency_factor
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+        self.smoothing = smoothing
+        self.name = name
+        self.delay = self._clamp(initial)
+        self.failures = 0
+        self.logged_delay = None
+        self.lock = threading.Lock()
+
+    def _clamp(self, value):
+        return min(self.max_delay, max(self.min_delay, value))
+
+    def current(self):
+        return self.delay
+
+    def wait(self):
+        """현재 대기시간에 jitter 를 적용해 sleep"""
+        delay = self.delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+            metrics.observe('stage_seconds', delay, stage='throttle', source=self.name)
+
+    def on_success(self, latency):
+        with self.lock:
+            self.failures = 0
+            target = latency * self.latency_factor
+            self.delay = self._clamp((1 - self.smoothing) * self.delay + self.smoothing * target)
+            self._log()
+
+    def on_failure(self, reason, retry_after=None):
+        with self.lock:
+            self.failures += 1
+            delay = max(self.delay, self.min_delay, 0.1) * self.backoff_factor
+            if retry_after:
+                delay = max(delay, retry_after)
+            self.delay = self._clamp(delay)
+            print(f"    [{self.name}] {reason} - {self.failures}회 연속 실패, 대기 {self.delay:.2f}s 로 증가")
+            self.logged_delay = self.delay
+
+    def _log(self):
+        # 대기시간이 25% 이상 바뀌었을 때만 출력 (튜닝용)
+        if self.logged_delay is None or abs(self.delay - self.logged_delay) >= max(self.logged_delay * 0.25, 0.05):
+            print(f"    [{self.name}] 요청 간 대기 {self.delay:.2f}s")
+            self.logged_delay = self.delay
@@ -0,0 +1,361 @@
+# 크롤러 오프라인 녹화/재생 도구
+# - record: 실제 사이트에서 목록/상세 응답을 fixtures/recorded 에 저장 (fetch_html.py 의 여러 페이지 버전)
+# - serve : 녹화한(또는 합성한) 페이지를 로컬 HTTP 서버로 재생
+# 재생 서버와 가짜 시트(FakeSheetsClient), 가짜 드라이브(fake_drive.FakeDrive)를 함께 쓰면
+# k-icfr.org 와 구글 API 없이 crawler / update_sheet_data / drive_sync 를 돌려볼 수 있다.
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+import gspread
+
+RECORD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'recorded')
+# 실제 게시판 URL 의 경로 부분 (crawler.BASE_URL 과 같음)
+BOARD_PATH = '/sub/menu/'
+POSTS_PER_PAGE = 10
+
+
+def url_key(url):
+    """호스트를 뺀 '경로?쿼리' - 녹화 주소와 재생 서버 주소를 같은 키로 찾기 위함"""
+    parts = urlsplit(url)
+    return f"{parts.path}?{parts.query}" if parts.query else parts.path
+
+
+class PageStore:
+    """녹화한 응답 저장소 - index.json({키: {'file', 'status'}}) + 페이지별 HTML 파일"""
+
+    def __init__(self, root=RECORD_DIR):
+        self.root = root
+        self.index_path = os.path.join(root, 'index.json')
+        self.lock = threading.Lock()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return {}
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save(self, url, html, status=200):
+        key = url_key(url)
+        file_name = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16] + '.html'
+        with self.lock:
+            os.makedirs(self.root, exist_ok=True)
+            with open(os.path.join(self.root, file_name), 'w', encoding='utf-8') as f:
+                f.write(html)
+            index = self._load_index()
+            index[key] = {'file': file_name, 'status': status}
+            tmp_path = self.index_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.index_path)
+
+    def load(self):
+        """{키: (상태코드, HTML)}"""
+        pages = {}
+        for key, entry in self._load_index().items():
+            with open(os.path.join(self.root, entry['file']), 'r', encoding='utf-8') as f:
+                pages[key] = (entry['status'], f.read())
+        return pages
+
+
+class RecordingFetcher:
+    """다른 fetcher 를 감싸 가져온 페이지를 PageStore 에 함께 저장"""
+
+    def __init__(self, fetcher, store):
+        self.fetcher = fetcher
+        self.store = store
+
+    @property
+    def name(self):
+        return f"record+{self.fetcher.name}"
+
+    @property
+    def max_concurrency(self):
+        return self.fetcher.max_concurrency
+
+    def get(self, url, wait_for=None):
+        page = self.fetcher.get(url, wait_for=wait_for)
+        self.store.save(url, page.html, page.status)
+        return page
+
+    def close(self):
+        self.fetcher.close()
+
+
+# --- 합성 게시판 (녹화본이 없을 때) ---
+
+LIST_PAGE = ('<html><head><meta charset="utf-8"><script>var page = {page};</script></head><body>'
+             '<div id="wrap"><table class="board_list"><thead><tr><th>번호</th><th>분류</th><th>제목</th>'
+             '<th>작성자</th><th>등록일</th><th>처리현황</th></tr></thead><tbody>{rows}</tbody></table>'
+             '<div class="paging">{paging}</div></div></body></html>')
+LIST_ROW = ('<tr><td class="num">{num}</td><td class="category">{category}</td>'
+            '<td class="subject"><a href="{page_name}?rWork=TblView&amp;rType=0&amp;idx={num}">{title}</a></td>'
+            '<td class="name">작성자{author}</td><td class="date">{date}</td><td class="condition">{condition}</td></tr>')
+NOTICE_ROW = ('<tr class="notice"><td class="num">공지</td><td class="category">안내</td>'
+              '<td class="subject"><a href="{page_name}?rWork=TblView&amp;rType=0&amp;idx=0">게시판 이용 안내</a></td>'
+              '<td class="name">관리자</td><td class="date">2023-01-02</td><td class="condition"></td></tr>')
+DETAIL_PAGE = ('<html><head><meta charset="utf-8"><style>.b_content {{ color: #333; }}</style></head><body>'
+               '<div id="wrap"><h3 class="b_title">{title}</h3><div class="b_content">{question}</div>'
+               '{answer}</div></body></html>')
+ANSWER = '<div class="b_con_re"><div class="bcr_date">{date}</div><div class="bcr_article">{answer}</div></div>'
+CATEGORIES = ['내부회계', '외부감사', '공시', '기타']
+
+
+def _post_date(num):
+    return f"2024-{num % 12 + 1:02d}-{num % 28 + 1:02d}"
+
+
+def synthetic_board(posts, page_name='qna.asp', per_page=POSTS_PER_PAGE, paragraphs=12):
+    """글 posts 개짜리 k-icfr 형식 게시판 {키: (상태코드, HTML)} - 글번호가 클수록 최신(앞 페이지)
+
+    짝수 번호 글은 답변이 달린 상태이며, 각 목록 페이지 맨 위에 번호 없는 공지 행이 있다.
+    """
+    pages = {}
+    last_page = max(1, -(-posts // per_page))
+    for page in range(1, last_page + 2):
+        high = posts - (page - 1) * per_page
+        rows = [NOTICE_ROW.format(page_name=page_name)]
+        for num in range(high, max(high - per_page, 0), -1):
+            rows.append(LIST_ROW.format(
+                num=num, page_name=page_name, title=f"내부회계관리제도 질의 {num}", author=num % 7,
+                category=CATEGORIES[num % len(CATEGORIES)], date=_post_date(num),
+                condition='답변완료' if num % 2 == 0 else '접수'))
+        paging = ''.join(f'<a href="{page_name}?rWork=TblList&amp;rType=0&amp;rGotoPage={p}">{p}</a>'
+                         for p in range(max(1, page - 5), min(last_page, page + 5) + 1))
+        html = LIST_PAGE.format(page=page, rows=''.join(rows) if high > 0 else '', paging=paging)
+        pages[f"{BOARD_PATH}{page_name}?rWork=TblList&rType=0&rGotoPage={page}"] = (200, html)
+
+    for num in range(1, posts + 1):
+        question = ''.join(f'<p>{num}번 질의의 {i}번째 문단입니다. 설계 및 운영평가 관련 문의 드립니다.</p>'
+                           for i in range(paragraphs))
+        answer = ''
+        if num % 2 == 0:
+            answer = ANSWER.format(date=_post_date(num + 1),
+                                   answer=''.join(f'<p>{num}번 질의에 대한 답변 {i}</p>' for i in range(paragraphs // 2)))
+        html = DETAIL_PAGE.format(title=f"내부회계관리제도 질의 {num}", question=question, answer=answer)
+        pages[f"{BOARD_PATH}{page_name}?rWork=TblView&rType=0&idx={num}"] = (200, html)
+    return pages
+
+
+def empty_list_page():
+    return LIST_PAGE.format(page=0, rows='', paging='')
+
+
+# --- 재생 서버 ---
+
+class ReplayServer:
+    """녹화/합성 페이지를 돌려주는 로컬 HTTP 서버 (백그라운드 스레드)
+
+    - 없는 목록 페이지(rWork=TblList)는 빈 목록으로, 그 밖의 없는 주소는 404 로 응답
+    - latency 초만큼 응답을 늦춰 네트워크 지연을 흉내 낼 수 있음
+    - set_pages() 로 실행 중에 게시판 내용을 바꿀 수 있음 (새 글이 올라온 증분 수집 시나리오)
+    """
+
+    def __init__(self, pages, latency=0.0, host='127.0.0.1', port=0):
+        self.pages = dict(pages)
+        self.latency = latency
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_port}"
+        self.base_url = self.url + BOARD_PATH
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def set_pages(self, pages):
+        with self.lock:
+            self.pages = dict(pages)
+
+    def _lookup(self, path):
+        with self.lock:
+            self.requests += 1
+            found = self.pages.get(path)
+        if found:
+            return found
+        if parse_qs(urlsplit(path).query).get('rWork') == ['TblList']:
+            return 200, empty_list_page()
+        return 404, '<html><body>Not Found</body></html>'
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # 헤더와 본문을 따로 쓰므로 Nagle 지연(약 40ms)이 매 응답에 붙지 않게
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                status, html = server._lookup(self.path)
+                body = html.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# --- 가짜 구글 시트 (gspread 의 crawler 가 쓰는 부분만) ---
+
+class FakeWorksheet:
+    def __init__(self, title, rows=None):
+        self.title = title
+        self.rows = [list(row) for row in rows or []]
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def append_row(self, row):
+        return self.append_rows([row])
+
+    def append_rows(self, rows, **kwargs):
+        with self.lock:
+            self.calls += 1
+            start = len(self.rows) + 1
+            self.rows.extend(list(row) for row in rows)
+            end = len(self.rows)
+        return {'updates': {'updatedRange': f"'{self.title}'!A{start}:I{end}", 'updatedRows': len(rows)}}
+
+    def get_all_values(self):
+        with self.lock:
+            self.calls += 1
+            return [list(row) for row in self.rows]
+
+    def col_values(self, col):
+        with self.lock:
+            self.calls += 1
+            values = [str(row[col - 1]) if len(row) >= col else '' for row in self.rows]
+        # gspread 처럼 끝의 빈 칸은 잘라서 반환
+        while values and values[-1] == '':
+            values.pop()
+        return values
+
+    def get_all_records(self):
+        values = self.get_all_values()
+        if not values:
+            return []
+        header = values[0]
+        return [dict(zip(header, row)) for row in values[1:]]
+
+    def batch_update(self, data, **kwargs):
+        with self.lock:
+            self.calls += 1
+            for update in data:
+                start_cell = update['range'].split('!')[-1].split(':')[0]
+                row_number = int(''.join(ch for ch in start_cell if ch.isdigit()))
+                for offset, values in enumerate(update['values']):
+                    self.rows[row_number - 1 + offset] = list(values)
+        return {'totalUpdatedRows': len(data)}
+
+
+class FakeSpreadsheet:
+    def __init__(self, title):
+        self.title = title
+        self.worksheets = {}
+
+    def worksheet(self, title):
+        if title not in self.worksheets:
+            raise gspread.WorksheetNotFound(title)
+        return self.worksheets[title]
+
+    def add_worksheet(self, title, rows=100, cols=10):
+        self.worksheets[title] = FakeWorksheet(title)
+        return self.worksheets[title]
+
+
+class FakeSheetsClient:
+    """gspread.Client 대신 쓰는 메모리 시트 클라이언트"""
+
+    def __init__(self):
+        self.spreadsheets = {}
+
+    def open(self, title):
+        if title not in self.spreadsheets:
+            raise gspread.SpreadsheetNotFound(title)
+        return self.spreadsheets[title]
+
+    def create(self, title):
+        self.spreadsheets[title] = FakeSpreadsheet(title)
+        return self.spreadsheets[title]
+
+
+# --- CLI ---
+
+def record(args):
+    # 실제 사이트 수집 경로(HTTP, 실패 시 Selenium)를 그대로 사용
+    import crawler
+    store = PageStore(args.out)
+    fetcher = RecordingFetcher(crawler.create_fetcher(workers=args.workers), store)
+    try:
+        for board in args.boards:
+            count = sum(1 for _ in crawler.iter_board(fetcher, board, max_pages=args.pages,
+                                                      existing_nums=set(), workers=args.workers))
+            print(f"[{board}] 게시물 {count}건 녹화")
+    finally:
+        fetcher.close()
+    print(f"녹화 완료: {len(store.load())}개 응답 -> {store.root}")
+
+
+def serve(args):
+    pages = synthetic_board(args.synthetic) if args.synthetic else PageStore(args.dir).load()
+    if not pages:
+        print("재생할 페이지가 없습니다. replay.py record 로 녹화하거나 --synthetic N 을 지정하세요.")
+        return 1
+    with ReplayServer(pages, latency=args.latency / 1000.0, port=args.port) as server:
+        print(f"재생 서버: {server.base_url} (페이지 {len(pages)}개, Ctrl+C 로 종료)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="크롤러 응답 녹화/재생")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    rec = sub.add_parser('record', help="실제 사이트의 목록/상세 응답을 녹화")
+    rec.add_argument('--boards', nargs='+', default=['qna.asp', 'faq.asp'])
+    rec.add_argument('--pages', type=int, default=3, help="게시판별 녹화할 목록 페이지 수")
+    rec.add_argument('--workers', type=int, default=4)
+    rec.add_argument('--out', default=RECORD_DIR)
+
+    srv = sub.add_parser('serve', help="녹화/합성 페이지를 로컬 서버로 재생")
+    srv.add_argument('--dir', default=RECORD_DIR)
+    srv.add_argument('--synthetic', type=int, default=0, help="녹화본 대신 글 N개짜리 합성 게시판")
+    srv.add_argument('--port', type=int, default=8765)
+    srv.add_argument('--latency', type=float, default=0, help="응답 지연 (ms)")
+
+    args = parser.parse_args(argv)
+    if args.command == 'record':
+        return record(args)
+    return serve(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+# 설정 파일(JSON) 기반 게시판 수집 스케줄러
+# 여러 사이트/게시판을 전체 동시 작업 수(max_jobs) 안에서 함께 돌리고,
+# 같은 호스트의 작업들은 하나의 요청 제한(HostLimiter)과 대기시간을 공유한다.
+# 수집 자체(sync_board)는 crawler 가 넘겨주는 run_job 콜백이 한다.
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+import metrics
+from board_profiles import get_profile
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'crawl_jobs.json')
+# 동시에 수집하는 게시판 수 (호스트별 요청 제한은 이와 별개로 적용)
+MAX_JOBS = 2
+BOARD_KEYS = {'tab', 'site', 'board', 'profile', 'selectors', 'max_pages', 'priority'}
+HOST_KEYS = {'rate', 'burst', 'max_in_flight', 'delay'}
+# ratelimit.AdaptiveDelay 인자 (name 은 호스트 이름으로 정해짐)
+DELAY_KEYS = {'initial', 'min_delay', 'max_delay', 'latency_factor', 'backoff_factor', 'jitter', 'smoothing'}
+
+
+class Job:
+    """설정의 boards 항목 하나 - 게시판 하나를 시트 탭 하나로 수집
+
+    priority 가 작을수록 먼저 시작하고, 같으면 예상 페이지 수(estimate)가 적은 작업부터 시작한다.
+    """
+
+    def __init__(self, tab, site, board, profile='kicfr', selectors=None, max_pages=3, priority=0):
+        self.tab = tab
+        self.site = site if site.endswith('/') else site + '/'
+        self.board = board
+        self.profile_name = profile
+        self.profile = get_profile(profile, selectors)
+        self.max_pages = max_pages
+        self.priority = priority
+        self.host = urlsplit(self.site).hostname or ''
+        self.estimate = max_pages
+        self.mode = '전체'
+
+    def __repr__(self):
+        return f"Job({self.tab!r}, {self.host}/{self.board}, {self.mode} ~{self.estimate}p)"
+
+
+def parse_config(config):
+    """설정 dict 검증 -> (max_jobs, hosts, Job 목록)
+
+    {"max_jobs": 2,
+     "hosts": {"www.k-icfr.org": {"rate": 2.0, "burst": 2, "max_in_flight": 4, "delay": {"initial": 1.0}}},
+     "boards": [{"tab": "Q&A", "site": "https://www.k-icfr.org/sub/menu/", "board": "qna.asp",
+                 "profile": "kicfr", "max_pages": 96, "priority": 0}, ...]}
+    """
+    jobs = []
+    for i, entry in enumerate(config.get('boards') or []):
+        missing = {'tab', 'site', 'board'} - set(entry)
+        if missing:
+            raise ValueError(f"boards[{i}] 에 필수 항목이 없습니다: {', '.join(sorted(missing))}")
+        unknown = set(entry) - BOARD_KEYS
+        if unknown:
+            raise ValueError(f"boards[{i}] 에 알 수 없는 항목이 있습니다: {', '.join(sorted(unknown))}")
+        jobs.append(Job(**entry))
+    if not jobs:
+        raise ValueError("수집할 게시판(boards)이 없습니다.")
+    # 탭 이름이 수집 상태/체크포인트/적재 저널의 키이므로 겹치면 안 됨
+    tabs = [job.tab for job in jobs]
+    duplicated = sorted({tab for tab in tabs if tabs.count(tab) > 1})
+    if duplicated:
+        raise ValueError(f"같은 탭 이름을 쓰는 게시판이 있습니다: {', '.join(duplicated)}")
+    hosts = config.get('hosts') or {}
+    for host, conf in hosts.items():
+        unknown = set(conf) - HOST_KEYS
+        if unknown:
+            raise ValueError(f"hosts[{host}] 에 알 수 없는 항목이 있습니다: {', '.join(sorted(unknown))}")
+        unknown = set(conf.get('delay') or {}) - DELAY_KEYS
+        if unknown:
+            raise ValueError(f"hosts[{host}].delay 에 알 수 없는 항목이 있습니다: {', '.join(sorted(unknown))}")
+    return max(int(config.get('max_jobs', MAX_JOBS)), 1), hosts, jobs
+
+
+def load_config(path, default):
+    """설정 파일을 읽어 parse_config 결과 반환 (파일이 없으면 default 사용)"""
+    if path and os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            config = json.load(f)
+        print(f"수집 설정: {path}")
+    else:
+        config = default
+    return parse_config(config)
+
+
+def plan(jobs, state, refresh=False):
+    """수집 상태로 작업별 예상 페이지 수를 정하고 시작 순서대로 정렬
+
+    - 처음(상태 없음)이거나 refresh: max_pages 전부 ('전체')
+    - 중단된 수집: 체크포인트 이후 남은 페이지 ('재개')
+    - 그 외: 새 글이 있는 첫 페이지 정도 ('증분')
+    작은 증분 작업이 먼저 자리를 잡아 빨리 끝나고, 큰 백필은 남은 자리에서 함께 돈다.
+    """
+    for job in jobs:
+        checkpoint = state.load_checkpoint(job.tab)
+        if checkpoint:
+            job.mode, job.estimate = '재개', max(job.max_pages - checkpoint, 1)
+        elif refresh or state.count(job.tab) == 0:
+            job.mode, job.estimate = '전체', job.max_pages
+        else:
+            job.mode, job.estimate = '증분', 1
+    # sorted 는 안정 정렬이므로 같은 조건이면 설정 파일 순서 유지
+    return sorted(jobs, key=lambda job: (job.priority, job.estimate))
+
+
+def run(jobs, run_job, max_jobs=MAX_JOBS, stop=None):
+    """정렬된 작업들을 최대 max_jobs 개씩 동시에 실행 -> {탭: 오류 또는 None}
+
+    한 게시판이 실패해도 나머지는 계속 수집한다. stop(threading.Event)이 설정된 뒤에는
+    아직 시작하지 않은 작업을 건너뛴다 (진행 중인 작업을 멈추는 것은 run_job 몫).
+    """
+    def run_one(job):
+        if stop is not None and stop.is_set():
+            print(f">> [{job.tab}] 중지 요청으로 건너뜀")
+            return
+        started = time.perf_counter()
+        print(f"\n>> [{job.tab}] 수집 시작 ({job.host}/{job.board}, {job.mode}, 예상 {job.estimate}페이지)")
+        with metrics.timer('job', board=job.tab):
+            run_job(job)
+        print(f">> [{job.tab}] 수집 종료 ({time.perf_counter() - started:.1f}s)")
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix='job') as executor:
+        futures = {executor.submit(run_one, job): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                future.result()
+                results[job.tab] = None
+            except Exception as e:
+                print(f">> [{job.tab}] 수집 실패: {e}")
+                metrics.inc('errors_total', stage='job', reason=type(e).__name__)
+                results[job.tab] = e
+    return results
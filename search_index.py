@@ -0,0 +1,266 @@
+# 수집한 Q&A/FAQ 게시물 로컬 전문 검색 색인 (SQLite FTS5)
+# 한국어는 조사/어미가 붙어 띄어쓰기 단위로는 잘 안 맞으므로 한글은 두 글자씩(bigram) 잘라 색인하고,
+# 검색어도 같은 방식으로 잘라 구(phrase) 검색한다. "내부통제" -> "내부 부통 통제"
+# 사용 예:
+#   python search_index.py build --sheet          (처음 한 번, 시트 전체로 색인 생성)
+#   python search_index.py query "설계평가 표본"  (crawler 실행 시 새 글은 자동으로 색인됨)
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import threading
+from crawl_state import DEFAULT_STATE_PATH, content_hash
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(DEFAULT_STATE_PATH), 'search_index.db')
+# bm25 컬럼 가중치 (제목, 질문, 답변) - 제목에 나온 단어를 더 높게
+RANK_WEIGHTS = (5.0, 1.0, 2.0)
+SNIPPET_WIDTH = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    board TEXT NOT NULL,
+    num INTEGER NOT NULL,
+    title TEXT,
+    question TEXT,
+    answer TEXT,
+    category TEXT,
+    date TEXT,
+    url TEXT,
+    content_hash TEXT,
+    UNIQUE (board, num)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(title, question, answer);
+"""
+
+TOKEN_PATTERN = re.compile(r'[가-힣]+|[0-9a-z]+')
+
+
+def tokenize(text):
+    """한글 연속 구간은 두 글자씩 겹쳐 자르고(한 글자면 그대로), 영문/숫자는 단어 단위 소문자"""
+    tokens = []
+    for match in TOKEN_PATTERN.finditer((text or '').lower()):
+        word = match.group()
+        if len(word) > 1 and '가' <= word[0] <= '힣':
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+def build_query(query):
+    """검색어 -> FTS5 MATCH 식 (단어마다 bigram 구 검색, 단어끼리는 AND)
+
+    한 글자 한글 단어는 그 글자로 시작하는 bigram 접두어 검색으로 대신한다.
+    """
+    terms = []
+    for match in TOKEN_PATTERN.finditer(query.lower()):
+        word = match.group()
+        if len(word) == 1 and '가' <= word <= '힣':
+            terms.append(f'{word}*')
+        else:
+            terms.append('"' + ' '.join(tokenize(word)) + '"')
+    return ' AND '.join(terms)
+
+
+def _snippet(text, words, width=SNIPPET_WIDTH):
+    """원문에서 검색어가 처음 나오는 곳 앞뒤 width 글자 (없으면 앞부분)"""
+    text = ' '.join((text or '').split())
+    lowered = text.lower()
+    hits = [lowered.find(word) for word in words if lowered.find(word) >= 0]
+    start = max(min(hits) - width // 2, 0) if hits else 0
+    snippet = text[start:start + width * 2]
+    return ('…' if start else '') + snippet + ('…' if start + width * 2 < len(text) else '')
+
+
+def post_doc(board, post):
+    """크롤러 결과 dict(시트 컬럼 이름) -> docs 행 값"""
+    values = (post.get('제목', ''), post.get('질문 본문', ''), post.get('답변 본문', ''),
+              post.get('분류', ''), str(post.get('등록일', '')), post.get('URL', ''))
+    return (board, int(post['번호'])) + values + (content_hash(values),)
+
+
+class SearchIndex:
+    """게시판 + 글번호 단위 전문 검색 색인
+
+    add() 는 내용 해시가 같으면 건너뛰므로 같은 글을 여러 번 넣어도 색인이 다시 쓰이지 않는다.
+    크롤러의 여러 게시판 작업이 같은 파일을 쓰므로 WAL 모드와 잠금 대기를 켠다.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(SCHEMA)
+
+    def add(self, board, posts):
+        """게시물들을 색인 (새 글은 추가, 바뀐 글은 교체) -> 실제로 색인한 건수"""
+        changed = 0
+        with self.lock, self.conn:
+            for post in posts:
+                doc = post_doc(board, post)
+                row = self.conn.execute("SELECT id, content_hash FROM docs WHERE board = ? AND num = ?",
+                                        doc[:2]).fetchone()
+                if row and row[1] == doc[-1]:
+                    continue
+                if row:
+                    self.conn.execute("DELETE FROM docs_fts WHERE rowid = ?", (row[0],))
+                    self.conn.execute("DELETE FROM docs WHERE id = ?", (row[0],))
+                cursor = self.conn.execute(
+                    "INSERT INTO docs (board, num, title, question, answer, category, date, url, content_hash) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", doc)
+                self.conn.execute(
+                    "INSERT INTO docs_fts (rowid, title, question, answer) VALUES (?, ?, ?, ?)",
+                    (cursor.lastrowid,) + tuple(' '.join(tokenize(text)) for text in doc[2:5]))
+                changed += 1
+        return changed
+
+    def count(self, board=None):
+        with self.lock:
+            if board is None:
+                return self.conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+            return self.conn.execute("SELECT COUNT(*) FROM docs WHERE board = ?", (board,)).fetchone()[0]
+
+    def search(self, query, board=None, limit=10):
+        """관련도 순 검색 결과 [{'board', 'num', 'title', 'date', 'url', 'score', 'snippet'}]"""
+        match = build_query(query)
+        if not match:
+            return []
+        sql = ("SELECT d.board, d.num, d.title, d.date, d.url, d.question, d.answer, "
+               "bm25(docs_fts, ?, ?, ?) AS score "
+               "FROM docs_fts JOIN docs d ON d.id = docs_fts.rowid WHERE docs_fts MATCH ?")
+        params = list(RANK_WEIGHTS) + [match]
+        if board:
+            sql += " AND d.board = ?"
+            params.append(board)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        words = [match.group() for match in TOKEN_PATTERN.finditer(query.lower())]
+        results = []
+        for board_name, num, title, date, url, question, answer, score in rows:
+            # 질문에 검색어가 없으면 답변에서 발췌
+            source = question if any(word in (question or '').lower() for word in words) else answer or question
+            results.append({
+                'board': board_name,
+                'num': num,
+                'title': title,
+                'date': date,
+                'url': url,
+                # bm25 는 작을수록(음수) 관련도가 높으므로 부호를 바꿔 보여줌
+                'score': round(-score, 3),
+                'snippet': _snippet(source, words),
+            })
+        return results
+
+    def optimize(self):
+        """일괄 색인 후 FTS 세그먼트 병합 (검색 속도 향상)"""
+        with self.lock, self.conn:
+            self.conn.execute("INSERT INTO docs_fts (docs_fts) VALUES ('optimize')")
+
+    def close(self):
+        self.conn.close()
+
+
+# --- 일괄 색인 원본 ---
+
+def sheet_posts(tabs):
+    """시트 탭별 전체 행 (crawler 의 구글 인증 사용) -> (탭, 게시물 목록)"""
+    from crawler import get_google_sheet_client, SPREADSHEET_NAME
+    spreadsheet = get_google_sheet_client().open(SPREADSHEET_NAME)
+    for tab in tabs:
+        records = spreadsheet.worksheet(tab).get_all_records()
+        yield tab, [r for r in records if str(r.get('번호', '')).isdigit()]
+
+
+def jsonl_posts(path):
+    """JsonlSink 출력 (board 필드 기준으로 묶음)"""
+    boards = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                post = json.loads(line)
+                boards.setdefault(post.get('board', ''), []).append(post)
+    return boards.items()
+
+
+def sqlite_posts(path):
+    """SqliteSink 출력"""
+    conn = sqlite3.connect(path)
+    boards = {}
+    for board, data in conn.execute("SELECT board, data FROM posts ORDER BY board, num"):
+        boards.setdefault(board, []).append(json.loads(data))
+    conn.close()
+    return boards.items()
+
+
+def default_tabs():
+    """수집 설정(crawl_jobs.json, 없으면 기본 Q&A/FAQ)의 탭 이름"""
+    import scheduler
+    from crawler import DEFAULT_JOBS
+    _, _, jobs = scheduler.load_config(scheduler.DEFAULT_CONFIG_PATH, DEFAULT_JOBS)
+    return [job.tab for job in jobs]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="수집한 게시물 전문 검색 색인")
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH,
+                        help=f"색인 파일 (기본: {os.path.basename(DEFAULT_INDEX_PATH)})")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="시트/JSONL/SQLite 출력으로 색인 생성 또는 갱신")
+    build.add_argument('--sheet', action='store_true', help="구글 시트 탭 전체에서 색인")
+    build.add_argument('--tabs', nargs='+', help="--sheet 로 읽을 탭 (기본: 수집 설정의 탭 전부)")
+    build.add_argument('--jsonl', help="crawler --jsonl 출력 파일에서 색인")
+    build.add_argument('--sqlite', help="crawler --sqlite 출력 파일에서 색인")
+    query = commands.add_parser('query', help="검색")
+    query.add_argument('query', nargs='+', help="검색어 (여러 단어는 모두 포함하는 글)")
+    query.add_argument('--board', help="이 탭(게시판)만 검색")
+    query.add_argument('--limit', type=int, default=10)
+    query.add_argument('--json', action='store_true', help="결과를 JSON 으로 출력")
+    args = parser.parse_args(argv)
+
+    index = SearchIndex(args.index)
+    try:
+        if args.command == 'build':
+            sources = []
+            if args.sheet:
+                sources.append(sheet_posts(args.tabs or default_tabs()))
+            if args.jsonl:
+                sources.append(jsonl_posts(args.jsonl))
+            if args.sqlite:
+                sources.append(sqlite_posts(args.sqlite))
+            if not sources:
+                build.error("색인할 원본(--sheet, --jsonl, --sqlite)을 하나 이상 지정하세요.")
+            started = time.perf_counter()
+            for source in sources:
+                for board, posts in source:
+                    changed = index.add(board, posts)
+                    print(f"[{board}] {len(posts)}건 중 {changed}건 색인")
+            index.optimize()
+            print(f"색인 완료: 전체 {index.count()}건 ({time.perf_counter() - started:.1f}s)")
+        else:
+            text = ' '.join(args.query)
+            started = time.perf_counter()
+            results = index.search(text, board=args.board, limit=args.limit)
+            elapsed = (time.perf_counter() - started) * 1000
+            if args.json:
+                print(json.dumps(results, ensure_ascii=False, indent=2))
+                return 0
+            for r in results:
+                print(f"[{r['board']}] {r['num']}  {r['title']}  ({r['date']}, 점수 {r['score']})")
+                print(f"    {r['snippet']}")
+                print(f"    {r['url']}")
+            print(f"{len(results)}건 ({elapsed:.1f}ms)")
+    finally:
+        index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+import os
+import json
+import time
+import random
+import threading
+import requests
+import gspread
+import metrics
+from ratelimit import TokenBucket
+from crawl_state import parse_updated_rows
+
+# Sheets API 기본 쿼터는 사용자당 분당 60회 쓰기 - 여유를 두고 50회
+CALLS_PER_MINUTE = 50
+# 한 번의 요청에 보낼 최대 행 수 / 바이트 수 (요청 크기 제한 2MB 보다 작게)
+CHUNK_ROWS = 500
+CHUNK_BYTES = 1_500_000
+MAX_RETRIES = 5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _row_size(row):
+    return len(json.dumps(row, ensure_ascii=False).encode('utf-8'))
+
+
+def chunk_rows(rows, max_rows=CHUNK_ROWS, max_bytes=CHUNK_BYTES):
+    """행 수와 바이트 크기 기준으로 rows 를 나눔 (한 행이 max_bytes 보다 커도 단독 청크로 보냄)"""
+    chunk, size = [], 0
+    for row in rows:
+        row_size = _row_size(row)
+        if chunk and (len(chunk) >= max_rows or size + row_size > max_bytes):
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(row)
+        size += row_size
+    if chunk:
+        yield chunk
+
+
+# Sheets 쓰기 쿼터는 사용자 단위이므로 같은 프로세스의 모든 SheetWriter 가 버킷을 함께 씀
+# (게시판 작업이 동시에 여러 개 돌아도 전체 호출 수가 calls_per_minute 를 넘지 않도록)
+SHARED_BUCKETS = {}
+SHARED_BUCKETS_LOCK = threading.Lock()
+
+
+def shared_bucket(calls_per_minute=CALLS_PER_MINUTE):
+    """calls_per_minute 페이스의 프로세스 공용 토큰 버킷"""
+    with SHARED_BUCKETS_LOCK:
+        if calls_per_minute not in SHARED_BUCKETS:
+            SHARED_BUCKETS[calls_per_minute] = TokenBucket(calls_per_minute / 60.0, burst=1, name='sheets')
+        return SHARED_BUCKETS[calls_per_minute]
+
+
+def _status_code(error):
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None)
+
+
+class SheetWriter:
+    """청크 단위로 나누어 시트에 쓰고, 쿼터에 맞춰 속도를 조절하며, 실패하면 재시도
+
+    journal_path 를 주면 보낼 행과 커밋된 청크 위치를 파일에 기록하므로 중간에 끊긴
+    대량 적재를 resume() 으로 마지막 커밋 이후부터 이어서 보낼 수 있다.
+    """
+
+    def __init__(self, worksheet, max_rows=CHUNK_ROWS, max_bytes=CHUNK_BYTES,
+                 calls_per_minute=CALLS_PER_MINUTE, max_retries=MAX_RETRIES, journal_path=None, bucket=None):
+        self.worksheet = worksheet
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_retries = max_retries
+        self.journal_path = journal_path
+        # bucket 을 주지 않으면 같은 페이스의 프로세스 공용 버킷 사용
+        self.bucket = bucket or shared_bucket(calls_per_minute)
+
+    def _call(self, func, *args, landed=None, **kwargs):
+        """쿼터 페이스에 맞춰 호출하고 429/5xx/연결 오류는 지수 백오프로 재시도
+
+        append 처럼 두 번 보내면 안 되는 호출은 landed 를 준다. 서버에서 처리됐는지 알 수 없는
+        오류(429 가 아닌 경우) 뒤에는 재시도 전에 landed() 로 확인하고, 이미 반영됐으면
+        그 결과(응답 대신)를 돌려주고 다시 보내지 않는다.
+        """
+        verify = False
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                if verify:
+                    response = landed()
+                    verify = False
+                    if response is not None:
+                        print("  이전 요청이 이미 반영되어 다시 보내지 않습니다.")
+                        metrics.inc('retries_total', component='sheets', reason='already_applied')
+                        return response
+                    self.bucket.acquire()
+                with metrics.timer('sheet_write', op=func.__name__):
+                    return func(*args, **kwargs)
+            except (gspread.exceptions.APIError, requests.ConnectionError, requests.Timeout) as e:
+                status = _status_code(e)
+                reason = str(status or type(e).__name__)
+                if (isinstance(e, gspread.exceptions.APIError) and status not in RETRY_STATUSES
+                        or attempt == self.max_retries):
+                    metrics.inc('errors_total', stage='sheet_write', reason=reason)
+                    raise
+                # 429 는 처리 전에 거절된 것이므로 확인 없이 다시 보냄
+                verify = verify or (landed is not None and status != 429)
+                metrics.inc('retries_total', component='sheets', reason=reason)
+                wait = min(64, 2 ** attempt) + random.uniform(0, 1)
+                print(f"  시트 API 오류({status or type(e).__name__}), {wait:.1f}초 후 재시도 ({attempt + 1}/{self.max_retries})")
+                time.sleep(wait)
+
+    def _landed(self, chunk):
+        """chunk 가 이미 시트 끝에 추가돼 있으면 append 응답 형식의 dict, 아니면 None
+
+        A열(번호)의 마지막 len(chunk) 개가 chunk 의 번호와 같은지로 판단한다.
+        """
+        column = self.worksheet.col_values(1)
+        tail = column[-len(chunk):]
+        if len(tail) < len(chunk) or tail != [str(row[0]) for row in chunk]:
+            return None
+        start = len(column) - len(chunk) + 1
+        return {'updates': {'updatedRange': f"'{self.worksheet.title}'!A{start}:I{len(column)}",
+                            'updatedRows': len(chunk)}}
+
+    # --- 진행상황 저널 ---
+
+    def _save_journal(self, journal):
+        tmp_path = self.journal_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(journal, f, ensure_ascii=False)
+        os.replace(tmp_path, self.journal_path)
+
+    def _load_journal(self):
+        if not self.journal_path or not os.path.exists(self.journal_path):
+            return None
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def pending(self):
+        """저널에 남아 있는(아직 커밋되지 않은) 행 수"""
+        journal = self._load_journal()
+        if not journal:
+            return 0
+        return len(journal['rows']) - journal['committed']
+
+    # --- 쓰기 ---
+
+    def append_rows(self, rows, on_commit=None):
+        """rows 를 청크로 나누어 추가. on_commit(chunk, sheet_rows) 는 청크가 커밋될 때마다 호출"""
+        if not rows:
+            return 0
+        if self.journal_path:
+            self._save_journal({'rows': rows, 'committed': 0})
+        return self._send(rows, 0, on_commit)
+
+    def resume(self, on_commit=None):
+        """이전 실행에서 끊긴 append_rows 를 마지막 커밋 이후부터 이어서 전송"""
+        journal = self._load_journal()
+        if not journal:
+            return 0
+        remaining = len(journal['rows']) - journal['committed']
+        print(f"  이전 적재 작업 재개: {journal['committed']}행 커밋됨, {remaining}행 남음")
+        return self._send(journal['rows'], journal['committed'], on_commit, resumed=True)
+
+    def _send(self, rows, committed, on_commit, resumed=False):
+        sent = 0
+        for chunk in chunk_rows(rows[committed:], self.max_rows, self.max_bytes):
+            # 이전 실행이 전송 직후(저널 기록 전)에 끊겼으면 첫 청크는 이미 시트에 있을 수 있음
+            response = self._call(self._landed, chunk) if resumed and sent == 0 else None
+            if response is None:
+                response = self._call(self.worksheet.append_rows, chunk, landed=lambda: self._landed(chunk))
+            else:
+                print("  첫 청크는 이미 시트에 반영되어 있어 건너뜁니다.")
+            committed += len(chunk)
+            sent += len(chunk)
+            if self.journal_path:
+                self._save_journal({'rows': rows, 'committed': committed})
+            if on_commit:
+                on_commit(chunk, parse_updated_rows(response) or [None] * len(chunk))
+            if len(rows) > self.max_rows:
+                print(f"  {committed}/{len(rows)}행 전송")
+        if self.journal_path and os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        return sent
+
+    def batch_update(self, updates):
+        """updates: [{'range': 'A5:I5', 'values': [[...]]}, ...] 를 청크로 나누어 갱신"""
+        for chunk in chunk_rows(updates, self.max_rows, self.max_bytes):
+            self._call(self.worksheet.batch_update, chunk)
+        return len(updates)
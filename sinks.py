@@ -0,0 +1,232 @@
+import os
+import json
+import sqlite3
+import threading
+
+
+class SheetSink:
+    """구글 시트 싱크 - flush 때마다 모인 게시물을 update_sheet_data 로 반영"""
+
+    name = 'sheet'
+
+    def __init__(self, worksheet, state=None, board=None, writer=None):
+        self.worksheet = worksheet
+        self.state = state
+        self.board = board
+        self.writer = writer
+        self.buffer = []
+
+    def write(self, post):
+        self.buffer.append(post)
+
+    def flush(self):
+        if not self.buffer:
+            return
+        # crawler 가 이 모듈을 import 하므로 순환 import 를 피해 여기서 import
+        from crawler import update_sheet_data
+        update_sheet_data(self.worksheet, self.buffer, state=self.state, board=self.board, writer=self.writer)
+        self.buffer = []
+
+    def close(self):
+        self.flush()
+
+
+class JsonlFile:
+    """여러 게시판 싱크가 함께 쓰는 JSONL 파일 (스레드 안전, 쓸 때마다 디스크까지 기록)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def write(self, records):
+        # 한 게시판의 묶음이 다른 게시판 줄과 섞이지 않도록 잠금 안에서 한 번에 씀
+        with self.lock:
+            for record in records:
+                self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+
+
+class JsonlSink:
+    """JSONL 파일 싱크 - 게시물 하나당 한 줄, flush 때 모아서 기록
+
+    output 은 JsonlFile (여러 게시판 작업이 같은 파일을 쓸 때 공유) 또는 경로 (이 싱크 전용으로 엶).
+    """
+
+    name = 'jsonl'
+
+    def __init__(self, output, board=None):
+        self.owned = isinstance(output, str)
+        self.output = JsonlFile(output) if self.owned else output
+        self.board = board
+        self.buffer = []
+
+    def write(self, post):
+        self.buffer.append(dict(post, board=self.board) if self.board else post)
+
+    def flush(self):
+        if self.buffer:
+            self.output.write(self.buffer)
+            self.buffer = []
+
+    def close(self):
+        self.flush()
+        if self.owned:
+            self.output.close()
+
+
+class SqliteStore:
+    """여러 게시판 싱크가 함께 쓰는 SQLite 파일 - (board, 번호) 기준 upsert (스레드 안전)
+
+    게시판마다 연결을 따로 열면 한 작업의 쓰기 트랜잭션이 다른 작업을 막으므로(database is locked)
+    연결 하나를 잠금으로 나눠 쓰고, 묶음마다 바로 commit 한다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                """CREATE TABLE IF NOT EXISTS posts (
+                       board TEXT NOT NULL,
+                       num INTEGER NOT NULL,
+                       data TEXT NOT NULL,
+                       PRIMARY KEY (board, num)
+                   )""")
+
+    def upsert(self, board, posts):
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO posts (board, num, data) VALUES (?, ?, ?)",
+                [(board, int(post['번호']), json.dumps(post, ensure_ascii=False)) for post in posts])
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class SqliteSink:
+    """SQLite 싱크 - flush 때 모인 게시물을 upsert (본문은 자르지 않고 저장)
+
+    output 은 SqliteStore (여러 게시판 작업이 공유) 또는 경로 (이 싱크 전용으로 엶).
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, output, board):
+        self.owned = isinstance(output, str)
+        self.store = SqliteStore(output) if self.owned else output
+        self.board = board
+        self.buffer = []
+
+    def write(self, post):
+        self.buffer.append(post)
+
+    def flush(self):
+        if self.buffer:
+            self.store.upsert(self.board, self.buffer)
+            self.buffer = []
+
+    def close(self):
+        self.flush()
+        if self.owned:
+            self.store.close()
+
+
+class ArchiveSink:
+    """원문 보관소 싱크 - 자르지 않은 본문을 압축 보관, flush 때 디스크까지 기록"""
+
+    name = 'archive'
+
+    def __init__(self, archive, board):
+        # 여러 게시판 작업이 같은 보관소 파일을 쓰므로 PostArchive 객체를 공유
+        self.archive = archive
+        self.board = board
+
+    def write(self, post):
+        self.archive.add(self.board, [post])
+
+    def flush(self):
+        self.archive.flush()
+
+    def close(self):
+        self.flush()
+
+
+class SearchSink:
+    """전문 검색 색인 싱크 - flush 때 모인 게시물을 색인 (내용이 같은 글은 건너뜀)"""
+
+    name = 'search'
+
+    def __init__(self, path, board):
+        from search_index import SearchIndex
+        self.board = board
+        self.index = SearchIndex(path)
+        self.buffer = []
+
+    def write(self, post):
+        self.buffer.append(post)
+
+    def flush(self):
+        if self.buffer:
+            self.index.add(self.board, self.buffer)
+            self.buffer = []
+
+    def close(self):
+        self.flush()
+        self.index.close()
+
+
+class Pipeline:
+    """게시물 스트림을 여러 싱크로 전달
+
+    flush_every 건마다, 그리고 checkpoint() 가 불릴 때마다 모든 싱크를 flush 한 뒤
+    on_checkpoint(marker) 를 호출하므로 중간에 죽어도 마지막 체크포인트까지는 보존된다.
+    """
+
+    def __init__(self, sinks, flush_every=50, on_checkpoint=None):
+        self.sinks = sinks
+        self.flush_every = flush_every
+        self.on_checkpoint = on_checkpoint
+        self.count = 0
+        self.unflushed = 0
+
+    def write(self, post):
+        for sink in self.sinks:
+            sink.write(post)
+        self.count += 1
+        self.unflushed += 1
+        if self.flush_every and self.unflushed >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+        self.unflushed = 0
+
+    def checkpoint(self, marker):
+        if self.unflushed:
+            self.flush()
+        if self.on_checkpoint:
+            self.on_checkpoint(marker)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+    def run(self, posts):
+        """posts 를 끝까지 소비하고 처리한 건수 반환 (예외가 나도 싱크는 닫음)"""
+        try:
+            for post in posts:
+                self.write(post)
+        finally:
+            self.close()
+        return self.count
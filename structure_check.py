@@ -1,70 +1,256 @@
-import requests
-from bs4 import BeautifulSoup
-import re
+# 게시판 구조 점검 (수집 전 선택자 변화 감지)
+# 수집 설정(crawl_jobs.json, 없으면 기본 Q&A/FAQ)의 모든 게시판에 대해 목록 첫 페이지와
+# 상세 페이지 몇 개를 병렬로 가져와, crawler 가 쓰는 프로필 선택자가 실제로 맞는지 확인하고
+# JSON 리포트로 남긴다. 이전 리포트에서는 맞던 선택자가 안 맞게 되면 drift 로 표시한다.
+# 필수 선택자가 하나도 안 맞는 게시판은 오류 -> 수집해도 0건이 나오므로 crawler --preflight 가 건너뜀.
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+import html_parser
+import scheduler
+from fetcher import HttpFetcher
+from ratelimit import HostLimiter, AdaptiveDelay
+from http_cache import ResponseCache, DEFAULT_CACHE_DIR
 
-def check(name, url):
-    print(f"--- Checking {name} ({url}) ---")
+REPORT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'structure_report.json')
+# 게시판마다 확인할 상세 페이지 수 (목록의 앞/중간/끝에서 고름)
+DETAIL_SAMPLES = 3
+# 하나도 안 맞으면 수집 결과가 비거나 깨지는 선택자 (나머지는 안 맞으면 경고)
+REQUIRED_LIST = ('list_ready', 'rows', 'num', 'subject')
+OPTIONAL_LIST = ('date', 'category', 'name', 'condition')
+REQUIRED_DETAIL = ('detail_ready', 'question')
+# 답변은 아직 안 달린 글도 있으므로 표본 전체에서 하나도 없을 때만 경고
+OPTIONAL_DETAIL = ('answer', 'answer_date')
+
+
+def _text(row, selector):
+    cell = row.select_one(selector)
+    return ' '.join(cell.get_text().split()) if cell is not None else ''
+
+
+def _count(doc, selector):
+    return len(doc.select(selector)) if selector else None
+
+
+def _sample(items, k):
+    """앞/중간/끝에 고르게 k 개"""
+    if len(items) <= k:
+        return list(items)
+    step = (len(items) - 1) / (k - 1) if k > 1 else 0
+    return [items[round(i * step)] for i in range(k)]
+
+
+def check_list(job, fetcher):
+    """목록 첫 페이지 점검 -> (결과 dict, 상세 페이지 표본 URL 목록)"""
+    from crawler import list_url
+    profile = job.profile
+    url = list_url(job.board, 1, job.site, profile)
+    result = {'url': url, 'selectors': {}}
+    started = time.perf_counter()
+    page = fetcher.get(url)
+    result['seconds'] = round(time.perf_counter() - started, 3)
+    doc = page.doc
+    rows = doc.select(profile['rows'])
+    # 글번호가 있는 행(공지 제외)만 셀 선택자 확인 대상
+    numbered = [row for row in rows if _text(row, profile['num']).isdigit()]
+    result['rows'] = len(rows)
+    result['numbered_rows'] = len(numbered)
+    selectors = result['selectors']
+    selectors['list_ready'] = {'selector': profile['list_ready'], 'matched': _count(doc, profile['list_ready'])}
+    selectors['rows'] = {'selector': profile['rows'], 'matched': len(rows)}
+    selectors['num'] = {'selector': profile['num'], 'matched': len(numbered), 'of': len(rows)}
+    for name in ('subject',) + OPTIONAL_LIST:
+        if profile[name]:
+            selectors[name] = {'selector': profile[name], 'of': len(numbered),
+                               'matched': sum(row.select_one(profile[name]) is not None for row in numbered)}
+    links = []
+    for row in numbered:
+        link = row.select_one(profile['subject'])
+        if link is not None and link.get('href'):
+            links.append(urljoin(page.url, link.get('href')))
+    return result, links
+
+
+def check_detail(job, fetcher, url):
+    profile = job.profile
+    started = time.perf_counter()
+    doc = fetcher.get(url).doc
+    result = {'url': url, 'seconds': round(time.perf_counter() - started, 3), 'selectors': {}}
+    for name in REQUIRED_DETAIL + OPTIONAL_DETAIL:
+        if profile[name]:
+            result['selectors'][name] = {'selector': profile[name], 'matched': _count(doc, profile[name])}
+    return result
+
+
+def _judge(board):
+    """선택자별 결과로 오류/경고 판정"""
+    selectors = board['list'].get('selectors', {})
+    for name in REQUIRED_LIST:
+        if name in selectors and not selectors[name]['matched']:
+            board['errors'].append(f"목록 선택자 '{selectors[name]['selector']}' ({name}) 가 맞지 않습니다.")
+    for name in OPTIONAL_LIST:
+        if name in selectors and selectors[name]['of'] and not selectors[name]['matched']:
+            board['warnings'].append(f"목록 선택자 '{selectors[name]['selector']}' ({name}) 가 맞지 않습니다.")
+    details = [d for d in board['details'] if 'selectors' in d]
+    if board['list'].get('numbered_rows') and not board['details']:
+        board['errors'].append("상세 페이지 링크를 찾지 못했습니다.")
+    for name in REQUIRED_DETAIL + OPTIONAL_DETAIL:
+        checked = [d['selectors'][name] for d in details if name in d['selectors']]
+        if not checked:
+            continue
+        missing = sum(not c['matched'] for c in checked)
+        message = f"상세 선택자 '{checked[0]['selector']}' ({name}) 가 표본 {len(checked)}개 중 {missing}개에서 맞지 않습니다."
+        if name in REQUIRED_DETAIL and missing:
+            board['errors'].append(message)
+        elif name in OPTIONAL_DETAIL and missing == len(checked):
+            board['warnings'].append(message)
+    board['ok'] = not board['errors']
+
+
+def _matched_selectors(board):
+    """drift 비교용 - 맞았던 선택자 이름 집합 (답변은 표본 글에 따라 달라지므로 제외)"""
+    found = {f"list.{name}" for name, s in board['list'].get('selectors', {}).items() if s['matched']}
+    for detail in board['details']:
+        found |= {f"detail.{name}" for name, s in detail.get('selectors', {}).items()
+                  if s['matched'] and name not in OPTIONAL_DETAIL}
+    return found
+
+
+def _drift(report, previous):
+    """이전 리포트에서는 맞았는데 이번에 안 맞는 선택자 [(탭, 선택자 이름)]"""
+    before = {b['tab']: _matched_selectors(b) for b in (previous or {}).get('boards', [])}
+    drift = []
+    for board in report['boards']:
+        lost = before.get(board['tab'], set()) - _matched_selectors(board)
+        drift.extend({'tab': board['tab'], 'selector': name} for name in sorted(lost))
+    return drift
+
+
+def validate(jobs, fetchers, samples=DETAIL_SAMPLES, previous=None, workers=8):
+    """게시판들의 목록/상세 선택자를 병렬로 점검해 리포트 dict 반환
+
+    fetchers 는 {호스트: fetcher} (crawler 와 같은 요청 제한을 공유하려면 같은 객체를 넘김).
+    목록 페이지를 모두 가져온 뒤, 상세 표본을 한꺼번에 가져온다.
+    """
+    started = time.perf_counter()
+    boards = [{'tab': job.tab, 'site': job.site, 'board': job.board, 'profile': job.profile_name,
+               'list': {}, 'details': [], 'errors': [], 'warnings': []} for job in jobs]
+
+    def list_one(index):
+        job, board = jobs[index], boards[index]
+        try:
+            board['list'], links = check_list(job, fetchers[job.host])
+        except Exception as e:
+            board['errors'].append(f"목록 페이지를 가져오지 못했습니다: {e}")
+            return []
+        return [(index, url) for url in _sample(links, samples)]
+
+    def detail_one(target):
+        index, url = target
+        try:
+            return index, check_detail(jobs[index], fetchers[jobs[index].host], url)
+        except Exception as e:
+            boards[index]['errors'].append(f"상세 페이지를 가져오지 못했습니다: {url} ({e})")
+            return index, {'url': url, 'error': str(e)}
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        targets = [target for found in executor.map(list_one, range(len(jobs))) for target in found]
+        for index, detail in executor.map(detail_one, targets):
+            boards[index]['details'].append(detail)
+
+    for board in boards:
+        _judge(board)
+    report = {
+        'checked_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'elapsed_seconds': round(time.perf_counter() - started, 3),
+        'ok': all(board['ok'] for board in boards),
+        'boards': boards,
+    }
+    report['drift'] = _drift(report, previous)
+    return report
+
+
+def print_report(report):
+    for board in report['boards']:
+        listed = board['list']
+        status = '정상' if board['ok'] else '오류'
+        print(f"[{board['tab']}] {status} - 행 {listed.get('rows', 0)}개 (글 {listed.get('numbered_rows', 0)}개), "
+              f"상세 표본 {len(board['details'])}개 ({board['profile']}, {board['site']}{board['board']})")
+        for message in board['errors']:
+            print(f"    오류: {message}")
+        for message in board['warnings']:
+            print(f"    경고: {message}")
+    for item in report['drift']:
+        print(f"  변화 감지: [{item['tab']}] 이전에 맞던 {item['selector']} 선택자가 맞지 않습니다.")
+    print(f"점검 완료 ({report['elapsed_seconds']:.1f}s)")
+
+
+def load_report(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_report(report, path, previous=None):
+    """리포트 저장 - 이번에 점검하지 않은 게시판(--only)은 이전 결과를 남겨 다음 비교 기준으로 씀"""
+    checked = {board['tab'] for board in report['boards']}
+    kept = [board for board in (previous or {}).get('boards', []) if board['tab'] not in checked]
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(dict(report, boards=report['boards'] + kept), f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def main(argv=None):
+    from crawler import DEFAULT_JOBS, HOST_LIMITS
+    parser = argparse.ArgumentParser(description="수집 대상 게시판 구조(선택자) 점검")
+    parser.add_argument('--config', default=scheduler.DEFAULT_CONFIG_PATH,
+                        help=f"수집 설정 JSON (기본: {os.path.basename(scheduler.DEFAULT_CONFIG_PATH)}, 없으면 Q&A/FAQ)")
+    parser.add_argument('--only', nargs='+', metavar='TAB', help="이 탭 이름의 게시판만 점검")
+    parser.add_argument('--samples', type=int, default=DETAIL_SAMPLES,
+                        help=f"게시판별 상세 페이지 표본 수 (기본: {DETAIL_SAMPLES})")
+    parser.add_argument('--parser', choices=html_parser.available_backends(), default=html_parser.DEFAULT_BACKEND)
+    parser.add_argument('--out', default=REPORT_PATH,
+                        help=f"리포트 저장 경로 (기본: {os.path.basename(REPORT_PATH)}, 이전 리포트와 비교해 변화 감지)")
+    parser.add_argument('--json', action='store_true', help="리포트를 JSON 으로 출력")
+    parser.add_argument('--cache', default=DEFAULT_CACHE_DIR,
+                        help=f"crawler 와 같은 페이지 캐시 폴더 (기본: {os.path.basename(DEFAULT_CACHE_DIR)})")
+    parser.add_argument('--no-cache', dest='cache', action='store_const', const=None, help="페이지 캐시 안 씀")
+    args = parser.parse_args(argv)
+    html_parser.set_default_backend(args.parser)
+
+    _, hosts, jobs = scheduler.load_config(args.config, DEFAULT_JOBS)
+    if args.only:
+        jobs = [job for job in jobs if job.tab in args.only]
+    # 점검은 요청 수가 적으므로 호스트별 속도 제한만 지키고 응답시간 기반 대기는 생략 (latency_factor=0),
+    # 429/5xx 때만 최대 5초까지 늘렸다가 정상 응답마다 다시 0 쪽으로 줄임, 재시도 1회
+    limiter = HostLimiter(overrides=dict(HOST_LIMITS, **hosts))
+    cache = ResponseCache(args.cache) if args.cache else None
+    fetcher = HttpFetcher(pool_size=8, limiter=limiter, max_retries=1, cache=cache,
+                          delay=AdaptiveDelay(initial=0, min_delay=0, max_delay=5.0, latency_factor=0,
+                                                name='structure-check'))
+    previous = load_report(args.out)
     try:
-        res = requests.get(url)
-        soup = BeautifulSoup(res.text, 'html.parser')
-        
-        # 테이블 구조 확인
-        # 그누보드 테마마다 테이블 클래스가 다름 (.tbl_head01, .tbl_wrap 등)
-        table = soup.select_one('table')
-        if table:
-            print(f"  Table Class: {table.get('class')}")
-            
-        rows = soup.select('table tbody tr') 
-        print(f"  Rows found: {len(rows)}")
-        
-        if len(rows) > 0:
-            # 첫 번째 행 분석 (공지사항일 수도 있으니 몇 개 확인)
-            target_row = rows[0]
-            
-            # 제목 셀 클래스 확인 (.td_subject)
-            subject = target_row.select_one('.td_subject')
-            print(f"  Has .td_subject: {subject is not None}")
-            
-            # 날짜 셀
-            date_td = target_row.select_one('.td_date')
-            print(f"  Has .td_date: {date_td is not None}")
-            
-            # 상세 페이지 링크
-            link_tag = target_row.select_one('a[href*="wr_id="]')
-            if link_tag:
-                detail_url = link_tag['href']
-                # &amp; 처리
-                detail_url = detail_url.replace('&amp;', '&')
-                print(f"  Detail URL: {detail_url}")
-                
-                # 상세 페이지 확인
-                print("  >> Checking detail page...")
-                res_d = requests.get(detail_url)
-                soup_d = BeautifulSoup(res_d.text, 'html.parser')
-                
-                # 질문 본문 (보통 #bo_v_con)
-                q_div = soup_d.select_one('#bo_v_con')
-                print(f"  Has #bo_v_con (Question Body): {q_div is not None}")
-                
-                # 답변(댓글) 확인
-                # 1. 댓글 영역 (#bo_vc)
-                ans_container = soup_d.select_one('#bo_vc')
-                print(f"  Has #bo_vc (Comment Container): {ans_container is not None}")
-                
-                if ans_container:
-                    # 댓글 개별 요소 (article or .chk_box)
-                    comments = ans_container.select('article')
-                    print(f"  Comments (article tags): {len(comments)}")
-                
-                # 2. 뷰 페이지 내 답변이 있는지 (Q&A 게시판 특성상 본문에 답이 달리는 경우)
-                # 관리자 답변 표시가 따로 있는지 확인
-                admin_ans = soup_d.select('.view_answer') # 예시 클래스
-                print(f"  Has .view_answer: {len(admin_ans) > 0}")
-
-    except Exception as e:
-        print(f"Error checking {name}: {e}")
-    print("\n")
+        report = validate(jobs, {job.host: fetcher for job in jobs}, samples=args.samples, previous=previous)
+    finally:
+        fetcher.close()
+        if cache is not None:
+            cache.close()
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+    if args.out:
+        save_report(report, args.out, previous)
+    return 0 if report['ok'] and not report['drift'] else 1
+
 
 if __name__ == "__main__":
-    check("FAQ", "https://www.k-icfr.org/bbs/board.php?bo_table=sub05_01")
-    check("Q&A", "https://www.k-icfr.org/bbs/board.php?bo_table=sub05_02")
+    sys.exit(main())